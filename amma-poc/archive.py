@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+NAS Archiving
+Ships recordings to the NAS in batches - one rsync session per batch
+instead of an ssh mkdir + scp per file - and verifies every file on the
+NAS by sha256 before it counts as archived.
+
+- rsync --partial --checksum: interrupted multi-GB transfers resume, and
+  files already on the NAS with the same content are skipped
+- Optional FLAC (--flac): PCM WAVs are compressed losslessly before
+  transfer (about half the bytes for speech); the NAS copy is .flac
+- Files queued within BATCH_WAIT seconds go out together; up to `workers`
+  batches transfer at once
+- Used by watch_and_process.py (archive stage, results go to the ledger)
+  and sync_recording.sh
+
+Configuration (env):
+    NAS_HOST, NAS_PORT, NAS_PATH    where archives go
+    NAS_SSH                         ssh command (fake_nas_ssh.sh for testing)
+
+Usage:
+    python archive.py voice/raw/*.wav          # archive now, verify, record in the ledger
+    python archive.py --flac voice/raw/*.wav
+
+Testing without the NAS (the fake runs "remote" commands locally):
+    NAS_SSH=./fake_nas_ssh.sh NAS_PATH=/tmp/fake-nas python archive.py voice/raw/*.wav
+"""
+
+import os
+import shlex
+import shutil
+import subprocess
+import tempfile
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+from audio_io import to_flac
+from ledger import file_hash
+
+NAS_HOST = os.getenv("NAS_HOST", "aauser@192.168.1.183")
+NAS_PORT = os.getenv("NAS_PORT", "17183")
+NAS_PATH = os.getenv("NAS_PATH", "/volume1/homes/aauser/amma-archive")
+NAS_SSH = os.getenv("NAS_SSH", "ssh")
+
+# Batching: wait this long for more files, ship at most this many per session
+BATCH_WAIT = 5.0
+BATCH_MAX = 50
+
+# Give up on one batch after this long (rsync resumes it next time)
+TRANSFER_TIMEOUT = 6 * 3600
+
+
+def log(msg):
+    """Print with timestamp"""
+    ts = datetime.now().strftime("%H:%M:%S")
+    print(f"[{ts}] {msg}")
+
+
+class Archiver:
+    """
+    Batching archive queue: submit(path) returns a Future that resolves to
+    {"ok", "remote", "sha256", "bytes", "error"} once the file's batch is on
+    the NAS and verified. Futures never raise.
+    """
+
+    def __init__(self, workers: int = 2, compress: bool = False, host: str = NAS_HOST,
+                 port: str = NAS_PORT, path: str = NAS_PATH, ssh: str = NAS_SSH,
+                 batch_wait: float = BATCH_WAIT):
+        self.compress = compress
+        self.host = host
+        self.port = port
+        self.remote_dir = f"{path}/raw"
+        self.ssh = ssh
+        self.batch_wait = batch_wait
+
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="archive")
+        self.cond = threading.Condition()
+        self.pending = []           # (path, future)
+        self.stopping = False
+        self.dispatcher = threading.Thread(target=self._dispatch, daemon=True)
+        self.dispatcher.start()
+
+    def submit(self, path) -> Future:
+        future = Future()
+        with self.cond:
+            self.pending.append((Path(path), future))
+            self.cond.notify()
+        return future
+
+    def shutdown(self):
+        """Ship what is queued and wait for every transfer"""
+        with self.cond:
+            self.stopping = True
+            self.cond.notify()
+        self.dispatcher.join()
+        self.pool.shutdown(wait=True)
+
+    def _dispatch(self):
+        while True:
+            with self.cond:
+                while not self.pending and not self.stopping:
+                    self.cond.wait()
+                if not self.pending:
+                    return
+
+                # Let a burst of files collect into one session
+                if not self.stopping and len(self.pending) < BATCH_MAX:
+                    self.cond.wait_for(lambda: self.stopping or len(self.pending) >= BATCH_MAX,
+                                       timeout=self.batch_wait)
+                batch, self.pending = self.pending[:BATCH_MAX], self.pending[BATCH_MAX:]
+
+            self.pool.submit(self._ship, batch)
+
+    def _ssh(self, command: str, timeout: float = 300) -> subprocess.CompletedProcess:
+        return subprocess.run([*shlex.split(self.ssh), "-p", self.port, self.host, command],
+                              capture_output=True, text=True, timeout=timeout)
+
+    def _ship(self, batch: list):
+        results = {}
+        staging = Path(tempfile.mkdtemp(prefix="archive-"))
+        try:
+            # Recording → file to send (FLAC in staging, or the recording itself).
+            # Everything lands in one remote dir, so a name may only be sent once per batch.
+            sends = {}
+            senders = {}    # remote name -> recording sending it
+            for path, _ in batch:
+                if path in sends or path in results:
+                    continue
+                try:
+                    if not path.exists():
+                        results[path] = {"ok": False, "error": "file disappeared"}
+                        continue
+                    send = path
+                    flac_path = staging / f"{path.stem}.flac"
+                    if self.compress and flac_path.name in senders:
+                        send = flac_path    # Don't overwrite the staged copy - rejected below
+                    elif self.compress and to_flac(path, flac_path):
+                        send = flac_path
+                except Exception as e:
+                    results[path] = {"ok": False, "error": f"FLAC encode: {e}"}
+                    continue
+                if send.name in senders:
+                    results[path] = {"ok": False, "error": f"name {send.name} collides with "
+                                     f"{senders[send.name]} in the same batch"}
+                    continue
+                senders[send.name] = path
+                sends[path] = send
+
+            if sends:
+                results.update(self._transfer(sends))
+        except Exception as e:
+            for path, _ in batch:
+                results.setdefault(path, {"ok": False, "error": str(e)})
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+
+        for path, future in batch:
+            result = results.get(path) or {"ok": False, "error": "not transferred"}
+            result.setdefault("error", None)
+            future.set_result(result)
+
+    def _transfer(self, sends: dict) -> dict:
+        """rsync the files (one session per source directory), then verify on the NAS"""
+        local_hashes = {path: file_hash(send) for path, send in sends.items()}
+        total = sum(send.stat().st_size for send in sends.values())
+        log(f"Archiving {len(sends)} file(s) to NAS ({total / 1e6:.1f} MB)"
+            f"{' as FLAC' if any(s.suffix == '.flac' for s in sends.values()) else ''}")
+
+        result = self._ssh(f"mkdir -p {shlex.quote(self.remote_dir)}")
+        if result.returncode != 0:
+            error = f"NAS unreachable: {result.stderr.strip()[-200:]}"
+            return {path: {"ok": False, "error": error} for path in sends}
+
+        by_dir = {}
+        for path, send in sends.items():
+            by_dir.setdefault(send.parent, []).append(send.name)
+
+        failed = {}
+        for source_dir, names in by_dir.items():
+            with tempfile.NamedTemporaryFile("w", suffix=".list") as file_list:
+                file_list.write("\n".join(names) + "\n")
+                file_list.flush()
+                result = subprocess.run([
+                    "rsync", "-t", "--partial", "--checksum",
+                    f"--files-from={file_list.name}",
+                    "-e", f"{self.ssh} -p {self.port}",
+                    f"{source_dir}/",
+                    f"{self.host}:{self.remote_dir}/"
+                ], capture_output=True, text=True, timeout=TRANSFER_TIMEOUT)
+            if result.returncode != 0:
+                for name in names:
+                    failed[name] = f"rsync exit {result.returncode}: {result.stderr.strip()[-200:]}"
+
+        # Verify what arrived, in one round trip
+        names = [send.name for send in sends.values() if send.name not in failed]
+        remote_hashes = {}
+        if names:
+            result = self._ssh(f"cd {shlex.quote(self.remote_dir)} && sha256sum -- "
+                               + " ".join(shlex.quote(n) for n in names))
+            for line in result.stdout.splitlines():
+                digest, _, name = line.partition("  ")
+                remote_hashes[name.strip()] = digest.strip()
+
+        results = {}
+        for path, send in sends.items():
+            remote = f"{self.remote_dir}/{send.name}"
+            if send.name in failed:
+                results[path] = {"ok": False, "error": failed[send.name]}
+            elif remote_hashes.get(send.name) != local_hashes[path]:
+                results[path] = {"ok": False, "error": "checksum mismatch on NAS"}
+            else:
+                results[path] = {"ok": True, "remote": remote, "sha256": local_hashes[path],
+                                 "bytes": send.stat().st_size}
+
+        ok = sum(r["ok"] for r in results.values())
+        log(f"  {'✓' if ok == len(results) else '⚠'} Archived {ok}/{len(results)} (verified)")
+        for path, r in results.items():
+            if not r["ok"]:
+                log(f"  ✗ {path.name}: {r['error']}")
+        return results
+
+
+def main():
+    import argparse
+    import sys
+
+    from ledger import Ledger
+
+    parser = argparse.ArgumentParser(description="Archive recordings to the NAS (rsync + sha256 verify)")
+    parser.add_argument("files", nargs="+", help="Recordings to archive")
+    parser.add_argument("--flac", action="store_true", help="Compress PCM WAVs to FLAC before transfer")
+    parser.add_argument("--no-ledger", action="store_true", help="Don't record results in the ledger")
+    args = parser.parse_args()
+
+    ledger = None if args.no_ledger else Ledger()
+    archiver = Archiver(compress=args.flac, batch_wait=0)
+    futures = {Path(f): archiver.submit(f) for f in args.files}
+    archiver.shutdown()
+
+    failures = 0
+    for path, future in futures.items():
+        result = future.result()
+        failures += not result["ok"]
+        if ledger and path.exists():
+            digest = ledger.register(path)["hash"]
+            ledger.mark(digest, "archived", output=result.get("remote"), error=result["error"])
+        print(f"{'✓' if result['ok'] else '✗'} {path.name}"
+              f"{' → ' + result['remote'] if result['ok'] else ': ' + result['error']}")
+
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
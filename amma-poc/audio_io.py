@@ -0,0 +1,387 @@
+#!/usr/bin/env python3
+"""
+Audio I/O and Resampling
+Shared by the call server and the recording pipeline, so audio is brought
+to the canonical training format once, in-process, instead of by an
+ffmpeg subprocess per file and per stage.
+
+Formats:
+    CANONICAL_RATE (22.05 kHz mono, 16-bit)     - training / separation
+    WHISPER_RATE   (16 kHz mono float32)        - transcription
+
+Storage: pipeline outputs are written as STORAGE_FORMAT - lossless FLAC
+by default (about half the size of WAV for speech), or "wav" via the
+AUDIO_FORMAT env. FLAC goes through soundfile (pip install soundfile);
+without it everything stays WAV. Readers accept both.
+
+Resampling is polyphase (Kaiser-windowed sinc, same design as
+scipy.signal.resample_poly), vectorized over blocks of output samples.
+Resampler works on a stream of chunks; resample() is the one-shot form
+and uses scipy when it is installed.
+
+load_audio() decodes a recording once (in-process for WAV/FLAC, a single
+ffmpeg pipe otherwise); every consumer - conversion, Whisper, separation -
+takes its view from the same decoded array instead of decoding again.
+
+Usage:
+    from audio_io import load_audio, write_audio
+    audio = load_audio("call.flac")
+    write_audio("call_processed.flac", audio.canonical)    # 22.05 kHz
+    model.transcribe(audio.whisper)                         # 16 kHz float32
+"""
+
+import os
+import subprocess
+import wave
+from math import gcd
+from pathlib import Path
+
+import numpy as np
+
+try:
+    import soundfile
+except ImportError:
+    soundfile = None
+
+CANONICAL_RATE = 22050
+WHISPER_RATE = 16000
+
+# Extensions the pipeline reads as recordings
+AUDIO_SUFFIXES = (".wav", ".flac")
+
+STORAGE_FORMAT = os.getenv("AUDIO_FORMAT", "flac" if soundfile else "wav").lower()
+if STORAGE_FORMAT == "flac" and soundfile is None:
+    STORAGE_FORMAT = "wav"
+STORAGE_SUFFIX = f".{STORAGE_FORMAT}"
+
+# WAV sample formats FLAC stores losslessly (float WAVs stay WAV)
+FLAC_SUBTYPES = {"PCM_16", "PCM_24", "PCM_U8"}
+
+# Filter design (matches scipy.signal.resample_poly defaults)
+FILTER_ZERO_CROSSINGS = 10
+KAISER_BETA = 5.0
+
+# Output samples computed per vectorized block (bounds memory on long files)
+BLOCK_SAMPLES = 65536
+
+_filter_banks = {}
+
+
+def _filter_bank(up: int, down: int):
+    """
+    Polyphase decomposition of the anti-aliasing low-pass filter
+    Returns: (bank[phase, tap], half_len) - bank[p, k] = h[p + k * up]
+    """
+    key = (up, down)
+    if key not in _filter_banks:
+        max_rate = max(up, down)
+        half_len = FILTER_ZERO_CROSSINGS * max_rate
+        n = np.arange(-half_len, half_len + 1)
+
+        h = np.sinc(n / max_rate) * np.kaiser(2 * half_len + 1, KAISER_BETA)
+        h *= up / h.sum()   # Unity DC gain after zero-stuffing
+
+        taps = -(-len(h) // up)
+        h = np.pad(h, (0, taps * up - len(h)))
+        _filter_banks[key] = (h.reshape(taps, up).T.astype(np.float32), half_len)
+
+    return _filter_banks[key]
+
+
+class Resampler:
+    """Streaming rational-ratio resampler (float32 in, float32 out)"""
+
+    def __init__(self, orig_rate: int, target_rate: int):
+        g = gcd(orig_rate, target_rate)
+        self.up = target_rate // g
+        self.down = orig_rate // g
+        self.bank, self.half_len = _filter_bank(self.up, self.down)
+        self.taps = self.bank.shape[1]
+
+        # Input history; samples before the stream start count as zeros
+        self.history = np.zeros(self.taps, dtype=np.float32)
+        self.offset = -self.taps    # Absolute input index of history[0]
+        self.total_in = 0
+        self.total_out = 0
+
+    def _base(self, n):
+        """Input index of the newest sample contributing to output n"""
+        return (n * self.down + self.half_len) // self.up
+
+    def _run(self, end: int) -> np.ndarray:
+        start = self.total_out
+        out = np.empty(max(end - start, 0), dtype=np.float32)
+        k = np.arange(self.taps)
+
+        for block in range(start, end, BLOCK_SAMPLES):
+            n = np.arange(block, min(block + BLOCK_SAMPLES, end))
+            t = n * self.down + self.half_len
+            idx = (t // self.up - self.offset)[:, None] - k
+            out[block - start:block - start + len(n)] = np.einsum(
+                "ij,ij->i", self.bank[t % self.up], self.history[idx])
+
+        self.total_out = max(end, start)
+        return out
+
+    def process(self, samples: np.ndarray) -> np.ndarray:
+        """Resample the next chunk. Returns every output sample that is complete so far."""
+        samples = np.asarray(samples, dtype=np.float32)
+        self.history = np.concatenate([self.history, samples])
+        self.total_in += len(samples)
+
+        # Outputs whose newest input sample has arrived
+        out = self._run(-(-(self.total_in * self.up - self.half_len) // self.down))
+
+        # Keep only the history future outputs still need
+        drop = self._base(self.total_out) - self.taps + 1 - self.offset
+        if drop > 0:
+            self.history = self.history[drop:]
+            self.offset += drop
+        return out
+
+    def flush(self) -> np.ndarray:
+        """Remaining output at the end of the stream (input treated as zero-padded)"""
+        end = -(-self.total_in * self.up // self.down)
+        if end <= self.total_out:
+            return np.zeros(0, dtype=np.float32)
+
+        missing = self._base(end - 1) + 1 - (self.offset + len(self.history))
+        if missing > 0:
+            self.history = np.concatenate([self.history, np.zeros(missing, dtype=np.float32)])
+        return self._run(end)
+
+
+def resample(samples: np.ndarray, orig_rate: int, target_rate: int) -> np.ndarray:
+    """
+    Resample a whole buffer
+    Returns: float32 samples, ceil(len * target / orig) long
+    """
+    samples = np.asarray(samples, dtype=np.float32)
+    if orig_rate == target_rate or len(samples) == 0:
+        return samples
+
+    try:
+        from scipy.signal import resample_poly
+    except ImportError:
+        resampler = Resampler(orig_rate, target_rate)
+        return np.concatenate([resampler.process(samples), resampler.flush()])
+
+    g = gcd(orig_rate, target_rate)
+    return resample_poly(samples, target_rate // g, orig_rate // g).astype(np.float32)
+
+
+def wav_info(path: Path):
+    """(sample_rate, channels, sample_width) of a PCM WAV, or None if not one"""
+    try:
+        with wave.open(str(path), "rb") as w:
+            return w.getframerate(), w.getnchannels(), w.getsampwidth()
+    except (wave.Error, EOFError, OSError):
+        return None
+
+
+def read_wav(path: Path):
+    """
+    Decode a PCM WAV to mono float32 in [-1, 1)
+    Returns: (samples, sample_rate)
+    """
+    with wave.open(str(path), "rb") as w:
+        rate, channels, width = w.getframerate(), w.getnchannels(), w.getsampwidth()
+        raw = w.readframes(w.getnframes())
+
+    if width == 1:
+        samples = (np.frombuffer(raw, dtype=np.uint8).astype(np.float32) - 128) / 128.0
+    elif width == 3:
+        b = np.frombuffer(raw, dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+        samples = ((b[:, 0] << 8 | b[:, 1] << 16 | b[:, 2] << 24) >> 8).astype(np.float32) / 8388608.0
+    else:
+        dtype = {2: "<i2", 4: "<i4"}[width]
+        samples = np.frombuffer(raw, dtype=dtype).astype(np.float32) / float(2 ** (8 * width - 1))
+
+    if channels > 1:
+        samples = samples[:len(samples) // channels * channels].reshape(-1, channels).mean(axis=1)
+    return samples, rate
+
+
+def audio_info(path: Path):
+    """(sample_rate, channels, sample_width) of a PCM WAV or FLAC, or None"""
+    path = Path(path)
+    if path.suffix.lower() != ".flac":
+        return wav_info(path)
+    if soundfile is None:
+        return None
+    try:
+        info = soundfile.info(str(path))
+    except (RuntimeError, OSError):
+        return None
+    width = {"PCM_S8": 1, "PCM_16": 2, "PCM_24": 3}.get(info.subtype)
+    return (info.samplerate, info.channels, width) if width else None
+
+
+def is_canonical(path: Path, storage: bool = False) -> bool:
+    """
+    True if the file is already 22.05 kHz mono 16-bit
+    With `storage`, it must also be in STORAGE_FORMAT (so it can be kept as is).
+    """
+    if storage and Path(path).suffix.lower() != STORAGE_SUFFIX:
+        return False
+    return audio_info(path) == (CANONICAL_RATE, 1, 2)
+
+
+def read_audio(path: Path):
+    """
+    Decode a PCM WAV or FLAC to mono float32 in [-1, 1)
+    Returns: (samples, sample_rate)
+    """
+    if Path(path).suffix.lower() != ".flac":
+        return read_wav(path)
+
+    samples, rate = soundfile.read(str(path), dtype="float32", always_2d=True)
+    return samples.mean(axis=1) if samples.shape[1] > 1 else samples[:, 0], rate
+
+
+def to_pcm16(samples: np.ndarray) -> bytes:
+    """float32 in [-1, 1) → 16-bit little-endian PCM"""
+    return np.clip(np.round(samples * 32768.0), -32768, 32767).astype("<i2").tobytes()
+
+
+def write_wav(path: Path, samples: np.ndarray, sample_rate: int = CANONICAL_RATE):
+    """Write mono float32 samples as a 16-bit PCM WAV"""
+    with wave.open(str(path), "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(sample_rate)
+        w.writeframes(to_pcm16(samples))
+
+
+def write_audio(path: Path, samples: np.ndarray, sample_rate: int = CANONICAL_RATE):
+    """Write mono float32 samples as 16-bit WAV or FLAC (by the path's extension)"""
+    if Path(path).suffix.lower() != ".flac":
+        write_wav(path, samples, sample_rate)
+        return
+    pcm = np.frombuffer(to_pcm16(samples), dtype="<i2")
+    soundfile.write(str(path), pcm, sample_rate, subtype="PCM_16", format="FLAC")
+
+
+class Audio:
+    """One decoded recording (mono float32) with cached resampled views"""
+
+    def __init__(self, samples: np.ndarray, rate: int, path: Path = None):
+        self.samples = samples
+        self.rate = rate
+        self.path = Path(path) if path else None
+        self._views = {rate: samples}
+
+    def at(self, rate: int) -> np.ndarray:
+        """The recording at `rate` (resampled once, then cached)"""
+        if rate not in self._views:
+            self._views[rate] = resample(self.samples, self.rate, rate)
+        return self._views[rate]
+
+    @property
+    def canonical(self) -> np.ndarray:
+        return self.at(CANONICAL_RATE)
+
+    @property
+    def whisper(self) -> np.ndarray:
+        return self.at(WHISPER_RATE)
+
+    @property
+    def duration(self) -> float:
+        return len(self.samples) / self.rate
+
+
+def load_audio(path: Path, ffmpeg: str = "ffmpeg") -> Audio:
+    """
+    Decode a recording once into memory
+    WAV/FLAC are read in-process; anything else (m4a, mp3, ...) goes through
+    one ffmpeg pipe straight to float32 at CANONICAL_RATE.
+    Raises: OSError / RuntimeError if the file can't be decoded
+    """
+    path = Path(path)
+    if not path.exists():
+        raise FileNotFoundError(f"File not found: {path}")
+    if audio_info(path) is not None:
+        samples, rate = read_audio(path)
+        return Audio(samples, rate, path)
+
+    result = subprocess.run(
+        [ffmpeg, "-v", "error", "-i", str(path), "-f", "f32le", "-ac", "1", "-ar", str(CANONICAL_RATE), "-"],
+        capture_output=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"ffmpeg could not decode {path.name}: {result.stderr.decode(errors='replace')[-200:]}")
+    return Audio(np.frombuffer(result.stdout, dtype="<f4").copy(), CANONICAL_RATE, path)
+
+
+def prefetch_audio(paths, ahead: int = 1, ffmpeg: str = "ffmpeg", prepare=None):
+    """
+    Decode recordings on a background thread, `ahead` files in front of
+    the consumer, so the next file is decoded while the current one is
+    being transcribed / processed. `prepare(path, audio)` also runs on
+    that thread (e.g. resampling, writing the converted file).
+    Decoding starts right away, before the first item is asked for.
+    Returns: iterator of (path, Audio - or prepare()'s result - or the exception that stopped it)
+    """
+    import queue
+    import threading
+
+    ready = queue.Queue(maxsize=ahead)
+    done = object()
+
+    def produce():
+        for path in paths:
+            try:
+                audio = load_audio(path, ffmpeg)
+                ready.put((path, prepare(path, audio) if prepare else audio))
+            except Exception as e:
+                ready.put((path, e))
+        ready.put(done)
+
+    def consume():
+        while True:
+            item = ready.get()
+            if item is done:
+                return
+            yield item
+
+    threading.Thread(target=produce, daemon=True).start()
+    return consume()
+
+
+def storage_path(path: Path) -> Path:
+    """`path` with the storage format's extension"""
+    return Path(path).with_suffix(STORAGE_SUFFIX)
+
+
+def to_flac(wav_path: Path, flac_path: Path) -> bool:
+    """
+    Losslessly re-encode a PCM WAV as FLAC (same rate, channels, bit depth)
+    Returns: False if soundfile is missing or the WAV isn't integer PCM
+    """
+    if soundfile is None:
+        return False
+    info = soundfile.info(str(wav_path))
+    if info.format != "WAV" or info.subtype not in FLAC_SUBTYPES:
+        return False
+
+    subtype = "PCM_24" if info.subtype == "PCM_24" else "PCM_16"
+    dtype = "int32" if subtype == "PCM_24" else "int16"
+    with soundfile.SoundFile(str(wav_path)) as src, \
+            soundfile.SoundFile(str(flac_path), "w", info.samplerate, info.channels, subtype,
+                                format="FLAC") as dst:
+        for block in src.blocks(blocksize=1 << 16, dtype=dtype, always_2d=True):
+            dst.write(block)
+    return True
+
+
+def same_audio(a: Path, b: Path) -> bool:
+    """True if two files (WAV/FLAC) decode to identical samples - for verifying lossless copies"""
+    if soundfile is None:
+        return False
+    with soundfile.SoundFile(str(a)) as fa, soundfile.SoundFile(str(b)) as fb:
+        if (fa.samplerate, fa.channels, fa.frames) != (fb.samplerate, fb.channels, fb.frames):
+            return False
+        for block_a, block_b in zip(fa.blocks(1 << 16, dtype="int32"), fb.blocks(1 << 16, dtype="int32")):
+            if not np.array_equal(block_a, block_b):
+                return False
+    return True
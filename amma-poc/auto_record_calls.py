@@ -6,180 +6,385 @@ Automatically detects when a WhatsApp call is active and starts recording.
 Usage:
     python auto_record_calls.py
     python auto_record_calls.py --person amma
+    python auto_record_calls.py --silence 30 --device "Aggregate Device"
+    python auto_record_calls.py --list-devices
+
+Testing without a call (a recording is played through the detector as if
+it were the capture device; --speed 0 = as fast as possible):
+    python auto_record_calls.py --input-file test_call.flac --speed 0 --output /tmp/rec
 
 Naming Convention:
-    {person}_whatsapp_{YYYYMMDD}_{HHMM}_{minutes}min.wav
+    {person}_whatsapp_{YYYYMMDD}_{HHMM}_{minutes}min.flac
     Examples:
-        amma_whatsapp_20241217_1423_15min.wav
-        chinna_whatsapp_20241217_2230_8min.wav
+        amma_whatsapp_20241217_1423_15min.flac
+        chinna_whatsapp_20241217_2230_8min.flac
+    (.wav with AUDIO_FORMAT=wav, see audio_io.py)
 
 Requirements:
     - BlackHole 2ch installed (virtual audio device)
     - Multi-Output Device configured (Speakers + BlackHole)
     - Aggregate Device configured (Mic + BlackHole)
     - System audio output set to Multi-Output Device
+    - pip install sounddevice soundfile
 
 How it works:
-    1. Monitors WhatsApp CPU usage (call = ~15-30% vs chat = ~2-5%)
-    2. Detects audio activity
-    3. When both conditions met → starts recording
-    4. After 15s of silence → stops and saves recording
+    1. Captures continuously, in-process (PortAudio callback), into a
+       fixed-size NumPy ring buffer that always holds the last few seconds
+    2. Energy VAD: a block is speech when its RMS is well above the
+       adaptive noise floor
+    3. TRIGGER_SECONDS of speech within TRIGGER_WINDOW → starts recording,
+       a few hundred ms after the first word
+    4. The last --pre-roll seconds (default 2) are flushed from the ring
+       into a streaming FLAC writer, followed by live audio from the same
+       ring position - no subprocess start-up, no gap
+    5. After --silence seconds (default 15) without speech → stops and saves
 """
 
-import subprocess
-import time
-import os
 import argparse
-from datetime import datetime
+import threading
+import time
+from collections import deque
+from datetime import datetime, timedelta
 from pathlib import Path
 
+import numpy as np
+
+from audio_io import STORAGE_FORMAT, STORAGE_SUFFIX, soundfile
+
 # Configuration
-WHATSAPP_CPU_THRESHOLD = 10.0  # CPU% above this = likely call
+SAMPLE_RATE = 22050
+CHANNELS = 2  # Aggregate Device: mic + BlackHole
+BLOCK_SECONDS = 0.02
 SILENCE_TIMEOUT = 15  # Seconds of silence before stopping
-CHECK_INTERVAL = 10  # Seconds between checks (saves CPU)
 OUTPUT_DIR = Path(__file__).parent / "voice" / "raw"
 DEFAULT_PERSON = "amma"  # Default person name for recordings
 
-# Recording state
-is_recording = False
-recording_process = None
-current_recording_file = None
-temp_recording_file = None  # Temporary name until we know duration
-recording_start_time = None
-silence_counter = 0
-person_name = DEFAULT_PERSON
-
-
-def get_whatsapp_cpu():
-    """Get WhatsApp CPU usage percentage"""
-    try:
-        result = subprocess.run(
-            ["ps", "-A", "-o", "%cpu,comm"],
-            capture_output=True, text=True
-        )
-        for line in result.stdout.split('\n'):
-            if 'WhatsApp' in line:
-                try:
-                    cpu = float(line.strip().split()[0])
-                    return cpu
-                except (ValueError, IndexError):
-                    pass
-        return 0.0
-    except Exception as e:
-        print(f"Error checking WhatsApp CPU: {e}")
-        return 0.0
-
-
-def is_audio_active():
-    """Check if there's audio activity (simple check)"""
-    # On Mac, we check if any audio is flowing through the system
-    # This is a simplified check - in production, you'd use pyaudio to check levels
-    try:
-        # Check if WhatsApp is using significant CPU (proxy for audio activity)
-        cpu = get_whatsapp_cpu()
-        return cpu > 5.0  # Any significant activity
-    except:
-        return False
-
-
-def start_recording():
-    """Start recording audio"""
-    global is_recording, recording_process, temp_recording_file, recording_start_time
-
-    if is_recording:
-        return
-
-    # Create output directory if needed
-    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
-
-    # Record start time for duration calculation
-    recording_start_time = datetime.now()
-
-    # Use temporary filename - will rename when we know duration
-    temp_recording_file = OUTPUT_DIR / f"_recording_in_progress.wav"
-
-    print(f"\n{'='*60}")
-    print(f"🎙️  RECORDING STARTED")
-    print(f"   Person: {person_name}")
-    print(f"   Time: {recording_start_time.strftime('%Y-%m-%d %H:%M')}")
-    print(f"{'='*60}")
+# VAD (energy detector as in server/streaming.py)
+VAD_MIN_DB = -50.0          # Never treat anything quieter as speech
+VAD_MARGIN_DB = 12.0        # Speech = this much above the noise floor
+VAD_NOISE_WINDOW = 5.0      # Noise floor = VAD_NOISE_PERCENTILE of the levels over this many seconds
+VAD_NOISE_PERCENTILE = 10
+TRIGGER_SECONDS = 0.2       # Speech needed within TRIGGER_WINDOW to start
+TRIGGER_WINDOW = 0.5
+PRE_ROLL = 2.0              # Seconds kept from before the trigger
+MIN_SPEECH = 3.0            # Recordings with less speech are discarded (notification sounds etc.)
+
+# Ring buffer = pre-roll + this much headroom for the writer falling behind (disk stalls)
+RING_HEADROOM = 10.0
+
+
+class RingBuffer:
+    """
+    Fixed-size float32 (frames × channels) buffer addressed by absolute frame
+    index - written by the capture thread, read by the recorder
+    """
+
+    def __init__(self, frames: int, channels: int):
+        self.size = frames
+        self.data = np.zeros((frames, channels), dtype=np.float32)
+        self.total = 0  # Frames written since capture started (updated last)
+
+    def write(self, block: np.ndarray):
+        n = len(block)
+        if n >= self.size:
+            block = block[-self.size:]
+            self.total += n - self.size
+            n = self.size
+
+        start = self.total % self.size
+        first = min(n, self.size - start)
+        self.data[start:start + first] = block[:first]
+        self.data[:n - first] = block[first:]
+        self.total += n
+
+    def read(self, start: int, end: int) -> np.ndarray:
+        """Frames [start, end) - start is clamped to what is still buffered"""
+        start = max(start, self.total - self.size, 0)
+        end = min(end, self.total)
+        if end <= start:
+            return np.zeros((0, self.data.shape[1]), dtype=np.float32)
+
+        idx = np.arange(start, end) % self.size
+        return self.data[idx]
+
+
+class AudioInput:
+    """Capture source: a thread fills `ring`, the recorder waits for frames"""
+
+    def __init__(self, sample_rate: int, channels: int, buffer_seconds: float):
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.ring = RingBuffer(int(buffer_seconds * sample_rate), channels)
+        self.ready = threading.Event()
+        self.finished = False
+        self.started = None     # Wall clock time of frame 0
+        self.consumed = 0       # Frames the recorder has read (back-pressure for file input)
+
+    def _push(self, block: np.ndarray):
+        if self.started is None:
+            self.started = datetime.now()
+        self.ring.write(block)
+        self.ready.set()
+
+    def wait(self, position: int, timeout: float = 1.0) -> int:
+        """Block until frames past `position` arrive (or the input ends). Returns: frames written"""
+        self.ready.clear()
+        if self.ring.total <= position and not self.finished:
+            self.ready.wait(timeout)
+        return self.ring.total
+
+    def time_at(self, position: int) -> datetime:
+        """Wall clock time of an absolute frame index"""
+        return (self.started or datetime.now()) + timedelta(seconds=position / self.sample_rate)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        pass
+
+
+class DeviceInput(AudioInput):
+    """PortAudio capture (sounddevice) - the callback only copies into the ring"""
+
+    def __init__(self, device=None, sample_rate: int = SAMPLE_RATE, channels: int = CHANNELS,
+                 buffer_seconds: float = PRE_ROLL + RING_HEADROOM):
+        import sounddevice as sd
+
+        super().__init__(sample_rate, channels, buffer_seconds)
+        self.name = sd.query_devices(device, kind="input")["name"]
+        self.stream = sd.InputStream(device=device, channels=channels, samplerate=sample_rate,
+                                     blocksize=int(BLOCK_SECONDS * sample_rate), dtype="float32",
+                                     callback=self._callback)
+        self.stream.start()
+
+    def _callback(self, indata, frames, time_info, status):
+        if status:
+            print(f"   Audio: {status}")
+        self._push(indata)
+
+    def close(self):
+        self.stream.stop()
+        self.stream.close()
+        self.finished = True
+
+
+class FileInput(AudioInput):
+    """
+    Fake capture device: plays a recording into the ring in BLOCK_SECONDS
+    blocks at `speed` × real time (0 = as fast as the recorder keeps up)
+    """
+
+    def __init__(self, path: Path, speed: float = 1.0, buffer_seconds: float = PRE_ROLL + RING_HEADROOM):
+        info = soundfile.info(str(path))
+        super().__init__(info.samplerate, info.channels, buffer_seconds)
+        self.name = f"file {path}"
+        self.path = Path(path)
+        self.speed = speed
+        self.thread = threading.Thread(target=self._play, daemon=True)
+        self.thread.start()
+
+    def _play(self):
+        block_frames = int(BLOCK_SECONDS * self.sample_rate)
+        clock = time.monotonic()
+        try:
+            for block in soundfile.blocks(str(self.path), blocksize=block_frames, dtype="float32", always_2d=True):
+                if self.speed > 0:
+                    clock += len(block) / self.sample_rate / self.speed
+                    time.sleep(max(0.0, clock - time.monotonic()))
+                else:
+                    # Don't lap the reader - a real device can't outrun it either
+                    while self.ring.total - self.consumed > self.ring.size - 2 * block_frames:
+                        time.sleep(0.001)
+                self._push(block)
+        finally:
+            self.finished = True
+            self.ready.set()
+
+
+def block_db(block: np.ndarray) -> float:
+    """RMS level of a block (frames × channels) in dBFS"""
+    rms = float(np.sqrt(np.mean(block * block)) + 1e-9)
+    return 20 * np.log10(rms)
+
+
+class LevelMonitor:
+    """
+    Streaming energy VAD with an adaptive noise floor: a low percentile of
+    every block's level over the last VAD_NOISE_WINDOW seconds. Steady
+    background noise, however loud, becomes the floor within a few seconds,
+    while the pauses between words keep it down during a conversation.
+    """
+
+    def __init__(self):
+        self.noise_db = VAD_MIN_DB
+        self.db = VAD_MIN_DB
+        self.history = deque(maxlen=round(VAD_NOISE_WINDOW / BLOCK_SECONDS))
+
+    def voiced(self, block: np.ndarray) -> bool:
+        self.db = block_db(block)
+        self.history.append(self.db)
+        self.noise_db = float(np.percentile(self.history, VAD_NOISE_PERCENTILE))
+        return self.db > max(self.noise_db + VAD_MARGIN_DB, VAD_MIN_DB)
+
+
+class CallRecorder:
+    """
+    Turns a capture stream into call recordings: starts on speech (with the
+    pre-roll from the input's ring buffer), stops after `silence_timeout`
+    seconds without it
+    """
+
+    def __init__(self, person: str = DEFAULT_PERSON, output_dir: Path = OUTPUT_DIR,
+                 silence_timeout: float = SILENCE_TIMEOUT, pre_roll: float = PRE_ROLL):
+        self.person = person
+        self.output_dir = Path(output_dir)
+        self.silence_timeout = silence_timeout
+        self.pre_roll = pre_roll
+
+        self.level = LevelMonitor()
+        self.recent = deque(maxlen=round(TRIGGER_WINDOW / BLOCK_SECONDS))    # voiced flags
+        self.saved = []
+
+        # Recording state
+        self.writer = None
+        self.temp_file = self.output_dir / f"_recording_in_progress{STORAGE_SUFFIX}"
+        self.start_time = None
+        self.frames = 0             # Frames written to the current recording
+        self.speech_frames = 0
+        self.last_voice = 0         # self.frames at the last speech block
+        self.announced = 0          # Silence seconds already reported
+        self.dropped = 0            # Frames lost to the ring overrunning
+
+    @property
+    def recording(self) -> bool:
+        return self.writer is not None
+
+    def run(self, source: AudioInput):
+        """Consume `source` block by block until it ends (file input) or Ctrl+C"""
+        self.sample_rate = source.sample_rate
+        self.channels = source.channels
+        block_frames = int(BLOCK_SECONDS * source.sample_rate)
+        ring = source.ring
+        position = 0
 
-    # Use sox to record from Aggregate Device
-    # The Aggregate Device should combine mic + BlackHole (system audio)
-    # Try multiple paths for sox (homebrew installs to /opt/homebrew/bin on Apple Silicon)
-    sox_paths = ["/opt/homebrew/bin/sox", "/usr/local/bin/sox", "sox"]
-    sox_found = False
+        while True:
+            total = source.wait(position + block_frames)
+            if total - position > ring.size:
+                # Writer stalled longer than the ring covers - skip to what is still there
+                skipped = total - ring.size + block_frames - position
+                self.dropped += skipped
+                position += skipped
+                print(f"   ⚠ Capture overrun: dropped {skipped / self.sample_rate:.1f}s")
+
+            while total - position >= block_frames:
+                self.feed(ring.read(position, position + block_frames), source, position)
+                position += block_frames
+                source.consumed = position
+
+            if source.finished and source.ring.total - position < block_frames:
+                if self.recording:
+                    self.stop()
+                return
+
+    def feed(self, block: np.ndarray, source: AudioInput, position: int):
+        """Process one float32 block (frames × channels) starting at absolute frame `position`"""
+        voiced = self.level.voiced(block)
+
+        if not self.recording:
+            self.recent.append(voiced)
+            if sum(self.recent) * BLOCK_SECONDS >= TRIGGER_SECONDS:
+                print(f"📞 Call detected! (level {self.level.db:.0f} dB, noise floor {self.level.noise_db:.0f} dB)")
+                start = max(position - int(self.pre_roll * self.sample_rate), source.ring.total - source.ring.size, 0)
+                self.start(source.ring.read(start, position), source.time_at(start))
+                self._write(block)
+            return
+
+        self._write(block)
+        if voiced:
+            self.last_voice = self.frames
+            self.speech_frames += len(block)
+            self.announced = 0
+            return
+
+        silence = (self.frames - self.last_voice) / self.sample_rate
+        if silence >= self.silence_timeout:
+            print(f"🔇 Silence detected ({self.silence_timeout:g}s), stopping...")
+            self.stop()
+        elif int(silence) // 5 > self.announced:
+            self.announced = int(silence) // 5
+            remaining = self.silence_timeout - silence
+            print(f"   Silence: {silence:.0f}s (stopping in {remaining:.0f}s if continues)")
+
+    def start(self, pre_roll: np.ndarray, start_time: datetime):
+        """Start a recording: the pre-roll first, live blocks follow from the same ring position"""
+        if self.recording:
+            return
+
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.recent.clear()
+
+        # The recording starts where the pre-roll does
+        pre_roll_seconds = len(pre_roll) / self.sample_rate
+        self.start_time = start_time
+        self.frames = self.last_voice = self.speech_frames = self.announced = 0
+
+        # Streaming FLAC (or WAV) - frames are encoded as they arrive
+        self.writer = soundfile.SoundFile(str(self.temp_file), "w", samplerate=self.sample_rate,
+                                          channels=self.channels, format=STORAGE_FORMAT.upper(),
+                                          subtype="PCM_16")
 
-    for sox_path in sox_paths:
-        try:
-            recording_process = subprocess.Popen([
-                sox_path,
-                "-d",  # Default input device (set to Aggregate Device in System Settings)
-                "-c", "2",  # Stereo
-                "-r", "22050",  # Sample rate
-                str(temp_recording_file)
-            ], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-            is_recording = True
-            sox_found = True
-            print(f"   Using: {sox_path}")
-            break
-        except FileNotFoundError:
-            continue
-
-    if not sox_found:
-        print("ERROR: sox not found. Trying ffmpeg...")
-        # Try ffmpeg as fallback
-        ffmpeg_paths = ["/opt/homebrew/bin/ffmpeg", "/usr/local/bin/ffmpeg", "ffmpeg"]
-        for ffmpeg_path in ffmpeg_paths:
-            try:
-                recording_process = subprocess.Popen([
-                    ffmpeg_path,
-                    "-f", "avfoundation",
-                    "-i", ":0",  # Default audio input
-                    "-ar", "22050",
-                    "-ac", "2",
-                    "-y",
-                    str(temp_recording_file)
-                ], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-                is_recording = True
-                print(f"   Using: {ffmpeg_path}")
-                break
-            except FileNotFoundError:
-                continue
-        else:
-            print("ERROR: Neither sox nor ffmpeg found!")
+        print(f"\n{'='*60}")
+        print(f"🎙️  RECORDING STARTED")
+        print(f"   Person: {self.person}")
+        print(f"   Time: {self.start_time.strftime('%Y-%m-%d %H:%M')}")
+        print(f"   Pre-roll: {pre_roll_seconds:.1f}s")
+        print(f"{'='*60}")
 
+        self._write(pre_roll)
+        self.last_voice = self.frames
+        self.speech_frames = int(TRIGGER_SECONDS * self.sample_rate)
 
-def stop_recording():
-    """Stop recording and save file with proper naming convention"""
-    global is_recording, recording_process, temp_recording_file, recording_start_time
+    def _write(self, block: np.ndarray):
+        self.writer.write(np.clip(block, -1.0, 1.0))
+        self.frames += len(block)
 
-    if not is_recording:
-        return
+    def stop(self):
+        """Stop recording and save file with proper naming convention"""
+        if not self.recording:
+            return
 
-    if recording_process:
-        recording_process.terminate()
-        recording_process.wait()
-        recording_process = None
+        self.writer.close()
+        self.writer = None
 
-    is_recording = False
+        duration_seconds = self.frames / self.sample_rate
+        if self.speech_frames / self.sample_rate < MIN_SPEECH:
+            print(f"   Discarded: only {self.speech_frames / self.sample_rate:.1f}s of speech")
+            self.temp_file.unlink(missing_ok=True)
+            return
 
-    if temp_recording_file and temp_recording_file.exists():
         # Calculate duration in minutes (rounded)
-        end_time = datetime.now()
-        duration_seconds = (end_time - recording_start_time).total_seconds()
         duration_minutes = round(duration_seconds / 60)
         if duration_minutes < 1:
             duration_minutes = 1  # Minimum 1 minute
 
-        # Create final filename: {person}_whatsapp_{YYYYMMDD}_{HHMM}_{minutes}min.wav
-        date_str = recording_start_time.strftime("%Y%m%d")
-        time_str = recording_start_time.strftime("%H%M")
-        final_filename = f"{person_name}_whatsapp_{date_str}_{time_str}_{duration_minutes}min.wav"
-        final_file = OUTPUT_DIR / final_filename
+        # Create final filename: {person}_whatsapp_{YYYYMMDD}_{HHMM}_{minutes}min.flac
+        date_str = self.start_time.strftime("%Y%m%d")
+        time_str = self.start_time.strftime("%H%M")
+        final_filename = f"{self.person}_whatsapp_{date_str}_{time_str}_{duration_minutes}min{STORAGE_SUFFIX}"
+        final_file = self.output_dir / final_filename
+        n = 2
+        while final_file.exists():
+            # Two short calls in the same minute
+            final_file = self.output_dir / final_filename.replace(STORAGE_SUFFIX, f"_{n}{STORAGE_SUFFIX}")
+            n += 1
+        final_filename = final_file.name
 
         # Rename temp file to final name
-        temp_recording_file.rename(final_file)
+        self.temp_file.rename(final_file)
 
         size_mb = final_file.stat().st_size / (1024 * 1024)
         print(f"\n{'='*60}")
@@ -189,54 +394,33 @@ def stop_recording():
         print(f"{'='*60}")
         print(f"\nNext: Run speaker separation to isolate Amma's voice:")
         print(f"  python ../tools/separate_speakers.py {final_file}")
-
-    temp_recording_file = None
-    recording_start_time = None
+        self.saved.append(final_file)
+        return final_file
 
 
-def monitor_calls():
+def monitor_calls(recorder: CallRecorder, source: AudioInput):
     """Main monitoring loop"""
-    global silence_counter
-
     print("\n" + "="*60)
     print("  WHATSAPP CALL AUTO-RECORDER")
     print("="*60)
-    print("\nMonitoring for WhatsApp calls...")
-    print(f"  - CPU threshold: {WHATSAPP_CPU_THRESHOLD}%")
-    print(f"  - Silence timeout: {SILENCE_TIMEOUT}s")
-    print(f"  - Output directory: {OUTPUT_DIR}")
+    print("\nListening for calls...")
+    print(f"  - Input: {source.name} ({source.sample_rate} Hz, {source.channels} ch)")
+    print(f"  - Pre-roll: {recorder.pre_roll:g}s, silence timeout: {recorder.silence_timeout:g}s")
+    print(f"  - Output directory: {recorder.output_dir}")
     print("\nMake sure:")
     print("  1. System audio output = Multi-Output Device")
     print("  2. System audio input = Aggregate Device")
     print("\nPress Ctrl+C to stop\n")
 
     try:
-        while True:
-            cpu = get_whatsapp_cpu()
-            call_active = cpu > WHATSAPP_CPU_THRESHOLD
-
-            if call_active:
-                if not is_recording:
-                    print(f"📞 Call detected! (WhatsApp CPU: {cpu:.1f}%)")
-                    start_recording()
-                silence_counter = 0
-            else:
-                if is_recording:
-                    silence_counter += CHECK_INTERVAL
-                    if silence_counter >= SILENCE_TIMEOUT:
-                        print(f"🔇 Silence detected ({SILENCE_TIMEOUT}s), stopping...")
-                        stop_recording()
-                        silence_counter = 0
-                    else:
-                        remaining = SILENCE_TIMEOUT - silence_counter
-                        print(f"   Silence: {silence_counter}s (stopping in {remaining}s if continues)")
-
-            time.sleep(CHECK_INTERVAL)
+        with source:
+            recorder.run(source)
+        print(f"\nInput ended: {len(recorder.saved)} recording(s) saved")
 
     except KeyboardInterrupt:
         print("\n\nStopping monitor...")
-        if is_recording:
-            stop_recording()
+        if recorder.recording:
+            recorder.stop()
         print("Done!")
 
 
@@ -244,7 +428,31 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Auto-record WhatsApp calls")
     parser.add_argument("--person", "-p", default=DEFAULT_PERSON,
                        help=f"Person name for recording (default: {DEFAULT_PERSON})")
+    parser.add_argument("--silence", type=float, default=SILENCE_TIMEOUT,
+                       help=f"Seconds of silence that end a call (default: {SILENCE_TIMEOUT})")
+    parser.add_argument("--pre-roll", type=float, default=PRE_ROLL,
+                       help=f"Seconds kept from before the call is detected (default: {PRE_ROLL:g})")
+    parser.add_argument("--device", "-d", default=None,
+                       help="Capture device name or index (default: system input)")
+    parser.add_argument("--list-devices", action="store_true", help="List audio devices and exit")
+    parser.add_argument("--input-file", type=Path,
+                       help="Use a recording as the capture device (testing)")
+    parser.add_argument("--speed", type=float, default=1.0,
+                       help="--input-file playback speed, 0 = as fast as possible (default: 1)")
+    parser.add_argument("--output", type=Path, default=OUTPUT_DIR,
+                       help=f"Output directory (default: {OUTPUT_DIR})")
     args = parser.parse_args()
 
-    person_name = args.person
-    monitor_calls()
+    if soundfile is None:
+        print("soundfile is required: pip install soundfile")
+    elif args.list_devices:
+        import sounddevice as sd
+        print(sd.query_devices())
+    else:
+        buffer_seconds = args.pre_roll + RING_HEADROOM
+        if args.input_file:
+            source = FileInput(args.input_file, args.speed, buffer_seconds)
+        else:
+            device = int(args.device) if args.device and args.device.isdigit() else args.device
+            source = DeviceInput(device, buffer_seconds=buffer_seconds)
+        monitor_calls(CallRecorder(args.person, args.output, args.silence, args.pre_roll), source)
@@ -0,0 +1,18 @@
+#!/bin/sh
+# Test double for ssh to the NAS: drops the ssh options and host and runs
+# the "remote" command locally. Point NAS_PATH at a scratch directory.
+#
+#   NAS_SSH=./fake_nas_ssh.sh NAS_PATH=/tmp/fake-nas python archive.py voice/raw/*.wav
+#
+# rsync works through it too (-e runs "fake_nas_ssh.sh -p PORT host rsync --server ...").
+
+while [ $# -gt 0 ]; do
+    case "$1" in
+        -p|-o|-i|-l|-F) shift 2 ;;
+        -*) shift ;;
+        *) break ;;
+    esac
+done
+shift   # host
+
+exec sh -c "$*"
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Processing Ledger
+Durable record of which recordings went through which pipeline stage,
+keyed by content hash, so the watcher resumes exactly where it stopped and
+a renamed copy of a finished recording is never processed twice.
+
+Stages: converted → separated → transcribed → archived
+
+Layout (voice/ledger.db):
+    recordings   # one row per unique content hash
+    paths        # every path seen, with size/mtime to skip re-hashing
+    stages       # (hash, stage) → done | failed, output path, error
+
+Usage:
+    python ledger.py              # summary
+    python ledger.py --pending    # recordings with unfinished stages
+"""
+
+import hashlib
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).parent
+LEDGER_PATH = SCRIPT_DIR / "voice" / "ledger.db"
+
+STAGES = ["converted", "separated", "transcribed", "archived"]
+
+HASH_CHUNK = 1024 * 1024
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS recordings (
+    hash TEXT PRIMARY KEY,
+    path TEXT NOT NULL,             -- first path this content was seen at
+    size INTEGER NOT NULL,
+    first_seen TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS paths (
+    path TEXT PRIMARY KEY,
+    hash TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS stages (
+    hash TEXT NOT NULL,
+    stage TEXT NOT NULL,
+    status TEXT NOT NULL,           -- done | failed
+    output TEXT,
+    error TEXT,
+    attempts INTEGER NOT NULL DEFAULT 1,
+    updated_at TEXT NOT NULL,
+    PRIMARY KEY (hash, stage)
+);
+"""
+
+
+def file_hash(path: Path) -> str:
+    """sha256 of a file's content"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class Ledger:
+    """Thread-safe SQLite ledger (one per process)"""
+
+    def __init__(self, path: Path = LEDGER_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(str(self.path), check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.executescript(SCHEMA)
+
+    def register(self, path: Path) -> dict:
+        """
+        Identify a recording by content (hashes only new or changed paths)
+        Returns: {"hash", "path" (first seen), "duplicate" (True if first seen under another path),
+                  "known" (True if this path was registered before, unchanged)}
+        """
+        path = Path(path).resolve()
+        stat = path.stat()
+
+        with self.lock:
+            row = self.db.execute("SELECT hash, size, mtime_ns FROM paths WHERE path = ?", (str(path),)).fetchone()
+        known = bool(row) and row[1] == stat.st_size and row[2] == stat.st_mtime_ns
+        if known:
+            digest = row[0]
+        else:
+            digest = file_hash(path)
+
+        now = datetime.now().isoformat()
+        with self.lock, self.db:
+            self.db.execute("INSERT OR REPLACE INTO paths (path, hash, size, mtime_ns) VALUES (?, ?, ?, ?)",
+                            (str(path), digest, stat.st_size, stat.st_mtime_ns))
+            self.db.execute("INSERT OR IGNORE INTO recordings (hash, path, size, first_seen) VALUES (?, ?, ?, ?)",
+                            (digest, str(path), stat.st_size, now))
+            first_path = self.db.execute("SELECT path FROM recordings WHERE hash = ?", (digest,)).fetchone()[0]
+
+        return {"hash": digest, "path": first_path, "duplicate": first_path != str(path), "known": known}
+
+    def alias(self, path: Path, digest: str, stat=None):
+        """
+        Record `path` as a different encoding of recording `digest` (e.g. the
+        FLAC that replaced its raw WAV), so register() maps it back without
+        treating it as new content. Pass `stat` to alias a file before it is
+        renamed into place.
+        """
+        path = Path(path).resolve()
+        stat = stat or path.stat()
+        with self.lock, self.db:
+            self.db.execute("INSERT OR REPLACE INTO paths (path, hash, size, mtime_ns) VALUES (?, ?, ?, ?)",
+                            (str(path), digest, stat.st_size, stat.st_mtime_ns))
+
+    def move_output(self, old: Path, new: Path) -> int:
+        """Point stage outputs recorded as `old` (relative or absolute) at `new`. Returns rows updated."""
+        old = Path(old).resolve()
+        with self.lock, self.db:
+            rows = self.db.execute("SELECT DISTINCT output FROM stages WHERE output LIKE ?",
+                                   (f"%{old.name}",)).fetchall()
+            matches = [r[0] for r in rows if Path(r[0]).resolve() == old]
+            return sum(self.db.execute("UPDATE stages SET output = ? WHERE output = ?",
+                                       (str(Path(new).resolve()), m)).rowcount for m in matches)
+
+    def status(self, digest: str) -> dict:
+        """stage → {"status", "output", "error", "attempts"}"""
+        with self.lock:
+            rows = self.db.execute(
+                "SELECT stage, status, output, error, attempts FROM stages WHERE hash = ?", (digest,)).fetchall()
+        return {r[0]: {"status": r[1], "output": r[2], "error": r[3], "attempts": r[4]} for r in rows}
+
+    def done(self, digest: str, stage: str) -> bool:
+        return self.status(digest).get(stage, {}).get("status") == "done"
+
+    def output(self, digest: str, stage: str):
+        """Recorded output path of a completed stage, or None"""
+        entry = self.status(digest).get(stage, {})
+        return entry.get("output") if entry.get("status") == "done" else None
+
+    def pending(self, digest: str, stages: list = STAGES) -> list:
+        """Stages (of `stages`, in order) not done yet"""
+        status = self.status(digest)
+        return [s for s in stages if status.get(s, {}).get("status") != "done"]
+
+    def mark(self, digest: str, stage: str, output=None, error: str = None):
+        """Record a stage result - done unless `error` is given"""
+        with self.lock, self.db:
+            self.db.execute(
+                "INSERT INTO stages (hash, stage, status, output, error, updated_at) VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (hash, stage) DO UPDATE SET status = excluded.status, output = excluded.output, "
+                "error = excluded.error, attempts = attempts + 1, updated_at = excluded.updated_at",
+                (digest, stage, "failed" if error else "done", str(output) if output else None, error,
+                 datetime.now().isoformat())
+            )
+
+    def incomplete(self, stages: list = STAGES) -> list:
+        """(hash, first path) of recordings with any of `stages` not done"""
+        marks = ",".join("?" * len(stages))
+        with self.lock:
+            rows = self.db.execute(
+                f"SELECT r.hash, r.path FROM recordings r WHERE "
+                f"(SELECT COUNT(*) FROM stages s WHERE s.hash = r.hash AND s.status = 'done' "
+                f"AND s.stage IN ({marks})) < ? ORDER BY r.first_seen",
+                [*stages, len(stages)]
+            ).fetchall()
+        return rows
+
+    def summary(self) -> dict:
+        with self.lock:
+            total = self.db.execute("SELECT COUNT(*) FROM recordings").fetchone()[0]
+            rows = self.db.execute("SELECT stage, status, COUNT(*) FROM stages GROUP BY stage, status").fetchall()
+        counts = {stage: {"done": 0, "failed": 0} for stage in STAGES}
+        for stage, status, count in rows:
+            counts.setdefault(stage, {})[status] = count
+        return {"recordings": total, "stages": counts}
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Recording pipeline ledger")
+    parser.add_argument("--pending", action="store_true", help="List recordings with unfinished stages")
+    args = parser.parse_args()
+
+    ledger = Ledger()
+    summary = ledger.summary()
+    print(f"Recordings: {summary['recordings']}")
+    for stage, counts in summary["stages"].items():
+        print(f"  {stage:12} done {counts.get('done', 0):5}   failed {counts.get('failed', 0):5}")
+
+    if args.pending:
+        print("\nPending:")
+        for digest, path in ledger.incomplete():
+            print(f"  {Path(path).name}: {', '.join(ledger.pending(digest))}")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,21 +3,37 @@
 Process WhatsApp Call Recordings
 Converts audio and transcribes using Whisper.
 
+The recording is decoded once (audio_io.load_audio); the 22.05 kHz file
+and Whisper's 16 kHz input are both resampled from that one array, so
+Whisper doesn't re-decode the converted file through ffmpeg.
+
+With many files the Whisper model is loaded once, and the next file is
+decoded and converted on a background thread while the current one is
+transcribed.
+
 Usage:
-    python process_recording.py <audio_file>
+    python process_recording.py <audio_file>... [--model base]
     python process_recording.py voice/raw/whatsapp_call_20241217_143000.wav
+    python process_recording.py "voice/raw/*.wav" --model small
 
 Output:
-    - Converted WAV in voice/processed/
+    - Converted audio in voice/processed/ (lossless FLAC, or WAV with AUDIO_FORMAT=wav)
     - Transcript in voice/transcripts/
+    - Word timestamps + segment quality in voice/transcripts/<name>.words.npz
+      (see transcript_sidecar.py)
 """
 
 import os
-import sys
-import subprocess
+import glob
+import time
+import threading
 from pathlib import Path
 from datetime import datetime
 
+from audio_io import (AUDIO_SUFFIXES, STORAGE_FORMAT, STORAGE_SUFFIX, is_canonical, load_audio, prefetch_audio,
+                      write_audio)
+from transcript_sidecar import write_sidecar, sidecar_path
+
 # Paths
 SCRIPT_DIR = Path(__file__).parent
 RAW_DIR = SCRIPT_DIR / "voice" / "raw"
@@ -31,43 +47,67 @@ if (TOOLS_BIN / "ffmpeg").exists():
 else:
     FFMPEG = "ffmpeg"
 
+# Accepted as a trailing model name (old "process_recording.py file model" usage)
+WHISPER_MODELS = {"tiny", "base", "small", "medium", "large", "large-v1", "large-v2", "large-v3", "turbo",
+                  "tiny.en", "base.en", "small.en", "medium.en"}
+
+# Loaded models, per thread - a Whisper model can't run two transcriptions at once
+_models = threading.local()
+
+
+def get_model(model_size="base"):
+    """Whisper model, loaded once per thread and model size"""
+    cache = _models.__dict__.setdefault("cache", {})
+    if model_size not in cache:
+        import whisper
+
+        print(f"Loading Whisper {model_size}...")
+        cache[model_size] = whisper.load_model(model_size)
+    return cache[model_size]
+
 
-def convert_audio(input_file):
-    """Convert audio to 22050Hz mono WAV"""
+def convert_audio(input_file, audio=None):
+    """
+    Convert audio to 22050Hz mono in the storage format (FLAC by default)
+    Written from the decoded recording (`audio`, loaded here if not given);
+    ffmpeg is only used to decode formats other than WAV/FLAC.
+    Already-canonical files are used as they are.
+    """
     input_path = Path(input_file)
 
     if not input_path.exists():
         print(f"Error: File not found: {input_path}")
         return None
 
+    if is_canonical(input_path, storage=True):
+        print(f"Already 22050Hz mono {STORAGE_FORMAT.upper()}: {input_path.name} (no conversion needed)")
+        return input_path
+
     PROCESSED_DIR.mkdir(parents=True, exist_ok=True)
 
-    output_file = PROCESSED_DIR / f"{input_path.stem}_processed.wav"
+    output_file = PROCESSED_DIR / f"{input_path.stem}_processed{STORAGE_SUFFIX}"
 
     print(f"Converting: {input_path.name}")
     print(f"  → {output_file.name}")
 
     try:
-        subprocess.run([
-            FFMPEG,
-            "-i", str(input_path),
-            "-ar", "22050",  # 22.05kHz sample rate
-            "-ac", "1",      # Mono
-            "-y",            # Overwrite
-            str(output_file)
-        ], check=True, capture_output=True)
-
-        size_mb = output_file.stat().st_size / (1024 * 1024)
-        print(f"  Size: {size_mb:.1f} MB")
-        return output_file
-
-    except subprocess.CalledProcessError as e:
+        audio = audio or load_audio(input_path, FFMPEG)
+        write_audio(output_file, audio.canonical)
+    except (OSError, RuntimeError) as e:
         print(f"Error converting audio: {e}")
         return None
 
+    size_mb = output_file.stat().st_size / (1024 * 1024)
+    print(f"  Size: {size_mb:.1f} MB")
+    return output_file
+
 
-def transcribe_audio(audio_file, model_size="base"):
-    """Transcribe audio using Whisper"""
+def transcribe_audio(audio_file, model_size="base", audio=None):
+    """
+    Transcribe audio using Whisper
+    Whisper gets the 16 kHz view of `audio` (the already-decoded recording)
+    instead of decoding audio_file again; the model is reused across calls.
+    """
     audio_path = Path(audio_file)
 
     if not audio_path.exists():
@@ -82,10 +122,9 @@ def transcribe_audio(audio_file, model_size="base"):
     print(f"  Model: {model_size}")
 
     try:
-        import whisper
-
-        model = whisper.load_model(model_size)
-        result = model.transcribe(str(audio_path), language="te")  # Telugu
+        model = get_model(model_size)
+        audio = audio or load_audio(audio_path, FFMPEG)
+        result = model.transcribe(audio.whisper, language="te", word_timestamps=True)  # Telugu
 
         # Save transcript
         with open(output_file, 'w', encoding='utf-8') as f:
@@ -94,7 +133,9 @@ def transcribe_audio(audio_file, model_size="base"):
             f.write(f"# Model: whisper-{model_size}\n\n")
             f.write(result["text"])
 
-        print(f"  → {output_file.name}")
+        write_sidecar(sidecar_path(output_file), result["segments"])
+
+        print(f"  → {output_file.name} (+ {sidecar_path(output_file).name})")
         print(f"\nTranscript preview:")
         print("-" * 40)
         print(result["text"][:500] + "..." if len(result["text"]) > 500 else result["text"])
@@ -111,48 +152,109 @@ def transcribe_audio(audio_file, model_size="base"):
         return None
 
 
-def main():
-    if len(sys.argv) < 2:
-        # List available recordings
-        print("\nUsage: python process_recording.py <audio_file>")
-        print("\nAvailable recordings in voice/raw/:")
-
-        if RAW_DIR.exists():
-            recordings = list(RAW_DIR.glob("*.wav"))
-            if recordings:
-                for r in sorted(recordings):
-                    size_mb = r.stat().st_size / (1024 * 1024)
-                    print(f"  - {r.name} ({size_mb:.1f} MB)")
-            else:
-                print("  (no recordings yet)")
+def expand_inputs(args):
+    """Files and glob patterns → existing paths, in order, without repeats"""
+    files = []
+    for arg in args:
+        matches = sorted(glob.glob(arg)) if glob.has_magic(arg) else [arg]
+        if not matches:
+            print(f"Warning: no files match {arg}")
+        for match in matches:
+            if match not in files:
+                files.append(match)
+    return files
+
+
+def list_recordings():
+    """Print the recordings waiting in voice/raw/"""
+    print("\nUsage: python process_recording.py <audio_file>... [--model base]")
+    print("\nAvailable recordings in voice/raw/:")
+
+    if RAW_DIR.exists():
+        recordings = [r for r in RAW_DIR.iterdir() if r.suffix.lower() in AUDIO_SUFFIXES]
+        if recordings:
+            for r in sorted(recordings):
+                size_mb = r.stat().st_size / (1024 * 1024)
+                print(f"  - {r.name} ({size_mb:.1f} MB)")
         else:
-            print("  (directory doesn't exist)")
-        return
+            print("  (no recordings yet)")
+    else:
+        print("  (directory doesn't exist)")
 
-    input_file = sys.argv[1]
-    model_size = sys.argv[2] if len(sys.argv) > 2 else "base"
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Convert and transcribe call recordings")
+    parser.add_argument("files", nargs="*", help="Audio files or glob patterns")
+    parser.add_argument("--model", "-m", default=None, help="Whisper model (default: base)")
+    args = parser.parse_args()
+
+    inputs = list(args.files)
+    model_size = args.model
+    if len(inputs) > 1 and inputs[-1] in WHISPER_MODELS and not Path(inputs[-1]).exists():
+        model_size = model_size or inputs.pop()     # Old usage: process_recording.py <file> <model>
+    model_size = model_size or "base"
+
+    files = expand_inputs(inputs)
+    if not files:
+        list_recordings()
+        return
 
     print("\n" + "="*60)
-    print("  PROCESS RECORDING")
+    print("  PROCESS RECORDING" + (f"S ({len(files)} files)" if len(files) > 1 else ""))
     print("="*60)
 
-    # Convert audio
-    processed_file = convert_audio(input_file)
-    if not processed_file:
-        return
+    def prepare(input_file, audio):
+        """Decode thread: convert, and resample for Whisper, ahead of transcription"""
+        print(f"\nDecoded: {Path(input_file).name} ({audio.duration / 60:.1f} min, {audio.rate} Hz)")
+        processed_file = convert_audio(input_file, audio)
+        audio.whisper   # Resample now (cached on the Audio)
+        return audio, processed_file
+
+    started = time.time()
+    decoded = prefetch_audio(files, ffmpeg=FFMPEG, prepare=prepare)
+
+    # Load the model while the first file decodes
+    try:
+        get_model(model_size)
+    except ImportError:
+        pass    # transcribe_audio() explains how to install Whisper
+
+    results = []
+    for input_file, prepared in decoded:
+        if isinstance(prepared, Exception):
+            print(f"\nError reading {Path(input_file).name}: {prepared}")
+            results.append((input_file, None, None))
+            continue
+
+        audio, processed_file = prepared
+        if not processed_file:
+            results.append((input_file, None, None))
+            continue
 
-    # Transcribe
-    transcript_file = transcribe_audio(processed_file, model_size)
+        # Transcribe
+        transcript_file = transcribe_audio(processed_file, model_size, audio)
+        results.append((input_file, processed_file, transcript_file))
 
     print("\n" + "="*60)
     print("DONE!")
     print("="*60)
-    print(f"\nProcessed audio: {processed_file}")
-    if transcript_file:
-        print(f"Transcript: {transcript_file}")
+    for input_file, processed_file, transcript_file in results:
+        if not processed_file:
+            print(f"\n✗ {Path(input_file).name}: failed")
+            continue
+        print(f"\nProcessed audio: {processed_file}")
+        if transcript_file:
+            print(f"Transcript: {transcript_file}")
+    if len(files) > 1:
+        ok = sum(1 for r in results if r[2])
+        print(f"\n{ok}/{len(files)} transcribed in {time.time() - started:.0f}s (model loaded once)")
 
     print("\nNext step - separate speakers:")
-    print(f"  python ../tools/separate_speakers.py {processed_file}")
+    for _, processed_file, _ in results:
+        if processed_file:
+            print(f"  python ../tools/separate_speakers.py {processed_file}")
 
 
 if __name__ == "__main__":
@@ -7,9 +7,10 @@ and saves both audio and transcripts for later training.
 Flow:
 1. You call Twilio number
 2. Twilio forwards to Amma's real phone
-3. Both sides' audio streamed to this server via WebSocket
-4. Whisper transcribes in real-time
-5. Audio + transcripts saved for training
+3. Both sides' audio streamed to this server via WebSocket, one track each
+4. Whisper transcribes each speaker in real-time (fast model)
+5. Audio (per speaker + mixed) and transcripts saved for training
+6. During idle hours, calls are re-transcribed with a large model (retranscribe.py)
 
 Setup:
 1. pip install -r requirements.txt
@@ -20,20 +21,35 @@ Setup:
 """
 
 import os
+import sys
 import json
 import base64
+import shutil
 import asyncio
+import time
 from datetime import datetime
 from pathlib import Path
+from typing import Optional
 
 from fastapi import FastAPI, WebSocket, Request
 from fastapi.responses import Response
 import uvicorn
+import numpy as np
 
 # For transcription
 import whisper
-import numpy as np
-import soundfile as sf
+
+import mulaw
+from catalog import Catalog
+from streaming import StreamTranscriber, ulaw_to_pcm16, ulaw_to_float
+from tracks import CallRecorder, TRACK_SPEAKERS
+from wav_writer import needs_recovery, recover
+from workers import BoundedExecutor, LoopLagMonitor, Timings, process_stats
+
+# Shared with the recording pipeline (amma-poc/)
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from transcript_sidecar import write_sidecar, SIDECAR_SUFFIX
+from retranscribe import Retranscriber
 
 app = FastAPI(title="Amma Call Recorder")
 
@@ -42,11 +58,48 @@ AMMA_PHONE = os.getenv("AMMA_PHONE", "+1234567890")  # Amma's real phone number
 OUTPUT_DIR = Path("recordings")
 OUTPUT_DIR.mkdir(exist_ok=True)
 
-# Load Whisper model (use 'base' for speed, 'large-v3' for quality)
-print("Loading Whisper model...")
-whisper_model = whisper.load_model("base")  # Change to 'large-v3' for better quality
+# Index of finished calls for /recordings (rebuilt from metadata.json if deleted)
+catalog = Catalog(OUTPUT_DIR / "catalog.db")
+
+# The G.711 tables replaced audioop - never record calls with a codec that isn't bit-exact
+codec_errors = mulaw.verify()
+if codec_errors:
+    raise RuntimeError(f"G.711 codec mismatch: {', '.join(codec_errors)}")
+
+# Live model: fast, for the immediate preview. Finished calls are upgraded
+# later by FINAL_WHISPER_MODEL during idle hours (see retranscribe.py).
+LIVE_WHISPER_MODEL = os.getenv("LIVE_WHISPER_MODEL", "base")
+print(f"Loading Whisper model ({LIVE_WHISPER_MODEL})...")
+whisper_model = whisper.load_model(LIVE_WHISPER_MODEL)
 print("Whisper model loaded!")
 
+# Blocking work never runs on the event loop (see workers.py).
+# One Whisper worker per loaded model; the queue bounds memory under load.
+whisper_executor = BoundedExecutor("whisper", max_workers=1,
+                                   max_queue=int(os.getenv("WHISPER_QUEUE_SIZE", "32")))
+io_executor = BoundedExecutor("io", max_workers=int(os.getenv("IO_WORKERS", "4")), max_queue=64)
+final_executor = BoundedExecutor("whisper-final", max_workers=1, max_queue=4)
+loop_lag = LoopLagMonitor()
+
+# Live call counters for /metrics
+stream_stats = {"active_calls": 0, "total_calls": 0, "finalized_calls": 0, "failed_calls": 0,
+                "media_frames": 0, "late_frames": 0}
+
+# A media frame handled this long after its stream timestamp counts as late
+LATE_FRAME_MS = 100
+frame_lag = Timings()       # ms between a frame's stream timestamp and handling it
+post_call = Timings()       # seconds from stream end to outputs written
+
+
+@app.on_event("startup")
+async def start_monitors():
+    asyncio.create_task(loop_lag.run())
+    await io_executor.run(recover_sessions)
+    added = await io_executor.run(catalog.backfill, OUTPUT_DIR)
+    if added:
+        print(f"Catalog: indexed {added} existing recordings")
+    asyncio.create_task(retranscriber.run())
+
 
 @app.post("/incoming-call")
 async def handle_incoming_call(request: Request):
@@ -66,7 +119,7 @@ async def handle_incoming_call(request: Request):
     twiml = f"""<?xml version="1.0" encoding="UTF-8"?>
 <Response>
     <Start>
-        <Stream url="wss://{request.url.hostname}/media-stream">
+        <Stream url="wss://{request.url.hostname}/media-stream" track="both_tracks">
             <Parameter name="session_dir" value="{session_dir}" />
         </Stream>
     </Start>
@@ -83,15 +136,21 @@ async def handle_incoming_call(request: Request):
 async def media_stream(websocket: WebSocket):
     """
     WebSocket endpoint for Twilio Media Streams.
-    Receives real-time audio from both sides of the call.
+    Receives real-time audio from both sides of the call as separate tracks,
+    appends each to its speaker's WAV (plus the mix) on disk and transcribes
+    utterances per speaker while the call is live.
     """
     await websocket.accept()
 
     session_dir = None
-    audio_buffer = []
     stream_sid = None
+    recorder = None
+    transcribers = {}   # track -> StreamTranscriber
+    started = None
 
     print("Media stream connected!")
+    stream_stats["active_calls"] += 1
+    stream_stats["total_calls"] += 1
 
     try:
         while True:
@@ -107,112 +166,268 @@ async def media_stream(websocket: WebSocket):
                 custom_params = start_data.get("customParameters", {})
                 session_dir = Path(custom_params.get("session_dir", OUTPUT_DIR / "unknown"))
                 session_dir.mkdir(exist_ok=True)
+                started = time.perf_counter()
+
+                recorder = CallRecorder(session_dir, info={
+                    "stream_sid": stream_sid,
+                    "started_at": datetime.now().isoformat()
+                }, executor=io_executor)
 
                 print(f"Stream started: {stream_sid}")
                 print(f"Saving to: {session_dir}")
 
             elif event == "media":
                 # Audio data received
-                payload = data.get("media", {}).get("payload")
-                if payload:
-                    # Decode base64 audio (mulaw 8kHz)
-                    audio_bytes = base64.b64decode(payload)
-                    audio_buffer.append(audio_bytes)
+                media = data.get("media", {})
+                payload = media.get("payload")
+                if payload and recorder:
+                    track = media.get("track", "inbound")
+                    sequence = data.get("sequenceNumber")
+
+                    # Decode base64 audio (mulaw 8kHz) - aligned and written straight to disk
+                    frame = base64.b64decode(payload)
+                    pcm = recorder.add(
+                        track,
+                        ulaw_to_pcm16(frame),
+                        timestamp_ms=int(media["timestamp"]) if "timestamp" in media else None,
+                        sequence=int(sequence) if sequence is not None else None
+                    )
+
+                    if track not in transcribers:
+                        transcribers[track] = StreamTranscriber(
+                            session_dir, whisper_model, whisper_executor,
+                            speaker=TRACK_SPEAKERS.get(track, track))
+                    transcriber = transcribers[track]
+
+                    # The transcriber decodes the frame straight to float32. The aligner only
+                    # pads or trims the front of a frame, so its output ends with the
+                    # frame's last len(pcm) // 2 samples
+                    samples = ulaw_to_float(frame)[-(len(pcm) // 2):] if pcm else None
+
+                    # Silence the recorder padded in (gaps, or while this track was stalled)
+                    fed = len(samples) if samples is not None else 0
+                    behind = recorder.position(track) - fed - transcriber.ring.total
+                    if behind > 0:
+                        transcriber.feed(np.zeros(behind, dtype=np.float32))
+                    if samples is not None:
+                        transcriber.feed(samples)
+                    stream_stats["media_frames"] += 1
+
+                    if "timestamp" in media:
+                        lag = max((time.perf_counter() - started) * 1000 - int(media["timestamp"]), 0.0)
+                        frame_lag.add(lag)
+                        stream_stats["late_frames"] += lag > LATE_FRAME_MS
 
             elif event == "stop":
-                # Stream ended - process and save
+                # Stream ended - saved and finalized below
                 print(f"Stream ended: {stream_sid}")
-
-                if audio_buffer and session_dir:
-                    await process_and_save_audio(audio_buffer, session_dir)
-
                 break
 
     except Exception as e:
         print(f"WebSocket error: {e}")
 
     finally:
-        if audio_buffer and session_dir:
-            await process_and_save_audio(audio_buffer, session_dir)
+        stream_stats["active_calls"] -= 1
+        if recorder:
+            await process_and_save_audio(recorder, session_dir, transcribers)
 
 
-async def process_and_save_audio(audio_buffer: list, session_dir: Path):
+def merge_segments(session_dir: Path, per_speaker: list) -> list:
     """
-    Process audio buffer, save to WAV, and transcribe.
+    Interleave each speaker's final segments by start time into segments.json,
+    plus the columnar word/quality sidecar (blocking)
+    Returns: merged segments, each labelled with its speaker
     """
-    print(f"Processing {len(audio_buffer)} audio chunks...")
+    segments = sorted((s for segs in per_speaker for s in segs), key=lambda s: s["start"])
+
+    with open(session_dir / "segments.json", "w", encoding="utf-8") as f:
+        json.dump(segments, f, ensure_ascii=False, indent=2)
+    write_sidecar(session_dir / f"transcript{SIDECAR_SUFFIX}", segments)
 
-    # Combine all audio chunks
-    combined_audio = b"".join(audio_buffer)
+    return segments
 
-    # Convert mulaw to PCM (Twilio sends 8kHz mulaw)
-    # This is simplified - in production, use audioop or similar
+
+def write_call_outputs(session_dir: Path, segments: list, duration: float, extra: dict = None):
+    """
+    Write transcript.txt and metadata.json for a finished call and catalog it (blocking)
+    `extra` is merged last, so it can carry over fields such as the call timestamp.
+    """
+    text = "\n".join(
+        f"{seg['speaker']}: {seg['text']}" if seg.get("speaker") else seg["text"]
+        for seg in segments
+    )
+
+    # Save transcript
+    transcript_path = session_dir / "transcript.txt"
+    with open(transcript_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    print(f"Saved transcript: {transcript_path}")
+
+    # Create metadata
+    metadata = {
+        "timestamp": datetime.now().isoformat(),
+        "duration_seconds": duration,
+        "transcript_preview": text[:200] + "..." if len(text) > 200 else text,
+        "segments": len(segments),
+        "words": sum(len(seg.get("words", [])) for seg in segments),
+        "sidecar": f"transcript{SIDECAR_SUFFIX}",
+        "transcript_version": 1,
+        "transcript_model": LIVE_WHISPER_MODEL,
+        **(extra or {})
+    }
+    metadata_path = session_dir / "metadata.json"
+    with open(metadata_path, "w", encoding="utf-8") as f:
+        json.dump(metadata, f, ensure_ascii=False, indent=2)
+
+    catalog.add_call(session_dir.name, metadata, text)
+
+
+async def process_and_save_audio(recorder: CallRecorder, session_dir: Path, transcribers: dict):
+    """
+    Close the recordings and finalize the live transcripts.
+    All blocking work runs on the executors, keeping the event loop free
+    for other live calls.
+    """
+    ended = time.perf_counter()
     try:
-        import audioop
-        pcm_audio = audioop.ulaw2lin(combined_audio, 2)
-
-        # Convert to numpy array
-        audio_array = np.frombuffer(pcm_audio, dtype=np.int16).astype(np.float32) / 32768.0
-
-        # Save as WAV
-        wav_path = session_dir / "recording.wav"
-        sf.write(str(wav_path), audio_array, 8000)
-        print(f"Saved audio: {wav_path}")
-
-        # Transcribe with Whisper
-        print("Transcribing...")
-        result = whisper_model.transcribe(str(wav_path), language="te")  # Telugu
-
-        # Save transcript
-        transcript_path = session_dir / "transcript.txt"
-        with open(transcript_path, "w", encoding="utf-8") as f:
-            f.write(result["text"])
-        print(f"Saved transcript: {transcript_path}")
-
-        # Save detailed segments (with timestamps)
-        segments_path = session_dir / "segments.json"
-        with open(segments_path, "w", encoding="utf-8") as f:
-            json.dump(result["segments"], f, ensure_ascii=False, indent=2)
-        print(f"Saved segments: {segments_path}")
-
-        # Create metadata
-        metadata = {
-            "timestamp": datetime.now().isoformat(),
-            "duration_seconds": len(audio_array) / 8000,
-            "transcript_preview": result["text"][:200] + "..." if len(result["text"]) > 200 else result["text"]
-        }
-        metadata_path = session_dir / "metadata.json"
-        with open(metadata_path, "w", encoding="utf-8") as f:
-            json.dump(metadata, f, ensure_ascii=False, indent=2)
+        await io_executor.run(recorder.close)
+        print(f"Saved audio: {session_dir} ({recorder.duration:.0f}s, tracks: {', '.join(recorder.stats())})")
+
+        # Utterances were transcribed during the call - flush the last ones
+        print("Finalizing transcript...")
+        per_speaker = await asyncio.gather(*(t.finalize(io_executor) for t in transcribers.values()))
+        segments = await io_executor.run(merge_segments, session_dir, per_speaker)
+        print(f"Saved segments: {session_dir / 'segments.json'}")
+
+        await io_executor.run(write_call_outputs, session_dir, segments, recorder.duration,
+                              {"tracks": recorder.stats()})
+
+        post_call.add(time.perf_counter() - ended)
+        stream_stats["finalized_calls"] += 1
 
     except Exception as e:
+        stream_stats["failed_calls"] += 1
         print(f"Error processing audio: {e}")
-        # Save raw audio anyway
-        raw_path = session_dir / "raw_audio.bin"
-        with open(raw_path, "wb") as f:
-            f.write(combined_audio)
-        print(f"Saved raw audio: {raw_path}")
+
+
+def load_metadata(session_dir: Path) -> dict:
+    with open(session_dir / "metadata.json", encoding="utf-8") as f:
+        return json.load(f)
+
+
+# Transcript fields recomputed for every version (everything else carries over)
+TRANSCRIPT_FIELDS = {"transcript_preview", "segments", "words", "sidecar", "transcript_version", "transcript_model"}
+TRANSCRIPT_FILES = ["transcript.txt", "segments.json", f"transcript{SIDECAR_SUFFIX}"]
+
+
+def save_retranscription(session_dir: Path, segments: list, model_name: str):
+    """
+    Make a re-transcription the call's current transcript (blocking)
+    The previous version's files move to versions/v<N>/.
+    """
+    old = load_metadata(session_dir)
+    version = old.get("transcript_version", 1)
+
+    archive = session_dir / "versions" / f"v{version}"
+    archive.mkdir(parents=True, exist_ok=True)
+    for name in TRANSCRIPT_FILES:
+        if (session_dir / name).exists():
+            shutil.move(str(session_dir / name), str(archive / name))
+
+    merge_segments(session_dir, [segments])
+    history = old.get("transcript_history", []) + [
+        {"version": version, "model": old.get("transcript_model"), "path": str(archive.relative_to(session_dir))}
+    ]
+    write_call_outputs(session_dir, segments, old.get("duration_seconds", 0), {
+        **{k: v for k, v in old.items() if k not in TRANSCRIPT_FIELDS},
+        "transcript_version": version + 1,
+        "transcript_model": model_name,
+        "transcript_history": history,
+    })
+
+
+retranscriber = Retranscriber(
+    catalog, OUTPUT_DIR, final_executor, load_metadata, save_retranscription,
+    busy=lambda: stream_stats["active_calls"] > 0
+)
+
+
+def recover_sessions():
+    """
+    Repair recordings left open by a crash and finish their metadata.
+    The transcript keeps the utterances finalized before the crash.
+    """
+    for mixed_path in sorted(OUTPUT_DIR.glob("*/recording.wav")):
+        if not needs_recovery(mixed_path):
+            continue
+
+        # Per-speaker tracks first, then the mix
+        session_dir = mixed_path.parent
+        tracks = {}
+        for wav_path in sorted(session_dir.glob("*.wav")):
+            if wav_path != mixed_path and needs_recovery(wav_path):
+                duration = recover(wav_path)["duration"]
+                if not wav_path.stem.endswith("_processed"):
+                    tracks[wav_path.stem] = {"duration_seconds": round(duration, 2)}
+
+        info = recover(mixed_path)
+        print(f"Recovered {session_dir.name}: {info['duration']:.0f}s of audio")
+
+        # Calls recorded before per-track streams only have segments.json
+        per_speaker = []
+        for segments_path in sorted(session_dir.glob("segments_*.json")) or [session_dir / "segments.json"]:
+            if segments_path.exists():
+                with open(segments_path, encoding="utf-8") as f:
+                    per_speaker.append([s for s in json.load(f) if s.get("final")])
+        segments = merge_segments(session_dir, per_speaker)
+
+        write_call_outputs(session_dir, segments, info["duration"], {"recovered": True, "tracks": tracks})
 
 
 @app.get("/health")
 async def health_check():
     """Health check endpoint."""
-    return {"status": "healthy", "whisper_model": "loaded"}
+    return {"status": "healthy", "whisper_model": LIVE_WHISPER_MODEL}
+
+
+@app.get("/metrics")
+async def metrics():
+    """Executor backpressure, event-loop lag, live call counters and process load."""
+    return {
+        "calls": stream_stats,
+        "frame_lag_ms": frame_lag.stats(1),
+        "post_call_seconds": post_call.stats(),
+        "event_loop_lag": loop_lag.stats(),
+        "process": process_stats(),
+        "executors": {
+            "whisper": whisper_executor.stats(),
+            "io": io_executor.stats(),
+            "whisper-final": final_executor.stats(),
+        },
+        "retranscription": retranscriber.stats(),
+    }
 
 
 @app.get("/recordings")
-async def list_recordings():
-    """List all recorded calls."""
-    recordings = []
-    for session_dir in OUTPUT_DIR.iterdir():
-        if session_dir.is_dir():
-            metadata_path = session_dir / "metadata.json"
-            if metadata_path.exists():
-                with open(metadata_path) as f:
-                    metadata = json.load(f)
-                    metadata["session_id"] = session_dir.name
-                    recordings.append(metadata)
-    return {"recordings": sorted(recordings, key=lambda x: x.get("timestamp", ""), reverse=True)}
+async def list_recordings(
+    q: Optional[str] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    min_duration: Optional[float] = None,
+    max_duration: Optional[float] = None,
+    speaker: Optional[str] = None,
+    limit: int = 50,
+    offset: int = 0
+):
+    """
+    List recorded calls, newest first (served from the catalog).
+    q: full-text search over transcripts; since/until: ISO dates;
+    min_duration/max_duration: seconds; speaker: e.g. "amma".
+    """
+    return await io_executor.run(
+        lambda: catalog.search(q=q, since=since, until=until, min_duration=min_duration,
+                               max_duration=max_duration, speaker=speaker, limit=limit, offset=offset)
+    )
 
 
 if __name__ == "__main__":
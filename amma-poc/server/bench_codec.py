@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+G.711 Codec Check and Benchmark
+Verifies mulaw.py is bit-exact with audioop over every possible input and
+compares their speed on a single Twilio frame and on a full call.
+
+Checks:
+    - mulaw.verify(): every table against a scalar port of audioop's
+      G.711 routines (always runs)
+    - round trip through the streaming helpers in streaming.py
+    - against audioop itself (skipped with a note on Python 3.13+):
+        decode: all 256 μ-law and A-law bytes
+        encode: all 65536 16-bit samples to μ-law and A-law
+
+Usage:
+    python bench_codec.py
+    python bench_codec.py --call-minutes 60 --runs 20
+
+Exit code 1 on any mismatch.
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+import mulaw
+from streaming import ulaw_to_pcm16, ulaw_to_float
+
+try:
+    import audioop
+except ImportError:
+    audioop = None
+
+FRAME_BYTES = 160   # 20 ms of 8 kHz μ-law (one Twilio media event)
+
+
+def check_exact() -> bool:
+    """Compare against audioop over every input. Returns True if identical."""
+    all_codes = bytes(range(256))
+    all_samples = np.arange(-32768, 32768, dtype=np.int16)
+    all_pcm = all_samples.astype("<i2").tobytes()
+
+    cases = [
+        ("ulaw decode", mulaw.ulaw_decode_pcm16(all_codes), audioop.ulaw2lin(all_codes, 2)),
+        ("alaw decode", mulaw.alaw_decode(all_codes).astype("<i2").tobytes(), audioop.alaw2lin(all_codes, 2)),
+        ("ulaw encode", mulaw.ulaw_encode(all_samples), audioop.lin2ulaw(all_pcm, 2)),
+        ("alaw encode", mulaw.alaw_encode(all_pcm), audioop.lin2alaw(all_pcm, 2)),
+    ]
+
+    ok = True
+    for name, ours, reference in cases:
+        mismatches = sum(a != b for a, b in zip(ours, reference)) + abs(len(ours) - len(reference))
+        print(f"  {name:12} {'OK' if mismatches == 0 else f'{mismatches} mismatches'}")
+        ok &= mismatches == 0
+    return ok
+
+
+def check_streaming() -> bool:
+    """streaming.py helpers agree with the tables"""
+    codes = bytes(range(256))
+    pcm = np.frombuffer(ulaw_to_pcm16(codes), dtype=np.int16)
+    floats = ulaw_to_float(codes)
+
+    ok = np.array_equal(pcm, mulaw.ULAW_TO_PCM16) and np.array_equal(floats, pcm / np.float32(32768.0))
+    ok &= mulaw.ulaw_encode(pcm) == codes or _only_zero_codes_differ(mulaw.ulaw_encode(pcm), codes)
+    print(f"  {'streaming':12} {'OK' if ok else 'MISMATCH'}")
+    return ok
+
+
+def _only_zero_codes_differ(encoded: bytes, codes: bytes) -> bool:
+    # μ-law has +0 (0xFF) and -0 (0x7F); both decode to 0 and re-encode to 0xFF
+    return all(a == b or (b == 0x7F and a == 0xFF) for a, b in zip(encoded, codes))
+
+
+def bench(func, data, runs: int) -> float:
+    """Best-of-runs time in ms"""
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        func(data)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="G.711 codec check and benchmark")
+    parser.add_argument("--call-minutes", type=float, default=10, help="Length of the simulated call")
+    parser.add_argument("--runs", type=int, default=10, help="Timing runs (best is reported)")
+    args = parser.parse_args()
+
+    print("Bit-exactness:")
+    failed = mulaw.verify()
+    print(f"  {'reference':12} {'OK' if not failed else 'MISMATCH: ' + ', '.join(failed)}")
+    ok = not failed
+    if audioop:
+        ok &= check_exact()
+    else:
+        print("  audioop not available on this Python - skipped")
+    ok &= check_streaming()
+
+    rng = np.random.default_rng(0)
+    frame = rng.integers(0, 256, FRAME_BYTES, dtype=np.uint8).tobytes()
+    call = rng.integers(0, 256, int(args.call_minutes * 60 * 8000), dtype=np.uint8).tobytes()
+    call_pcm = mulaw.ulaw_decode_pcm16(call)
+    frames_per_call = len(call) // FRAME_BYTES
+
+    rows = [
+        ("ulaw decode, 1 frame", mulaw.ulaw_decode_pcm16, frame, audioop and (lambda d: audioop.ulaw2lin(d, 2))),
+        (f"ulaw decode, {args.call_minutes:g} min", mulaw.ulaw_decode_pcm16, call,
+         audioop and (lambda d: audioop.ulaw2lin(d, 2))),
+        (f"ulaw→float, {args.call_minutes:g} min", mulaw.ulaw_decode_float, call,
+         audioop and (lambda d: np.frombuffer(audioop.ulaw2lin(d, 2), dtype=np.int16).astype(np.float32) / 32768.0)),
+        (f"ulaw encode, {args.call_minutes:g} min", mulaw.ulaw_encode, call_pcm,
+         audioop and (lambda d: audioop.lin2ulaw(d, 2))),
+        (f"alaw decode, {args.call_minutes:g} min", mulaw.alaw_decode, call,
+         audioop and (lambda d: audioop.alaw2lin(d, 2))),
+    ]
+
+    print(f"\nSpeed (best of {args.runs}, ms):")
+    print(f"  {'':26} {'numpy':>10} {'audioop':>10}")
+    for name, ours, data, reference in rows:
+        ours_ms = bench(ours, data, args.runs)
+        ref = f"{bench(reference, data, args.runs):10.3f}" if reference else f"{'-':>10}"
+        print(f"  {name:26} {ours_ms:10.3f} {ref}")
+
+    per_frame_ms = bench(lambda c: [mulaw.ulaw_decode_pcm16(c[i:i + FRAME_BYTES])
+                                    for i in range(0, len(c), FRAME_BYTES)], call, 1) / frames_per_call
+    print(f"\n  Streaming: {per_frame_ms * 1000:.1f} µs per 20 ms frame")
+
+    print("\nOK" if ok else "\nFAILED")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
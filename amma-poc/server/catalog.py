@@ -0,0 +1,214 @@
+"""
+Recordings Catalog
+==================
+SQLite index of finished calls, so /recordings answers from one indexed
+query instead of opening every metadata.json under recordings/.
+
+- A call is added when its outputs are written (and after crash recovery)
+- Calls recorded before the catalog existed are backfilled at startup
+- Transcripts are searchable through an FTS5 table
+- Each call records which transcript version/model is current, so the
+  background re-transcription (retranscribe.py) knows what is left to do
+
+metadata.json stays the source of truth; deleting catalog.db just means
+the next startup rebuilds it.
+
+Layout:
+    recordings/catalog.db
+        calls          # one row per call (metadata as JSON + indexed columns)
+        call_speakers  # speakers recorded in each call
+        transcripts    # FTS5 over transcript text
+"""
+
+import json
+import sqlite3
+import threading
+from pathlib import Path
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS calls (
+    session_id TEXT PRIMARY KEY,
+    timestamp TEXT NOT NULL,
+    duration_seconds REAL NOT NULL DEFAULT 0,
+    metadata TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS calls_timestamp ON calls (timestamp);
+CREATE INDEX IF NOT EXISTS calls_duration ON calls (duration_seconds);
+
+CREATE TABLE IF NOT EXISTS call_speakers (
+    session_id TEXT NOT NULL,
+    speaker TEXT NOT NULL,
+    PRIMARY KEY (speaker, session_id)
+);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS transcripts USING fts5 (
+    session_id UNINDEXED,
+    text
+);
+"""
+
+# Columns added after the first release: (name, definition)
+MIGRATIONS = [
+    ("transcript_version", "INTEGER NOT NULL DEFAULT 1"),
+    ("transcript_model", "TEXT"),
+]
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 500
+
+
+def fts_query(q: str) -> str:
+    """Turn free text into an FTS5 query: every word must match (as a prefix)"""
+    words = [w.replace('"', '""') for w in q.split()]
+    return " ".join(f'"{w}"*' for w in words)
+
+
+class Catalog:
+    """Thread-safe handle on the catalog database"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(str(self.path), check_same_thread=False)
+        self.db.row_factory = sqlite3.Row
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(SCHEMA)
+        self._migrate()
+
+    def _migrate(self):
+        columns = {row["name"] for row in self.db.execute("PRAGMA table_info(calls)")}
+        with self.db:
+            for name, definition in MIGRATIONS:
+                if name not in columns:
+                    self.db.execute(f"ALTER TABLE calls ADD COLUMN {name} {definition}")
+            self.db.execute("CREATE INDEX IF NOT EXISTS calls_transcript_model ON calls (transcript_model)")
+
+    def add_call(self, session_id: str, metadata: dict, transcript: str = ""):
+        """Insert or replace a call (blocking)"""
+        speakers = list(metadata.get("tracks", {}))
+
+        with self.lock, self.db:
+            self.db.execute("DELETE FROM call_speakers WHERE session_id = ?", (session_id,))
+            self.db.execute("DELETE FROM transcripts WHERE session_id = ?", (session_id,))
+            self.db.execute(
+                "INSERT OR REPLACE INTO calls (session_id, timestamp, duration_seconds, metadata, "
+                "transcript_version, transcript_model) VALUES (?, ?, ?, ?, ?, ?)",
+                (session_id, metadata.get("timestamp", ""), metadata.get("duration_seconds") or 0,
+                 json.dumps(metadata, ensure_ascii=False),
+                 metadata.get("transcript_version", 1), metadata.get("transcript_model"))
+            )
+            self.db.executemany("INSERT INTO call_speakers (session_id, speaker) VALUES (?, ?)",
+                                [(session_id, s) for s in speakers])
+            self.db.execute("INSERT INTO transcripts (session_id, text) VALUES (?, ?)",
+                            (session_id, transcript))
+
+    def add_session(self, session_dir: Path) -> bool:
+        """Index a call from its metadata.json / transcript.txt. Returns False if it has none."""
+        metadata_path = session_dir / "metadata.json"
+        if not metadata_path.exists():
+            return False
+
+        with open(metadata_path, encoding="utf-8") as f:
+            metadata = json.load(f)
+
+        transcript_path = session_dir / "transcript.txt"
+        transcript = transcript_path.read_text(encoding="utf-8") if transcript_path.exists() else ""
+
+        self.add_call(session_dir.name, metadata, transcript)
+        return True
+
+    def backfill(self, output_dir: Path) -> int:
+        """
+        Index calls that have metadata but aren't in the catalog yet (blocking)
+        Returns: number of calls added
+        """
+        with self.lock:
+            known = {row[0] for row in self.db.execute("SELECT session_id FROM calls")}
+
+        added = 0
+        for session_dir in sorted(Path(output_dir).iterdir()):
+            if session_dir.is_dir() and session_dir.name not in known:
+                added += self.add_session(session_dir)
+        return added
+
+    def needs_transcript(self, model: str, limit: int = 10, exclude: set = ()) -> list:
+        """
+        Calls whose current transcript is not from `model`, newest first
+        Returns: session IDs
+        """
+        with self.lock:
+            rows = self.db.execute(
+                "SELECT session_id FROM calls WHERE transcript_model IS NOT ? "
+                "ORDER BY timestamp DESC LIMIT ?",
+                (model, limit + len(exclude))
+            ).fetchall()
+        return [r[0] for r in rows if r[0] not in exclude][:limit]
+
+    def transcript_versions(self) -> dict:
+        """Number of calls per current transcript model"""
+        with self.lock:
+            rows = self.db.execute(
+                "SELECT COALESCE(transcript_model, 'unknown'), COUNT(*) FROM calls GROUP BY 1").fetchall()
+        return dict(rows)
+
+    def search(self, q: str = None, since: str = None, until: str = None,
+               min_duration: float = None, max_duration: float = None, speaker: str = None,
+               limit: int = DEFAULT_LIMIT, offset: int = 0) -> dict:
+        """
+        Filtered, paginated calls, newest first
+        `since` / `until` are ISO dates or timestamps (compared as text).
+        Returns: {"total": int, "limit", "offset" (as applied, after clamping),
+                  "recordings": [metadata + session_id (+ snippet)]}
+        """
+        where, params = [], []
+
+        if q and q.strip():
+            where.append("c.session_id IN (SELECT session_id FROM transcripts WHERE transcripts MATCH ?)")
+            params.append(fts_query(q))
+        if since:
+            where.append("c.timestamp >= ?")
+            params.append(since)
+        if until:
+            # A bare date includes the whole day
+            where.append("c.timestamp < ?")
+            params.append(until + "T99" if len(until) == 10 else until)
+        if min_duration is not None:
+            where.append("c.duration_seconds >= ?")
+            params.append(min_duration)
+        if max_duration is not None:
+            where.append("c.duration_seconds <= ?")
+            params.append(max_duration)
+        if speaker:
+            where.append("c.session_id IN (SELECT session_id FROM call_speakers WHERE speaker = ?)")
+            params.append(speaker)
+
+        clause = f"WHERE {' AND '.join(where)}" if where else ""
+        limit = max(1, min(int(limit), MAX_LIMIT))
+        offset = max(0, int(offset))
+
+        with self.lock:
+            total = self.db.execute(f"SELECT COUNT(*) FROM calls c {clause}", params).fetchone()[0]
+            rows = self.db.execute(
+                f"SELECT c.session_id, c.metadata FROM calls c {clause} "
+                f"ORDER BY c.timestamp DESC LIMIT ? OFFSET ?",
+                [*params, limit, offset]
+            ).fetchall()
+
+            snippets = {}
+            if q and q.strip() and rows:
+                ids = [r["session_id"] for r in rows]
+                snippets = dict(self.db.execute(
+                    f"SELECT session_id, snippet(transcripts, 1, '[', ']', '…', 12) FROM transcripts "
+                    f"WHERE transcripts MATCH ? AND session_id IN ({','.join('?' * len(ids))})",
+                    [fts_query(q), *ids]
+                ).fetchall())
+
+        recordings = []
+        for row in rows:
+            entry = {**json.loads(row["metadata"]), "session_id": row["session_id"]}
+            if row["session_id"] in snippets:
+                entry["snippet"] = snippets[row["session_id"]]
+            recordings.append(entry)
+
+        return {"total": total, "limit": limit, "offset": offset, "recordings": recordings}
@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+Multi-Call Load Test
+Replays audio as fake Twilio Media Stream sessions against a running
+server, N calls at once, to find how many simultaneous calls it records
+before media frames arrive late.
+
+Each call sends connected/start/media/stop like Twilio: 20 ms μ-law frames
+at real-time pacing, on one track or both (--both-tracks). The server's
+/metrics is sampled throughout.
+
+Reports:
+    - send lag:      how late this tool sent frames (should stay ~0, or the
+                     tool itself is the bottleneck)
+    - frame lag:     server-side delay between a frame's stream timestamp
+                     and the server handling it; late = over 100 ms
+    - loop lag:      server event-loop lag
+    - CPU / memory:  server process, from /metrics
+    - post-call:     time from stream end to transcript + metadata written
+
+Usage:
+    python app.py                                   # in another terminal
+    python loadtest.py --calls 10 --duration 60
+    python loadtest.py --calls 50 --ramp 0.5 --audio ../voice/raw/call.wav --both-tracks
+    python loadtest.py --calls 20 --json report.json
+
+Requires: pip install websockets
+"""
+
+import argparse
+import asyncio
+import base64
+import json
+import sys
+import time
+import urllib.request
+import uuid
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent))
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import mulaw
+from audio_io import read_audio, resample
+
+SAMPLE_RATE = 8000
+FRAME_SECONDS = 0.02
+FRAME_BYTES = int(SAMPLE_RATE * FRAME_SECONDS)
+
+
+def synthetic_speech(seconds: float, seed: int = 0) -> np.ndarray:
+    """Voiced bursts separated by pauses, so the server's VAD cuts utterances"""
+    rng = np.random.default_rng(seed)
+    audio = np.zeros(int(seconds * SAMPLE_RATE), dtype=np.float32)
+    pos = 0
+    while pos < len(audio):
+        burst = int(rng.uniform(0.8, 4.0) * SAMPLE_RATE)
+        t = np.arange(min(burst, len(audio) - pos)) / SAMPLE_RATE
+        f0 = rng.uniform(120, 260)
+        audio[pos:pos + len(t)] = 0.3 * np.sin(2 * np.pi * f0 * t) * (0.6 + 0.4 * np.sin(2 * np.pi * 3 * t))
+        pos += burst + int(rng.uniform(0.6, 1.5) * SAMPLE_RATE)
+    return audio + rng.normal(0, 0.003, len(audio)).astype(np.float32)
+
+
+def load_frames(audio_path: str, seconds: float, seed: int) -> list:
+    """μ-law frames for one call track, looping the audio to fill `seconds`"""
+    if audio_path and audio_path.endswith((".ulaw", ".raw")):
+        codes = Path(audio_path).read_bytes()
+    else:
+        if audio_path:
+            samples, rate = read_audio(audio_path)
+            samples = resample(samples, rate, SAMPLE_RATE)
+        else:
+            samples = synthetic_speech(seconds, seed)
+        codes = mulaw.ulaw_encode(np.clip(samples * 32768, -32768, 32767).astype(np.int16))
+
+    needed = int(seconds / FRAME_SECONDS) * FRAME_BYTES
+    codes = (codes * (needed // max(len(codes), 1) + 1))[:needed]
+    return [base64.b64encode(codes[i:i + FRAME_BYTES]).decode() for i in range(0, needed, FRAME_BYTES)]
+
+
+async def run_call(index: int, args, tracks: dict, report: dict):
+    """One fake Twilio call"""
+    import websockets
+
+    stream_sid = "MZ" + uuid.uuid4().hex
+    call_sid = "CA" + uuid.uuid4().hex
+    session_dir = f"{args.session_root}/loadtest_{args.run_id}_{index:03d}"
+    send_lag = []
+    sequence = 0
+
+    def message(event, **data):
+        nonlocal sequence
+        sequence += 1
+        return json.dumps({"event": event, "sequenceNumber": str(sequence), "streamSid": stream_sid, **data})
+
+    try:
+        async with websockets.connect(args.url, max_size=None) as ws:
+            await ws.send(json.dumps({"event": "connected", "protocol": "Call", "version": "1.0.0"}))
+            await ws.send(message("start", start={
+                "streamSid": stream_sid,
+                "callSid": call_sid,
+                "tracks": list(tracks),
+                "customParameters": {"session_dir": session_dir},
+                "mediaFormat": {"encoding": "audio/x-mulaw", "sampleRate": SAMPLE_RATE, "channels": 1},
+            }))
+
+            started = time.perf_counter()
+            frames = len(next(iter(tracks.values())))
+            for chunk in range(frames):
+                due = started + chunk * FRAME_SECONDS
+                delay = due - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                send_lag.append(max(time.perf_counter() - due, 0.0) * 1000)
+
+                for track, payloads in tracks.items():
+                    await ws.send(message("media", media={
+                        "track": track,
+                        "chunk": str(chunk + 1),
+                        "timestamp": str(int(chunk * FRAME_SECONDS * 1000)),
+                        "payload": payloads[chunk],
+                    }))
+
+            await ws.send(message("stop", stop={"accountSid": "AC", "callSid": call_sid}))
+        report["completed"] += 1
+    except Exception as e:
+        report["errors"].append(f"call {index}: {e}")
+
+    report["send_lag_ms"].extend(send_lag)
+
+
+def fetch_metrics(url: str) -> dict:
+    with urllib.request.urlopen(url, timeout=5) as response:
+        return json.load(response)
+
+
+async def sample_metrics(url: str, samples: list, interval: float):
+    """Poll /metrics, keeping (time, metrics) pairs"""
+    while True:
+        try:
+            samples.append((time.perf_counter(), await asyncio.to_thread(fetch_metrics, url)))
+        except Exception as e:
+            print(f"  metrics unavailable: {e}")
+        await asyncio.sleep(interval)
+
+
+def cpu_percent(samples: list) -> tuple:
+    """(average, peak) server CPU % between metric samples"""
+    rates = []
+    for (t0, m0), (t1, m1) in zip(samples, samples[1:]):
+        if t1 > t0:
+            rates.append((m1["process"]["cpu_seconds"] - m0["process"]["cpu_seconds"]) / (t1 - t0) * 100)
+    return (sum(rates) / len(rates), max(rates)) if rates else (0.0, 0.0)
+
+
+def percentile(values: list, q: float) -> float:
+    return float(np.percentile(values, q)) if values else 0.0
+
+
+async def main_async(args):
+    track_names = ["inbound", "outbound"] if args.both_tracks else ["inbound"]
+    print(f"Preparing {args.calls} calls × {args.duration:g}s ({', '.join(track_names)})...")
+    calls = [
+        {track: load_frames(args.audio, args.duration, seed=i * 2 + n) for n, track in enumerate(track_names)}
+        for i in range(args.calls)
+    ]
+
+    baseline = await asyncio.to_thread(fetch_metrics, args.metrics)
+    report = {"completed": 0, "errors": [], "send_lag_ms": []}
+    samples = []
+    sampler = asyncio.create_task(sample_metrics(args.metrics, samples, args.sample_interval))
+
+    print(f"Running against {args.url}...")
+    started = time.perf_counter()
+    tasks = []
+    for i, tracks in enumerate(calls):
+        tasks.append(asyncio.create_task(run_call(i, args, tracks, report)))
+        await asyncio.sleep(args.ramp)
+    await asyncio.gather(*tasks)
+    streamed = time.perf_counter()
+
+    # Wait for the server to finish post-call processing of every call
+    target = baseline["calls"]["finalized_calls"] + baseline["calls"]["failed_calls"] + report["completed"]
+    while time.perf_counter() - streamed < args.finalize_timeout:
+        metrics = await asyncio.to_thread(fetch_metrics, args.metrics)
+        if metrics["calls"]["finalized_calls"] + metrics["calls"]["failed_calls"] >= target:
+            break
+        await asyncio.sleep(0.5)
+    drained = time.perf_counter()
+
+    sampler.cancel()
+    final = await asyncio.to_thread(fetch_metrics, args.metrics)
+    samples.append((drained, final))
+
+    frames = final["calls"]["media_frames"] - baseline["calls"]["media_frames"]
+    late = final["calls"]["late_frames"] - baseline["calls"]["late_frames"]
+    cpu_avg, cpu_peak = cpu_percent(samples)
+    peak_rss = max((m["process"].get("rss_mb", 0) for _, m in samples), default=0)
+
+    summary = {
+        "calls": args.calls,
+        "completed": report["completed"],
+        "errors": report["errors"],
+        "stream_seconds": round(streamed - started, 1),
+        "drain_seconds": round(drained - streamed, 1),
+        "send_lag_ms": {
+            "p50": round(percentile(report["send_lag_ms"], 50), 2),
+            "p99": round(percentile(report["send_lag_ms"], 99), 2),
+            "max": round(max(report["send_lag_ms"], default=0), 2),
+        },
+        "server_frames": frames,
+        "late_frames": late,
+        "late_frame_percent": round(late / max(frames, 1) * 100, 2),
+        "frame_lag_ms": final["frame_lag_ms"],
+        "event_loop_lag": final["event_loop_lag"],
+        "cpu_percent": {"avg": round(cpu_avg, 1), "peak": round(cpu_peak, 1)},
+        "rss_mb": {"before": baseline["process"].get("rss_mb"), "peak": peak_rss},
+        "post_call_seconds": final["post_call_seconds"],
+        "finalized": final["calls"]["finalized_calls"] - baseline["calls"]["finalized_calls"],
+        "failed": final["calls"]["failed_calls"] - baseline["calls"]["failed_calls"],
+        "executors": final["executors"],
+    }
+    return summary
+
+
+def print_summary(s: dict):
+    print("\n" + "=" * 60)
+    print(f"  LOAD TEST: {s['calls']} concurrent calls")
+    print("=" * 60)
+    print(f"Completed:        {s['completed']}/{s['calls']} streams in {s['stream_seconds']}s"
+          f" (+{s['drain_seconds']}s post-call)")
+    print(f"Finalized:        {s['finalized']} ok, {s['failed']} failed")
+    print(f"Send lag (tool):  p50 {s['send_lag_ms']['p50']} ms, p99 {s['send_lag_ms']['p99']} ms,"
+          f" max {s['send_lag_ms']['max']} ms")
+    print(f"Frame lag:        avg {s['frame_lag_ms']['avg']} ms, max {s['frame_lag_ms']['max']} ms")
+    print(f"Late frames:      {s['late_frames']}/{s['server_frames']} ({s['late_frame_percent']}%)")
+    print(f"Event loop lag:   avg {s['event_loop_lag']['avg_ms']} ms, max {s['event_loop_lag']['max_ms']} ms")
+    print(f"Server CPU:       avg {s['cpu_percent']['avg']}%, peak {s['cpu_percent']['peak']}%")
+    print(f"Server RSS:       {s['rss_mb']['before']} MB → peak {s['rss_mb']['peak']} MB")
+    print(f"Post-call:        avg {s['post_call_seconds']['avg']}s, max {s['post_call_seconds']['max']}s")
+    for name, stats in s["executors"].items():
+        print(f"Executor {name:8} peak pending {stats['peak_pending']}, rejected {stats['rejected']},"
+              f" avg wait {stats['avg_wait_ms']} ms")
+    for error in s["errors"][:10]:
+        print(f"  ✗ {error}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent call load test for the passthrough server")
+    parser.add_argument("--url", default="ws://localhost:5000/media-stream", help="Media stream WebSocket URL")
+    parser.add_argument("--metrics", default="http://localhost:5000/metrics", help="Server /metrics URL")
+    parser.add_argument("--calls", "-n", type=int, default=5, help="Concurrent calls")
+    parser.add_argument("--duration", "-d", type=float, default=30, help="Seconds of audio per call")
+    parser.add_argument("--ramp", type=float, default=0.2, help="Seconds between call starts")
+    parser.add_argument("--audio", help="WAV (any rate) or raw 8 kHz μ-law (.ulaw) to replay; synthetic if omitted")
+    parser.add_argument("--both-tracks", action="store_true", help="Send inbound and outbound tracks")
+    parser.add_argument("--session-root", default="recordings", help="Server-side directory for session output")
+    parser.add_argument("--sample-interval", type=float, default=1.0, help="Seconds between /metrics samples")
+    parser.add_argument("--finalize-timeout", type=float, default=600, help="Max seconds to wait for post-call work")
+    parser.add_argument("--json", help="Also write the report to this file")
+    args = parser.parse_args()
+    args.run_id = time.strftime("%Y%m%d_%H%M%S")
+
+    try:
+        import websockets  # noqa: F401
+    except ImportError:
+        print("websockets not installed. Install with:")
+        print("  pip install websockets")
+        sys.exit(1)
+
+    summary = asyncio.run(main_async(args))
+    print_summary(summary)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+        print(f"\nReport: {args.json}")
+
+    sys.exit(1 if summary["errors"] or summary["failed"] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+"""
+G.711 μ-law / A-law Codec
+=========================
+Lookup-table codec in NumPy, replacing `audioop` (removed in Python 3.13).
+Output is bit-exact with audioop.ulaw2lin / lin2ulaw / alaw2lin / lin2alaw.
+verify() checks every table against a scalar port of audioop's G.711
+routines over all inputs (the server runs it at startup, and
+`python mulaw.py` exits 1 on a mismatch); bench_codec.py also compares
+against audioop itself where it still exists.
+
+- Decode: 256-entry table indexed by the encoded bytes. Long inputs use a
+  65536-entry pair table instead (two bytes → two samples per lookup),
+  which halves the number of gathers. Lookups use ndarray.take without
+  bounds checks (every code is a valid index), about twice as fast as
+  fancy indexing. Long decodes still take ~1.3x audioop's time; per
+  frame the cost is NumPy call overhead (~2-3 µs).
+- ulaw_decode_pcm16: straight to 16-bit little-endian PCM bytes (WAV
+  data), the replacement for audioop.ulaw2lin(data, 2)
+- Encode: 65536-entry table indexed by the 16-bit sample bits
+
+All tables are built once at import with vectorized arithmetic, so a
+20 ms Twilio frame and an hour-long file decode the same way: one
+np.frombuffer plus one fancy-index.
+"""
+
+import numpy as np
+
+# Segment end points used by the encoders (CCITT G.711)
+_ULAW_SEG_END = np.array([0x3F, 0x7F, 0xFF, 0x1FF, 0x3FF, 0x7FF, 0xFFF, 0x1FFF])
+_ALAW_SEG_END = np.array([0x1F, 0x3F, 0x7F, 0xFF, 0x1FF, 0x3FF, 0x7FF, 0xFFF])
+_ULAW_BIAS = 0x84
+_ULAW_CLIP = 8159
+
+
+def _ulaw_decode_table() -> np.ndarray:
+    u = ~np.arange(256, dtype=np.int32) & 0xFF
+    t = (((u & 0x0F) << 3) + _ULAW_BIAS) << ((u & 0x70) >> 4)
+    return np.where(u & 0x80, _ULAW_BIAS - t, t - _ULAW_BIAS).astype(np.int16)
+
+
+def _alaw_decode_table() -> np.ndarray:
+    a = np.arange(256, dtype=np.int32) ^ 0x55
+    seg = (a & 0x70) >> 4
+    t = (a & 0x0F) << 4
+    t = np.where(seg == 0, t + 8, (t + 0x108) << np.maximum(seg - 1, 0))
+    return np.where(a & 0x80, t, -t).astype(np.int16)
+
+
+def _ulaw_encode_table() -> np.ndarray:
+    # 14-bit magnitude, same truncation as audioop
+    v = np.arange(-32768, 32768, dtype=np.int32) >> 2
+    mask = np.where(v < 0, 0x7F, 0xFF)
+    v = np.minimum(np.abs(v), _ULAW_CLIP) + (_ULAW_BIAS >> 2)
+
+    seg = np.searchsorted(_ULAW_SEG_END, v)
+    uval = (seg << 4) | ((v >> np.minimum(seg + 1, 31)) & 0x0F)
+    uval = np.where(seg >= 8, 0x7F, uval)
+    return _by_sample_bits(uval ^ mask)
+
+
+def _alaw_encode_table() -> np.ndarray:
+    # 13-bit magnitude, same truncation as audioop
+    v = np.arange(-32768, 32768, dtype=np.int32) >> 3
+    mask = np.where(v < 0, 0x55, 0xD5)
+    v = np.where(v < 0, -v - 1, v)
+
+    seg = np.searchsorted(_ALAW_SEG_END, v)
+    aval = (seg << 4) | (np.where(seg < 2, v >> 1, v >> np.minimum(seg, 31)) & 0x0F)
+    aval = np.where(seg >= 8, 0x7F, aval)
+    return _by_sample_bits(aval ^ mask)
+
+
+def _by_sample_bits(codes: np.ndarray) -> np.ndarray:
+    """Reorder a table built for samples -32768..32767 so it is indexed by their uint16 bits"""
+    return np.roll(codes.astype(np.uint8), -32768)
+
+
+def _pair_table(table: np.ndarray) -> np.ndarray:
+    """
+    Decode table for byte pairs, indexed by two encoded bytes read as uint16.
+    Each entry holds both decoded samples in one element twice as wide, so
+    viewing the lookup result as the sample dtype gives them in order.
+    """
+    codes = np.arange(65536)
+    wide = {2: np.uint32, 4: np.uint64}[table.dtype.itemsize]
+    return np.stack([table[codes & 0xFF], table[codes >> 8]], axis=1).view(wide).ravel()
+
+
+ULAW_TO_PCM16 = _ulaw_decode_table()
+ULAW_TO_PCM16_LE = ULAW_TO_PCM16.astype("<i2")
+ALAW_TO_PCM16 = _alaw_decode_table()
+ULAW_TO_FLOAT = ULAW_TO_PCM16.astype(np.float32) / 32768.0
+ALAW_TO_FLOAT = ALAW_TO_PCM16.astype(np.float32) / 32768.0
+PCM16_TO_ULAW = _ulaw_encode_table()
+PCM16_TO_ALAW = _alaw_encode_table()
+
+_PAIR_TABLES = {id(t): _pair_table(t) for t in (ULAW_TO_PCM16, ULAW_TO_PCM16_LE, ALAW_TO_PCM16,
+                                                 ULAW_TO_FLOAT, ALAW_TO_FLOAT)}
+
+# Below this many bytes the single-byte table is as fast (one Twilio frame is 160)
+PAIR_MIN_BYTES = 4096
+
+
+def _decode(data: bytes, table: np.ndarray) -> np.ndarray:
+    codes = np.frombuffer(data, dtype=np.uint8)
+    if len(codes) < PAIR_MIN_BYTES:
+        return table.take(codes, mode="clip")
+
+    even = len(codes) & ~1
+    samples = _PAIR_TABLES[id(table)].take(codes[:even].view("<u2"), mode="clip").view(table.dtype)
+    if even == len(codes):
+        return samples
+    return np.concatenate([samples, table.take(codes[even:], mode="clip")])
+
+
+def ulaw_decode(data: bytes) -> np.ndarray:
+    """μ-law bytes → int16 samples"""
+    return _decode(data, ULAW_TO_PCM16)
+
+
+def ulaw_decode_pcm16(data: bytes) -> bytes:
+    """μ-law bytes → 16-bit little-endian PCM bytes (same as audioop.ulaw2lin(data, 2))"""
+    return _decode(data, ULAW_TO_PCM16_LE).tobytes()
+
+
+def alaw_decode(data: bytes) -> np.ndarray:
+    """A-law bytes → int16 samples"""
+    return _decode(data, ALAW_TO_PCM16)
+
+
+def ulaw_decode_float(data: bytes) -> np.ndarray:
+    """μ-law bytes → float32 in [-1, 1) without an int16 pass"""
+    return _decode(data, ULAW_TO_FLOAT)
+
+
+def alaw_decode_float(data: bytes) -> np.ndarray:
+    """A-law bytes → float32 in [-1, 1) without an int16 pass"""
+    return _decode(data, ALAW_TO_FLOAT)
+
+
+def ulaw_encode(samples) -> bytes:
+    """int16 samples (array or 16-bit little-endian PCM bytes) → μ-law bytes"""
+    return PCM16_TO_ULAW[_sample_bits(samples)].tobytes()
+
+
+def alaw_encode(samples) -> bytes:
+    """int16 samples (array or 16-bit little-endian PCM bytes) → A-law bytes"""
+    return PCM16_TO_ALAW[_sample_bits(samples)].tobytes()
+
+
+def _sample_bits(samples) -> np.ndarray:
+    if isinstance(samples, (bytes, bytearray, memoryview)):
+        return np.frombuffer(samples, dtype="<u2")
+    return np.asarray(samples, dtype=np.int16).view(np.uint16)
+
+
+# ---- Scalar reference (audioop.c's G.711 routines, one sample at a time) ----
+
+def _search(value: int, table) -> int:
+    for i, end in enumerate(table):
+        if value <= end:
+            return i
+    return len(table)
+
+
+def _ref_ulaw2linear(code: int) -> int:
+    u = ~code & 0xFF
+    t = (((u & 0x0F) << 3) + _ULAW_BIAS) << ((u & 0x70) >> 4)
+    return _ULAW_BIAS - t if u & 0x80 else t - _ULAW_BIAS
+
+
+def _ref_alaw2linear(code: int) -> int:
+    a = code ^ 0x55
+    t = (a & 0x0F) << 4
+    seg = (a & 0x70) >> 4
+    t = t + 8 if seg == 0 else (t + 0x108) << max(seg - 1, 0)
+    return t if a & 0x80 else -t
+
+
+def _ref_linear2ulaw(sample: int) -> int:
+    v = sample >> 2
+    mask = 0x7F if v < 0 else 0xFF
+    v = min(abs(v), _ULAW_CLIP) + (_ULAW_BIAS >> 2)
+    seg = _search(v, _ULAW_SEG_END)
+    if seg >= 8:
+        return 0x7F ^ mask
+    return ((seg << 4) | ((v >> (seg + 1)) & 0x0F)) ^ mask
+
+
+def _ref_linear2alaw(sample: int) -> int:
+    v = sample >> 3
+    if v >= 0:
+        mask = 0xD5
+    else:
+        mask = 0x55
+        v = -v - 1
+    seg = _search(v, _ALAW_SEG_END)
+    if seg >= 8:
+        return 0x7F ^ mask
+    return ((seg << 4) | ((v >> 1 if seg < 2 else v >> seg) & 0x0F)) ^ mask
+
+
+def verify() -> list:
+    """
+    Compare every table and decode path with the scalar reference over all inputs
+    Returns: names of the checks that failed (empty if bit-exact)
+    """
+    codes = bytes(range(256))
+    samples = np.arange(-32768, 32768, dtype=np.int16)
+    ulaw_ref = np.array([_ref_ulaw2linear(c) for c in codes], dtype=np.int16)
+    alaw_ref = np.array([_ref_alaw2linear(c) for c in codes], dtype=np.int16)
+    long_codes = codes * 64 + codes[:1]     # Pair-table path, odd length
+
+    checks = {
+        "ulaw decode": np.array_equal(ulaw_decode(codes), ulaw_ref),
+        "ulaw decode (long)": np.array_equal(ulaw_decode(long_codes), np.tile(ulaw_ref, 65)[:len(long_codes)]),
+        "ulaw decode pcm16": ulaw_decode_pcm16(long_codes) == np.tile(ulaw_ref, 65)[:len(long_codes)].astype("<i2").tobytes(),
+        "ulaw decode float": np.array_equal(ulaw_decode_float(long_codes),
+                                            np.tile(ulaw_ref, 65)[:len(long_codes)] / np.float32(32768.0)),
+        "alaw decode": np.array_equal(alaw_decode(codes), alaw_ref),
+        "alaw decode float": np.array_equal(alaw_decode_float(long_codes),
+                                            np.tile(alaw_ref, 65)[:len(long_codes)] / np.float32(32768.0)),
+        "ulaw encode": ulaw_encode(samples) == bytes(_ref_linear2ulaw(int(v)) for v in samples),
+        "alaw encode": alaw_encode(samples) == bytes(_ref_linear2alaw(int(v)) for v in samples),
+    }
+    return [name for name, ok in checks.items() if not ok]
+
+
+if __name__ == "__main__":
+    import sys
+
+    failed = verify()
+    print("G.711 tables bit-exact" if not failed else f"MISMATCH: {', '.join(failed)}")
+    sys.exit(1 if failed else 0)
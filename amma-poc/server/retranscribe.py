@@ -0,0 +1,180 @@
+"""
+Deferred High-Quality Re-transcription
+======================================
+Two-tier transcription: calls are transcribed live with a fast model
+(LIVE_WHISPER_MODEL) for an immediate preview, then re-transcribed in the
+background with a large model (FINAL_WHISPER_MODEL) during idle hours.
+
+- Runs only inside RETRANSCRIBE_HOURS (local time, e.g. "1-6" or "22-6")
+  and only while no call is live
+- The large model is loaded on the first job of a window and released
+  when the window ends, so it never competes with live calls for memory
+- Works from the per-speaker WAVs, so speaker labels are kept
+- The catalog records each call's current transcript version and model;
+  previous versions are kept in <session>/versions/v<N>/
+
+Configuration (env):
+    FINAL_WHISPER_MODEL   large model ("" disables re-transcription)
+    RETRANSCRIBE_HOURS    idle window, default "1-6"
+"""
+
+import asyncio
+import gc
+import os
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+from audio_io import read_wav, resample, WHISPER_RATE
+
+FINAL_WHISPER_MODEL = os.getenv("FINAL_WHISPER_MODEL", "large-v3")
+RETRANSCRIBE_HOURS = os.getenv("RETRANSCRIBE_HOURS", "1-6")
+
+# Seconds between checks for work
+CHECK_INTERVAL = 60
+
+
+def in_window(hours: str, now: datetime = None) -> bool:
+    """Whether `now` falls in an "H-H" window (end exclusive, may wrap midnight)"""
+    if not hours:
+        return False
+    start, end = (int(h) for h in hours.split("-"))
+    hour = (now or datetime.now()).hour
+    if start <= end:
+        return start <= hour < end
+    return hour >= start or hour < end
+
+
+def track_files(session_dir: Path, metadata: dict) -> list:
+    """(speaker, wav) pairs to transcribe - the mixed recording if there are no tracks"""
+    tracks = [(speaker, session_dir / f"{speaker}.wav") for speaker in metadata.get("tracks", {})]
+    tracks = [(speaker, path) for speaker, path in tracks if path.exists()]
+    return tracks or [(None, session_dir / "recording.wav")]
+
+
+def transcribe_tracks(model, session_dir: Path, metadata: dict, language: str = "te") -> list:
+    """
+    Transcribe every track of a finished call (blocking)
+    Returns: segments in time order, in the same shape as the live transcript
+    """
+    segments = []
+    for speaker, wav_path in track_files(session_dir, metadata):
+        samples, rate = read_wav(wav_path)
+        if not len(samples):
+            continue
+
+        result = model.transcribe(
+            resample(samples, rate, WHISPER_RATE).astype(np.float32),
+            language=language,
+            word_timestamps=True
+        )
+
+        for seg in result["segments"]:
+            text = seg["text"].strip()
+            if not text:
+                continue
+            entry = {
+                "start": round(seg["start"], 2),
+                "end": round(seg["end"], 2),
+                "text": text,
+                "final": True,
+                "avg_logprob": round(seg["avg_logprob"], 4),
+                "no_speech_prob": round(seg["no_speech_prob"], 4),
+                "compression_ratio": round(seg["compression_ratio"], 4),
+                "words": [
+                    {"word": w["word"], "start": round(w["start"], 2), "end": round(w["end"], 2),
+                     "probability": round(w["probability"], 4)}
+                    for w in seg.get("words", [])
+                ],
+            }
+            if speaker:
+                entry["speaker"] = speaker
+            segments.append(entry)
+
+    return sorted(segments, key=lambda s: s["start"])
+
+
+class Retranscriber:
+    """Background worker that upgrades live transcripts during idle hours"""
+
+    def __init__(self, catalog, output_dir: Path, executor, load_metadata, save, busy,
+                 model_name: str = FINAL_WHISPER_MODEL, hours: str = RETRANSCRIBE_HOURS):
+        """
+        load_metadata(session_dir) -> dict
+        save(session_dir, segments, model_name) writes the new version (blocking)
+        busy() -> True while calls are live
+        """
+        self.catalog = catalog
+        self.output_dir = Path(output_dir)
+        self.executor = executor
+        self.load_metadata = load_metadata
+        self.save = save
+        self.busy = busy
+        self.model_name = model_name
+        self.hours = hours
+
+        self.model = None
+        self.failed = set()     # Session IDs not to retry until restart
+        self.completed = 0
+        self.current = None
+
+    def _load_model(self):
+        if self.model is None:
+            import whisper
+            print(f"Re-transcription: loading Whisper {self.model_name}...")
+            self.model = whisper.load_model(self.model_name)
+        return self.model
+
+    def _unload_model(self):
+        if self.model is not None:
+            print("Re-transcription: window over, releasing model")
+            self.model = None
+            gc.collect()
+
+    def process(self, session_id: str):
+        """Re-transcribe one call (blocking, on the executor)"""
+        session_dir = self.output_dir / session_id
+        try:
+            metadata = self.load_metadata(session_dir)
+            segments = transcribe_tracks(self._load_model(), session_dir, metadata)
+            self.save(session_dir, segments, self.model_name)
+            self.completed += 1
+            print(f"Re-transcribed {session_id} with {self.model_name} ({len(segments)} segments)")
+        except Exception as e:
+            self.failed.add(session_id)
+            print(f"Re-transcription failed for {session_id}: {e}")
+
+    async def run(self):
+        if not self.model_name:
+            return
+
+        # Back to back while there is work; wait CHECK_INTERVAL only when there is none to do
+        while True:
+            if not in_window(self.hours):
+                await self.executor.run(self._unload_model)
+                await asyncio.sleep(CHECK_INTERVAL)
+                continue
+            if self.busy():
+                await asyncio.sleep(CHECK_INTERVAL)
+                continue
+
+            pending = await self.executor.run(self.catalog.needs_transcript, self.model_name, 1, self.failed)
+            if not pending:
+                await asyncio.sleep(CHECK_INTERVAL)
+                continue
+
+            self.current = pending[0]
+            await self.executor.run(self.process, pending[0])
+            self.current = None
+
+    def stats(self) -> dict:
+        return {
+            "model": self.model_name,
+            "hours": self.hours,
+            "active": in_window(self.hours),
+            "model_loaded": self.model is not None,
+            "current": self.current,
+            "completed": self.completed,
+            "failed": len(self.failed),
+        }
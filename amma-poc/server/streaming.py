@@ -0,0 +1,260 @@
+"""
+Streaming Transcription for Twilio Media Streams
+================================================
+Transcribes a call while it is still live instead of after the `stop` event.
+
+Per call:
+1. μ-law frames are decoded to PCM (mulaw.py tables) and written into a ring buffer
+2. An energy VAD (adaptive noise floor) cuts the stream into utterances
+3. Finished utterances are resampled to 16 kHz (audio_io.py, polyphase)
+   and go to the Whisper executor (see workers.py)
+4. Long utterances also get periodic partial transcriptions
+5. Partial and final segments are written to segments.json as they finish,
+   with word timestamps and Whisper's quality metrics (see transcript_sidecar.py)
+
+If the executor queue is full, finished utterances are kept (audio copied
+out of the ring buffer) and transcribed at finalize - audio is never lost
+to backpressure. When the call ends, finalize() flushes the last
+utterance and waits for outstanding work, so the post-call step is just
+writing transcript.txt.
+"""
+
+import asyncio
+import json
+import os
+import sys
+import threading
+from pathlib import Path
+
+import numpy as np
+
+import mulaw
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from audio_io import resample, WHISPER_RATE
+
+SAMPLE_RATE = 8000          # Twilio Media Streams: 8 kHz μ-law
+
+# VAD (20 ms frames, same as Twilio media packets)
+VAD_FRAME = SAMPLE_RATE // 50
+VAD_MIN_DB = -50.0          # Never treat anything quieter as speech
+VAD_MARGIN_DB = 12.0        # Speech = this much above the noise floor
+SILENCE_TO_CUT = 0.6        # Seconds of silence that end an utterance
+MIN_UTTERANCE = 0.4         # Shorter blips (clicks, coughs) are dropped
+MAX_UTTERANCE = 15.0        # Force a cut so segments stay near Whisper's window
+PRE_SPEECH = 0.2            # Audio kept before the detected speech onset
+PARTIAL_INTERVAL = 3.0      # Seconds of ongoing speech between partial results
+
+# Ring buffer must hold the longest utterance plus pre-speech padding
+RING_SECONDS = 30
+
+
+class RingBuffer:
+    """Fixed-size float32 sample buffer addressed by absolute sample index"""
+
+    def __init__(self, seconds: float = RING_SECONDS, sample_rate: int = SAMPLE_RATE):
+        self.size = int(seconds * sample_rate)
+        self.data = np.zeros(self.size, dtype=np.float32)
+        self.total = 0  # Samples written since the stream started
+
+    def write(self, samples: np.ndarray):
+        n = len(samples)
+        if n >= self.size:
+            samples = samples[-self.size:]
+            self.total += n - self.size
+            n = self.size
+
+        start = self.total % self.size
+        first = min(n, self.size - start)
+        self.data[start:start + first] = samples[:first]
+        self.data[:n - first] = samples[first:]
+        self.total += n
+
+    def read(self, start: int, end: int) -> np.ndarray:
+        """Samples [start, end) - start is clamped to what is still buffered"""
+        start = max(start, self.total - self.size, 0)
+        end = min(end, self.total)
+        if end <= start:
+            return np.zeros(0, dtype=np.float32)
+
+        idx = np.arange(start, end) % self.size
+        return self.data[idx]
+
+
+def ulaw_to_pcm16(payload: bytes) -> bytes:
+    """Decode a μ-law payload to 16-bit little-endian PCM"""
+    return mulaw.ulaw_decode_pcm16(payload)
+
+
+def pcm16_to_float(pcm: bytes) -> np.ndarray:
+    """16-bit PCM → float32 in [-1, 1)"""
+    return np.frombuffer(pcm, dtype=np.int16).astype(np.float32) / 32768.0
+
+
+def ulaw_to_float(payload: bytes) -> np.ndarray:
+    """Decode a μ-law payload to float32 PCM in [-1, 1)"""
+    return mulaw.ulaw_decode_float(payload)
+
+
+class StreamTranscriber:
+    """Live VAD + transcription for one call"""
+
+    def __init__(self, session_dir: Path, model, executor,
+                 language: str = "te", speaker: str = None):
+        self.session_dir = Path(session_dir)
+        self.model = model
+        self.executor = executor
+        self.language = language
+        self.speaker = speaker
+
+        self.ring = RingBuffer()
+        self.pending = np.zeros(0, dtype=np.float32)  # Samples not yet a full VAD frame
+
+        # VAD state
+        self.noise_db = VAD_MIN_DB
+        self.in_speech = False
+        self.speech_start = 0
+        self.last_voice = 0
+        self.last_partial = 0
+        self.utterance_id = 0
+
+        self.futures = []
+        self.deferred = []  # Finished utterances the executor had no room for
+
+        # Written from executor threads only
+        self.segments = []
+        self.segments_lock = threading.Lock()
+        self.segments_path = self.session_dir / (f"segments_{speaker}.json" if speaker else "segments.json")
+
+    # ---- event loop side (must stay cheap) ----
+
+    def feed(self, samples: np.ndarray):
+        """Add decoded PCM from one media frame"""
+        self.ring.write(samples)
+        self.pending = np.concatenate([self.pending, samples])
+
+        while len(self.pending) >= VAD_FRAME:
+            frame = self.pending[:VAD_FRAME]
+            self.pending = self.pending[VAD_FRAME:]
+            self._vad(frame, self.ring.total - len(self.pending))
+
+    def _vad(self, frame: np.ndarray, frame_end: int):
+        rms = float(np.sqrt(np.mean(frame * frame)) + 1e-9)
+        db = 20 * np.log10(rms)
+        voiced = db > max(self.noise_db + VAD_MARGIN_DB, VAD_MIN_DB)
+
+        if not voiced:
+            # Track the noise floor slowly, only on non-speech frames
+            self.noise_db = 0.95 * self.noise_db + 0.05 * db
+
+        if voiced:
+            self.last_voice = frame_end
+            if not self.in_speech:
+                self.in_speech = True
+                self.speech_start = max(frame_end - VAD_FRAME - int(PRE_SPEECH * SAMPLE_RATE), 0)
+                self.last_partial = frame_end
+
+        if not self.in_speech:
+            return
+
+        silence = (frame_end - self.last_voice) / SAMPLE_RATE
+        length = (frame_end - self.speech_start) / SAMPLE_RATE
+
+        if silence >= SILENCE_TO_CUT or length >= MAX_UTTERANCE:
+            self._end_utterance(frame_end)
+        elif (frame_end - self.last_partial) / SAMPLE_RATE >= PARTIAL_INTERVAL and self.executor.idle():
+            # Partial only when the executor has nothing better to do
+            self.last_partial = frame_end
+            self._submit(self.speech_start, frame_end, final=False)
+
+    def _end_utterance(self, end: int):
+        self.in_speech = False
+        if (self.last_voice - self.speech_start) / SAMPLE_RATE >= MIN_UTTERANCE:
+            self._submit(self.speech_start, end, final=True)
+        self.utterance_id += 1
+
+    def _submit(self, start: int, end: int, final: bool):
+        job = (self.ring.read(start, end), start / SAMPLE_RATE, self.utterance_id, final)
+
+        future = self.executor.try_submit(self._transcribe, *job)
+        if future is not None:
+            self.futures = [f for f in self.futures if not f.done()]
+            self.futures.append(future)
+        elif final:
+            # Queue full - keep the audio, transcribe when the call ends
+            self.deferred.append(job)
+
+    # ---- executor side ----
+
+    def _transcribe(self, audio: np.ndarray, offset: float, utterance_id: int, final: bool):
+        result = self.model.transcribe(
+            resample(audio, SAMPLE_RATE, WHISPER_RATE),
+            language=self.language,
+            fp16=False,
+            condition_on_previous_text=False,
+            word_timestamps=final   # Partials are only a preview
+        )
+
+        new_segments = []
+        for seg in result["segments"]:
+            text = seg["text"].strip()
+            if not text:
+                continue
+            entry = {
+                "utterance": utterance_id,
+                "start": round(offset + seg["start"], 2),
+                "end": round(offset + seg["end"], 2),
+                "text": text,
+                "final": final,
+                "avg_logprob": round(seg["avg_logprob"], 4),
+                "no_speech_prob": round(seg["no_speech_prob"], 4),
+                "compression_ratio": round(seg["compression_ratio"], 4),
+            }
+            if self.speaker:
+                entry["speaker"] = self.speaker
+            if seg.get("words"):
+                entry["words"] = [
+                    {"word": w["word"], "start": round(offset + w["start"], 2),
+                     "end": round(offset + w["end"], 2), "probability": round(w["probability"], 4)}
+                    for w in seg["words"]
+                ]
+            new_segments.append(entry)
+
+        with self.segments_lock:
+            # A newer result for the same utterance replaces its partials
+            self.segments = [s for s in self.segments
+                             if s["utterance"] != utterance_id or s["final"]]
+            self.segments.extend(new_segments)
+            self._write_segments()
+
+    def _write_segments(self):
+        tmp_path = self.segments_path.with_suffix(".json.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.segments, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.segments_path)
+
+    # ---- end of call ----
+
+    async def finalize(self, io_executor) -> list:
+        """
+        Flush the trailing utterance and wait for outstanding transcriptions.
+        The waiting happens on the event loop, so no io worker is held for a
+        speaker's Whisper backlog; only the final write runs on `io_executor`.
+        Returns: final segments in time order
+        """
+        if self.in_speech:
+            self._end_utterance(self.ring.total)
+
+        deferred = [self.executor.run(self._transcribe, *job) for job in self.deferred]
+        self.deferred = []
+
+        await asyncio.gather(*(asyncio.wrap_future(f) for f in self.futures), *deferred,
+                             return_exceptions=True)
+        return await io_executor.run(self._final_segments)
+
+    def _final_segments(self) -> list:
+        with self.segments_lock:
+            self.segments = [s for s in self.segments if s["final"]]
+            self.segments.sort(key=lambda s: s["start"])
+            self._write_segments()
+            return list(self.segments)
@@ -0,0 +1,72 @@
+"""
+Tests for tracks.py - mixing of per-track call audio
+
+Run: python -m pytest test_tracks.py
+"""
+
+import wave
+
+import numpy as np
+import pytest
+
+from tracks import CallRecorder, SAMPLE_RATE
+
+FRAME_MS = 20
+FRAME_SAMPLES = SAMPLE_RATE * FRAME_MS // 1000
+
+
+def frame(value: int) -> bytes:
+    return np.full(FRAME_SAMPLES, value, dtype=np.int16).tobytes()
+
+
+def read_wav(path) -> np.ndarray:
+    with wave.open(str(path)) as w:
+        return np.frombuffer(w.readframes(w.getnframes()), dtype=np.int16)
+
+
+def send(recorder, frames):
+    """frames: (track, timestamp_ms, value), in arrival order"""
+    for sequence, (track, timestamp_ms, value) in enumerate(frames, 1):
+        recorder.add(track, frame(value), timestamp_ms, sequence)
+    recorder.close()
+
+
+def test_tracks_from_start_are_summed(tmp_path):
+    recorder = CallRecorder(tmp_path)
+    send(recorder, [(track, ms, value)
+                    for ms in range(0, 1000, FRAME_MS)
+                    for track, value in (("inbound", 100), ("outbound", 200))])
+
+    mix = read_wav(tmp_path / "recording.wav")
+    assert len(mix) == SAMPLE_RATE
+    assert (mix == 300).all()
+
+
+@pytest.mark.parametrize("join_seconds", [1, 5])
+def test_late_track_is_mixed_on_the_stream_timeline(tmp_path, join_seconds):
+    # Inbound from 0 s, outbound only joins at `join_seconds` (past MAX_TRACK_LAG for 5 s)
+    join_ms, end_ms = join_seconds * 1000, (join_seconds + 1) * 1000
+    frames = [("inbound", ms, 100) for ms in range(0, join_ms, FRAME_MS)]
+    for ms in range(join_ms, end_ms, FRAME_MS):
+        frames += [("inbound", ms, 100), ("outbound", ms, 200)]
+    recorder = CallRecorder(tmp_path)
+    send(recorder, frames)
+
+    join = join_seconds * SAMPLE_RATE
+    mix = read_wav(tmp_path / "recording.wav")
+    assert len(mix) == join + SAMPLE_RATE
+    assert (mix[:join] == 100).all()
+    assert (mix[join:] == 300).all()
+
+    amma = read_wav(tmp_path / "amma.wav")
+    assert len(amma) == join + SAMPLE_RATE
+    assert (amma[:join] == 0).all() and (amma[join:] == 200).all()
+
+
+def test_single_track_is_mixed_in_full(tmp_path):
+    recorder = CallRecorder(tmp_path)
+    send(recorder, [("inbound", ms, 100) for ms in range(0, 3000, FRAME_MS)])
+
+    mix = read_wav(tmp_path / "recording.wav")
+    assert len(mix) == 3 * SAMPLE_RATE
+    assert (mix == 100).all()
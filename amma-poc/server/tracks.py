@@ -0,0 +1,249 @@
+"""
+Per-Track Call Recording
+========================
+Twilio Media Streams with track="both_tracks" send each side of the call
+as its own `track`:
+- inbound:  audio from the caller (you, dialing the Twilio number)
+- outbound: audio sent back to the caller (Amma, via <Dial>)
+
+Keeping the tracks apart gives speaker separation for free - no
+embedding clustering afterwards. Each track is placed on the stream
+timeline by its media `timestamp` (ms since stream start): gaps are
+filled with silence, overlapping frames are trimmed and repeated
+`sequenceNumber`s are dropped.
+
+Every file is also resampled while the call is live into the canonical
+training format (22.05 kHz mono, see audio_io.py), so the recording
+pipeline never has to run ffmpeg on server calls. The resampling runs on
+the io executor (see workers.py), never on the event loop.
+
+Output per call:
+    amma.wav                  # outbound track
+    caller.wav                # inbound track
+    recording.wav             # both tracks mixed, sample-aligned
+    *_processed.wav           # 22.05 kHz versions of the above
+"""
+
+import sys
+import threading
+from collections import deque
+from pathlib import Path
+
+import numpy as np
+
+from wav_writer import StreamingWavWriter
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from audio_io import Resampler, to_pcm16, CANONICAL_RATE
+
+SAMPLE_RATE = 8000
+
+# Input audio gathered before each resampling step (keeps per-frame overhead off the event loop)
+CANONICAL_BLOCK_SECONDS = 0.5
+
+TRACK_SPEAKERS = {
+    "inbound": "caller",
+    "outbound": "amma",
+}
+
+# Timestamp differences below this are jitter, not gaps (samples)
+JITTER_SAMPLES = SAMPLE_RATE // 200   # 5 ms
+
+# If one track falls this far behind the other (e.g. it stopped sending),
+# it is padded with silence so the mix keeps moving (samples)
+MAX_TRACK_LAG = 2 * SAMPLE_RATE
+
+
+class TrackAligner:
+    """Places one track's frames on the stream timeline"""
+
+    def __init__(self):
+        self.position = 0           # Samples emitted so far
+        self.last_sequence = None
+        self.gap_samples = 0        # Silence inserted
+        self.trimmed_samples = 0    # Overlapping samples dropped
+        self.gaps = 0               # Times silence had to be inserted
+
+    def align(self, pcm: bytes, timestamp_ms: int = None, sequence: int = None) -> bytes:
+        """Return the PCM to append for this frame (may be padded or trimmed)"""
+        if sequence is not None:
+            # sequenceNumber counts messages across both tracks, so it only
+            # identifies duplicates here - gaps are found from timestamps
+            if self.last_sequence is not None and sequence <= self.last_sequence:
+                return b""
+            self.last_sequence = sequence
+
+        if timestamp_ms is None:
+            self.position += len(pcm) // 2
+            return pcm
+
+        start = int(timestamp_ms) * SAMPLE_RATE // 1000
+        diff = start - self.position
+
+        if diff > JITTER_SAMPLES:
+            self.gap_samples += diff
+            self.gaps += 1
+            pcm = bytes(diff * 2) + pcm
+        elif diff < -JITTER_SAMPLES:
+            overlap = min(-diff, len(pcm) // 2)
+            self.trimmed_samples += overlap
+            pcm = pcm[overlap * 2:]
+
+        self.position += len(pcm) // 2
+        return pcm
+
+    def pad_to(self, position: int) -> bytes:
+        """Silence that brings this track up to `position`"""
+        if position <= self.position:
+            return b""
+        silence = bytes((position - self.position) * 2)
+        self.gap_samples += position - self.position
+        self.position = position
+        return silence
+
+
+class CanonicalWriter:
+    """
+    8 kHz PCM in, 22.05 kHz WAV out - resampled in blocks as audio arrives
+    With an `executor` (BoundedExecutor) the resampling runs on its workers:
+    write() only queues the block, workers drain the queue in order. If the
+    executor is full, blocks wait for the next drain (or close()).
+    """
+
+    def __init__(self, path: Path, info: dict = None, executor=None):
+        self.resampler = Resampler(SAMPLE_RATE, CANONICAL_RATE)
+        self.writer = StreamingWavWriter(path, CANONICAL_RATE, info=info)
+        self.executor = executor
+        self.buffer = bytearray()
+        self.block_bytes = int(CANONICAL_BLOCK_SECONDS * SAMPLE_RATE) * 2
+        self.blocks = deque()               # Full blocks not resampled yet
+        self.lock = threading.Lock()        # One drain at a time keeps blocks in order
+
+    def write(self, pcm: bytes):
+        self.buffer += pcm
+        if len(self.buffer) >= self.block_bytes:
+            self.blocks.append(bytes(self.buffer))
+            self.buffer.clear()
+            if self.executor is None:
+                self._drain()
+            else:
+                self.executor.try_submit(self._drain)
+
+    def _drain(self):
+        with self.lock:
+            while self.blocks:
+                samples = np.frombuffer(self.blocks.popleft(), dtype=np.int16).astype(np.float32) / 32768.0
+                self.writer.write(to_pcm16(self.resampler.process(samples)))
+
+    def close(self):
+        """Resample what is left and close the file (blocking)"""
+        self.blocks.append(bytes(self.buffer))
+        self.buffer.clear()
+        self._drain()
+        with self.lock:
+            self.writer.write(to_pcm16(self.resampler.flush()))
+            self.writer.close()
+
+
+class CallRecorder:
+    """Per-speaker WAVs plus a sample-aligned mix, written incrementally"""
+
+    def __init__(self, session_dir: Path, info: dict = None, executor=None):
+        """`executor` runs the 22.05 kHz resampling (see CanonicalWriter)"""
+        self.session_dir = Path(session_dir)
+        self.info = info or {}
+        self.executor = executor
+
+        self.aligners = {}
+        self.writers = {}
+        self.canonical = {}
+        self.pending = {}   # Aligned PCM per track not yet mixed, from mixed_position on
+        self.mixed_position = 0
+        self.mixed = StreamingWavWriter(self.session_dir / "recording.wav", SAMPLE_RATE, info=self.info)
+        self.mixed_canonical = CanonicalWriter(self.session_dir / "recording_processed.wav", self.info, executor)
+
+    def _track(self, track: str):
+        if track not in self.aligners:
+            speaker = TRACK_SPEAKERS.get(track, track)
+            self.aligners[track] = TrackAligner()
+            self.writers[track] = StreamingWavWriter(
+                self.session_dir / f"{speaker}.wav", SAMPLE_RATE, info={**self.info, "track": track})
+            self.canonical[track] = CanonicalWriter(
+                self.session_dir / f"{speaker}_processed.wav", {**self.info, "track": track}, self.executor)
+            self.pending[track] = bytearray()
+        return self.aligners[track]
+
+    def add(self, track: str, pcm: bytes, timestamp_ms: int = None, sequence: int = None) -> bytes:
+        """
+        Add one media frame.
+        Returns: the aligned PCM appended to this track (feed it to transcription)
+        """
+        aligned = self._track(track).align(pcm, timestamp_ms, sequence)
+        self._append(track, aligned)
+
+        # Keep a stalled track from holding back the mix
+        lead = max(a.position for a in self.aligners.values())
+        for other, aligner in self.aligners.items():
+            if lead - aligner.position > MAX_TRACK_LAG:
+                self._append(other, aligner.pad_to(lead - MAX_TRACK_LAG // 2))
+
+        self._mix()
+        return aligned
+
+    def position(self, track: str) -> int:
+        """Samples written to a track so far"""
+        return self.aligners[track].position
+
+    def _append(self, track: str, pcm: bytes):
+        if pcm:
+            self.writers[track].write(pcm)
+            self.canonical[track].write(pcm)
+            # A track that joined late starts behind the mix - only what is past it is mixed
+            behind = self.mixed_position - (self.aligners[track].position - len(pcm) // 2)
+            self.pending[track] += pcm[max(behind, 0) * 2:]
+
+    def _mix(self, flush: bool = False):
+        n = min(len(p) for p in self.pending.values()) // 2 * 2
+        if not flush and len(self.pending) < len(TRACK_SPEAKERS):
+            # The other side hasn't sent yet - hold the mix back as for a stalled track
+            lead = max(a.position for a in self.aligners.values())
+            n = min(n, max(lead - MAX_TRACK_LAG - self.mixed_position, 0) * 2)
+        if n == 0:
+            return
+
+        mix = np.zeros(n // 2, dtype=np.int32)
+        for track, pending in self.pending.items():
+            mix += np.frombuffer(bytes(pending[:n]), dtype=np.int16)
+            del pending[:n]
+
+        self.mixed_position += n // 2
+        pcm = np.clip(mix, -32768, 32767).astype(np.int16).tobytes()
+        self.mixed.write(pcm)
+        self.mixed_canonical.write(pcm)
+
+    def close(self):
+        """Pad all tracks to the same length, flush the mix and close every file (blocking)"""
+        if self.aligners:
+            end = max(a.position for a in self.aligners.values())
+            for track, aligner in self.aligners.items():
+                self._append(track, aligner.pad_to(end))
+            self._mix(flush=True)
+
+        for writer in [*self.writers.values(), *self.canonical.values(), self.mixed_canonical]:
+            writer.close()
+        self.mixed.close()
+
+    @property
+    def duration(self) -> float:
+        return self.mixed.duration
+
+    def stats(self) -> dict:
+        return {
+            TRACK_SPEAKERS.get(track, track): {
+                "duration_seconds": round(self.writers[track].duration, 2),
+                "gap_seconds": round(a.gap_samples / SAMPLE_RATE, 2),
+                "trimmed_seconds": round(a.trimmed_samples / SAMPLE_RATE, 2),
+                "gaps": a.gaps,
+            }
+            for track, a in self.aligners.items()
+        }
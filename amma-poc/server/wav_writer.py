@@ -0,0 +1,155 @@
+"""
+Incremental WAV Writer with Crash Journal
+=========================================
+Writes call audio to disk frame by frame instead of holding the whole
+call in memory, so memory per call stays constant and a crash keeps
+everything received so far.
+
+- The RIFF header is written up front with zero sizes and fixed up every
+  HEADER_FIXUP_SECONDS of audio, so the file is a valid WAV at all times
+  (at worst missing the last few seconds from its header).
+- A JSONL journal next to the WAV records the stream details and each
+  fixup. A journal without a "closed" record means the writer never
+  finished; recover() then repairs the header from the actual file size.
+
+Layout:
+    recording.wav
+    recording.journal    # {"event": "open" | "fixup" | "closed" | "recovered", ...}
+"""
+
+import json
+import os
+import struct
+import time
+from pathlib import Path
+
+HEADER_SIZE = 44
+HEADER_FIXUP_SECONDS = 5
+
+
+def wav_header(data_bytes: int, sample_rate: int, channels: int = 1, sampwidth: int = 2) -> bytes:
+    """44-byte PCM WAV header"""
+    block_align = channels * sampwidth
+    return struct.pack(
+        "<4sI4s4sIHHIIHH4sI",
+        b"RIFF", 36 + data_bytes, b"WAVE",
+        b"fmt ", 16, 1, channels, sample_rate, sample_rate * block_align, block_align, sampwidth * 8,
+        b"data", data_bytes
+    )
+
+
+def journal_path(wav_path: Path) -> Path:
+    return Path(wav_path).with_suffix(".journal")
+
+
+class StreamingWavWriter:
+    """Append-only 16-bit PCM WAV writer with periodic header fixups"""
+
+    def __init__(self, path: Path, sample_rate: int = 8000, channels: int = 1, info: dict = None):
+        self.path = Path(path)
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.block_align = channels * 2
+
+        self.data_bytes = 0
+        self.fixed_bytes = 0
+        self.fixup_bytes = HEADER_FIXUP_SECONDS * sample_rate * self.block_align
+
+        self.file = open(self.path, "wb")
+        self.file.write(wav_header(0, sample_rate, channels))
+
+        self.journal = open(journal_path(self.path), "a", encoding="utf-8")
+        self._log("open", sample_rate=sample_rate, channels=channels, **(info or {}))
+
+    @property
+    def frames(self) -> int:
+        return self.data_bytes // self.block_align
+
+    @property
+    def duration(self) -> float:
+        return self.frames / self.sample_rate
+
+    def _log(self, event: str, **data):
+        self.journal.write(json.dumps({"event": event, "time": time.time(), **data}) + "\n")
+        self.journal.flush()
+
+    def write(self, pcm: bytes):
+        """Append interleaved 16-bit PCM"""
+        self.file.write(pcm)
+        self.data_bytes += len(pcm)
+
+        if self.data_bytes - self.fixed_bytes >= self.fixup_bytes:
+            self.fixup()
+
+    def fixup(self):
+        """Rewrite the header sizes and push buffered audio to the OS"""
+        self.file.seek(0)
+        self.file.write(wav_header(self.data_bytes, self.sample_rate, self.channels))
+        self.file.seek(0, os.SEEK_END)
+        self.file.flush()
+
+        self.fixed_bytes = self.data_bytes
+        self._log("fixup", data_bytes=self.data_bytes)
+
+    def close(self):
+        """Final header, fsync, and mark the journal closed (blocking)"""
+        if self.file.closed:
+            return
+
+        self.fixup()
+        os.fsync(self.file.fileno())
+        self.file.close()
+
+        self._log("closed", data_bytes=self.data_bytes, duration=self.duration)
+        self.journal.close()
+
+
+def read_journal(wav_path: Path) -> list:
+    """Journal records (a torn last line from a crash is ignored)"""
+    path = journal_path(wav_path)
+    if not path.exists():
+        return []
+
+    records = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                break
+    return records
+
+
+def needs_recovery(wav_path: Path) -> bool:
+    """True if the writer for this WAV never closed it"""
+    records = read_journal(wav_path)
+    return bool(records) and not any(r["event"] in ("closed", "recovered") for r in records)
+
+
+def recover(wav_path: Path) -> dict:
+    """
+    Repair a WAV left behind by a crashed writer.
+    Keeps every complete sample on disk, even past the last header fixup.
+    Returns: the journal's "open" record plus recovered sizes
+    """
+    wav_path = Path(wav_path)
+    records = read_journal(wav_path)
+    opened = next(r for r in records if r["event"] == "open")
+
+    block_align = opened["channels"] * 2
+    size = wav_path.stat().st_size
+    data_bytes = max(size - HEADER_SIZE, 0) // block_align * block_align
+
+    with open(wav_path, "r+b") as f:
+        f.truncate(HEADER_SIZE + data_bytes)
+        f.seek(0)
+        f.write(wav_header(data_bytes, opened["sample_rate"], opened["channels"]))
+        f.flush()
+        os.fsync(f.fileno())
+
+    duration = data_bytes / block_align / opened["sample_rate"]
+    with open(journal_path(wav_path), "a", encoding="utf-8") as f:
+        f.write(json.dumps({"event": "recovered", "time": time.time(),
+                            "data_bytes": data_bytes, "duration": duration}) + "\n")
+
+    return {**opened, "data_bytes": data_bytes, "duration": duration}
@@ -0,0 +1,194 @@
+"""
+Executors for CPU-bound and blocking work
+=========================================
+Whisper, WAV encoding and file writes must never run on the FastAPI event
+loop - one blocking transcription freezes every live media stream and
+/health. Work is dispatched to bounded thread pools instead:
+
+- whisper: transcription (1 worker per loaded model - Whisper installs
+  kv-cache hooks on the model, so one instance can't decode concurrently)
+- io: audio encoding, file writes, finalizing calls
+
+Each pool has a bounded queue. try_submit() refuses work when full (the
+caller decides what to keep for later) and run() waits asynchronously for
+a slot, so backpressure shows up in the metrics instead of as lost audio.
+"""
+
+import asyncio
+import os
+import resource
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+class BoundedExecutor:
+    """Thread pool with a bounded queue and backpressure metrics"""
+
+    def __init__(self, name: str, max_workers: int = 1, max_queue: int = 64):
+        self.name = name
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self.slots = threading.BoundedSemaphore(max_workers + max_queue)
+
+        self.lock = threading.Lock()
+        self.pending = 0            # Queued + running
+        self.running = 0
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.peak_pending = 0
+        self.wait_seconds = 0.0     # Time spent queued before a worker picked it up
+        self.run_seconds = 0.0
+        self.slot_wait_seconds = 0.0  # Time callers spent waiting for queue space
+
+    def _run(self, func, args, queued_at):
+        started = time.perf_counter()
+        with self.lock:
+            self.running += 1
+            self.wait_seconds += started - queued_at
+        try:
+            return func(*args)
+        except Exception:
+            with self.lock:
+                self.failed += 1
+            raise
+        finally:
+            with self.lock:
+                self.running -= 1
+                self.pending -= 1
+                self.completed += 1
+                self.run_seconds += time.perf_counter() - started
+            self.slots.release()
+
+    def _submit(self, func, args):
+        with self.lock:
+            self.pending += 1
+            self.submitted += 1
+            self.peak_pending = max(self.peak_pending, self.pending)
+        return self.executor.submit(self._run, func, args, time.perf_counter())
+
+    def try_submit(self, func, *args):
+        """Submit without blocking. Returns a Future, or None if the queue is full."""
+        if not self.slots.acquire(blocking=False):
+            with self.lock:
+                self.rejected += 1
+            return None
+        return self._submit(func, args)
+
+    def submit(self, func, *args):
+        """Submit, blocking the calling thread until there is queue space (never on the event loop)"""
+        started = time.perf_counter()
+        self.slots.acquire()
+        with self.lock:
+            self.slot_wait_seconds += time.perf_counter() - started
+        return self._submit(func, args)
+
+    async def run(self, func, *args):
+        """Run on the pool and await the result, waiting asynchronously for queue space"""
+        started = time.perf_counter()
+        while not self.slots.acquire(blocking=False):
+            await asyncio.sleep(0.05)
+        with self.lock:
+            self.slot_wait_seconds += time.perf_counter() - started
+        return await asyncio.wrap_future(self._submit(func, args))
+
+    def idle(self) -> bool:
+        return self.pending == 0
+
+    def stats(self) -> dict:
+        with self.lock:
+            done = max(self.completed, 1)
+            return {
+                "workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "queued": self.pending - self.running,
+                "running": self.running,
+                "peak_pending": self.peak_pending,
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "failed": self.failed,
+                "rejected": self.rejected,
+                "avg_wait_ms": round(self.wait_seconds / done * 1000, 1),
+                "avg_run_ms": round(self.run_seconds / done * 1000, 1),
+                "slot_wait_seconds": round(self.slot_wait_seconds, 2),
+            }
+
+
+class LoopLagMonitor:
+    """Measures how late the event loop wakes up - the symptom of blocking work"""
+
+    def __init__(self, interval: float = 0.5):
+        self.interval = interval
+        self.last_ms = 0.0
+        self.max_ms = 0.0
+        self.total_ms = 0.0
+        self.samples = 0
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(loop.time() - expected, 0.0) * 1000
+            self.last_ms = lag
+            self.max_ms = max(self.max_ms, lag)
+            self.total_ms += lag
+            self.samples += 1
+
+    def stats(self) -> dict:
+        return {
+            "last_ms": round(self.last_ms, 2),
+            "max_ms": round(self.max_ms, 2),
+            "avg_ms": round(self.total_ms / max(self.samples, 1), 2),
+        }
+
+
+class Timings:
+    """Running count / average / max of a duration"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.last = 0.0
+
+    def add(self, value: float):
+        with self.lock:
+            self.count += 1
+            self.total += value
+            self.max = max(self.max, value)
+            self.last = value
+
+    def stats(self, ndigits: int = 2) -> dict:
+        with self.lock:
+            return {
+                "count": self.count,
+                "last": round(self.last, ndigits),
+                "max": round(self.max, ndigits),
+                "avg": round(self.total / max(self.count, 1), ndigits),
+            }
+
+
+def process_stats() -> dict:
+    """CPU time and memory of this server process (for load testing)"""
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    stats = {
+        "cpu_seconds": round(usage.ru_utime + usage.ru_stime, 3),
+        "threads": threading.active_count(),
+    }
+
+    try:
+        # Current RSS (Linux); ru_maxrss is only the peak
+        with open("/proc/self/statm") as f:
+            stats["rss_mb"] = round(int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20, 1)
+    except OSError:
+        pass
+
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    peak = usage.ru_maxrss / (2**20 if os.uname().sysname == "Darwin" else 2**10)
+    stats["peak_rss_mb"] = round(peak, 1)
+    return stats
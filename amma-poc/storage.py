@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Lossless FLAC Storage Tier
+Speech compresses about 2x losslessly, so recordings are kept as FLAC at
+every stage instead of WAV (audio_io.STORAGE_FORMAT decides what new
+files are written as).
+
+Raw recordings policy (RAW_WAV_POLICY env):
+    until-archived   keep the raw WAV until the NAS has a verified copy,
+                     then replace it with a FLAC of identical samples
+                     (default)
+    keep             never touch raw WAVs
+
+Replacements are verified sample-for-sample before a WAV is deleted, and
+the ledger keeps pointing at the same recording (the FLAC is an alias of
+the WAV's content hash), so nothing is reprocessed.
+
+Usage:
+    python storage.py migrate               # existing WAVs → FLAC, reports bytes saved
+    python storage.py migrate --dry-run     # what would be converted
+    python storage.py migrate path/to/dir   # specific directories / files
+"""
+
+import json
+import os
+from pathlib import Path
+
+from audio_io import STORAGE_FORMAT, same_audio, soundfile, to_flac
+from ledger import Ledger
+
+SCRIPT_DIR = Path(__file__).parent
+VOICE_DIR = SCRIPT_DIR / "voice"
+TOOLS_VOICES_DIR = SCRIPT_DIR.parent / "tools" / "voices"
+
+RAW_WAV_POLICY = os.getenv("RAW_WAV_POLICY", "until-archived")
+
+# Directories the migration covers by default - raw/ is handled by policy
+MIGRATE_DIRS = [
+    VOICE_DIR / "processed",
+    VOICE_DIR / "archived",
+    TOOLS_VOICES_DIR / "raw",
+    TOOLS_VOICES_DIR / "processed",
+    TOOLS_VOICES_DIR / "separated",
+]
+
+
+def wav_to_flac(wav_path: Path, ledger: Ledger = None, digest: str = None):
+    """
+    Replace a WAV with a verified lossless FLAC next to it
+    The FLAC is written under a "." name (ignored by the watcher), checked,
+    then renamed into place. With `digest` (raw recordings) the FLAC is
+    registered in the ledger as that same recording first; stage outputs
+    pointing at the WAV are moved to the FLAC.
+    Returns: (flac path, bytes saved), or None if the WAV can't be stored as FLAC
+    """
+    wav_path = Path(wav_path)
+    flac_path = wav_path.with_suffix(".flac")
+    tmp_path = wav_path.with_name(f".{flac_path.name}.tmp")
+
+    try:
+        if not to_flac(wav_path, tmp_path) or not same_audio(wav_path, tmp_path):
+            return None
+
+        wav_size = wav_path.stat().st_size
+        if ledger and digest:
+            ledger.alias(flac_path, digest, tmp_path.stat())
+        os.replace(tmp_path, flac_path)
+        if ledger:
+            ledger.move_output(wav_path, flac_path)
+        wav_path.unlink()
+        return flac_path, wav_size - flac_path.stat().st_size
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+
+def compact_raw(wav_path: Path, ledger: Ledger, digest: str):
+    """
+    Apply RAW_WAV_POLICY to a raw recording whose stages are all done
+    Returns: the FLAC path if the WAV was replaced, else None
+    """
+    wav_path = Path(wav_path)
+    if STORAGE_FORMAT != "flac" or RAW_WAV_POLICY != "until-archived" or wav_path.suffix.lower() != ".wav":
+        return None
+    if not wav_path.exists() or not ledger.done(digest, "archived"):
+        return None
+
+    result = wav_to_flac(wav_path, ledger, digest)
+    return result[0] if result else None
+
+
+def fix_manifests(directory: Path):
+    """Point separate_speakers.py manifests at segments that are now FLAC"""
+    for manifest_path in directory.rglob("manifest.json"):
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+
+        changed = False
+        for speaker_id, info in manifest.get("speakers", {}).items():
+            for seg in info.get("segments", []):
+                name = Path(seg.get("file", ""))
+                flac = manifest_path.parent / speaker_id / name.with_suffix(".flac")
+                if name.suffix == ".wav" and flac.exists():
+                    seg["file"] = flac.name
+                    changed = True
+
+        if changed:
+            with open(manifest_path, "w") as f:
+                json.dump(manifest, f, indent=2)
+
+
+def migrate(paths: list, ledger: Ledger, raw_dir: Path = None, dry_run: bool = False) -> dict:
+    """
+    Convert existing WAVs under `paths` (and archived raw recordings in `raw_dir`) to FLAC
+    Returns: {"converted", "skipped", "bytes_before", "bytes_saved"}
+    """
+    files = []     # (wav, ledger hash for raw recordings)
+    for path in paths:
+        path = Path(path)
+        if path.is_dir():
+            files += [(f, None) for f in sorted(path.rglob("*.wav")) if not f.name.startswith(("_", "."))]
+        elif path.suffix.lower() == ".wav":
+            files.append((path, None))
+
+    # Raw recordings only once the NAS has a verified copy
+    if raw_dir and RAW_WAV_POLICY == "until-archived" and raw_dir.exists():
+        for wav_path in sorted(raw_dir.glob("*.wav")):
+            if not wav_path.name.startswith(("_", ".")):
+                digest = ledger.register(wav_path)["hash"]
+                if ledger.done(digest, "archived"):
+                    files.append((wav_path, digest))
+
+    stats = {"converted": 0, "skipped": 0, "bytes_before": 0, "bytes_saved": 0}
+    for wav_path, digest in files:
+        size = wav_path.stat().st_size
+        if dry_run:
+            print(f"  would convert {wav_path} ({size / 1e6:.1f} MB)")
+            stats["converted"] += 1
+            stats["bytes_before"] += size
+            continue
+
+        result = wav_to_flac(wav_path, ledger, digest)
+        if result is None:
+            print(f"  - {wav_path.name}: kept as WAV (not integer PCM, or could not verify)")
+            stats["skipped"] += 1
+            continue
+
+        flac_path, saved = result
+        stats["converted"] += 1
+        stats["bytes_before"] += size
+        stats["bytes_saved"] += saved
+        print(f"  ✓ {wav_path.name} → {flac_path.name} ({size / 1e6:.1f} → {(size - saved) / 1e6:.1f} MB)")
+
+    if not dry_run:
+        for path in paths:
+            if Path(path).is_dir():
+                fix_manifests(Path(path))
+    return stats
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="FLAC storage tier")
+    sub = parser.add_subparsers(dest="command", required=True)
+    migrate_parser = sub.add_parser("migrate", help="Convert existing WAVs to lossless FLAC")
+    migrate_parser.add_argument("paths", nargs="*", help=f"Directories / files (default: {len(MIGRATE_DIRS)} "
+                                                        "pipeline directories + archived raw recordings)")
+    migrate_parser.add_argument("--dry-run", action="store_true", help="Only list what would be converted")
+    args = parser.parse_args()
+
+    if soundfile is None:
+        print("soundfile is required for FLAC: pip install soundfile")
+        return
+
+    if args.paths:
+        stats = migrate([Path(p) for p in args.paths], Ledger(), dry_run=args.dry_run)
+    else:
+        stats = migrate([d for d in MIGRATE_DIRS if d.exists()], Ledger(), raw_dir=VOICE_DIR / "raw",
+                        dry_run=args.dry_run)
+
+    kept = f", kept {stats['skipped']} as WAV" if stats["skipped"] else ""
+    print(f"\n{'Would convert' if args.dry_run else 'Converted'} {stats['converted']} file(s){kept}")
+    if not args.dry_run and stats["bytes_before"]:
+        print(f"Saved {stats['bytes_saved'] / 1e6:.1f} MB of {stats['bytes_before'] / 1e6:.1f} MB "
+              f"({100 * stats['bytes_saved'] / stats['bytes_before']:.0f}%)")
+
+
+if __name__ == "__main__":
+    main()
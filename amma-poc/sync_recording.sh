@@ -25,7 +25,10 @@ echo "=============================================="
 if [ -n "$1" ]; then
     FILES=("$1")
 else
-    FILES=(voice/raw/*.wav)
+    # Finished recordings only (auto_record_calls.py writes _recording_in_progress.* first)
+    shopt -s nullglob
+    FILES=(voice/raw/[!_.]*.wav voice/raw/[!_.]*.flac)
+    shopt -u nullglob
 fi
 
 if [ ${#FILES[@]} -eq 0 ] || [ ! -f "${FILES[0]}" ]; then
@@ -78,25 +81,22 @@ if [[ $REPLY =~ ^[Yy]$ ]]; then
     echo "Step 3: Archive to US NAS (4TB)..."
     echo "----------------------------------------------"
 
-    # Create archive directory on NAS if needed
-    ssh -p ${NAS_PORT} ${NAS_HOST} "mkdir -p ${NAS_ARCHIVE_PATH}/raw"
+    # One rsync session for all files, each verified by sha256 on the NAS
+    # (interrupted transfers resume; ARCHIVE_FLAC=1 sends lossless FLAC)
+    ARCHIVE_ARGS=()
+    [ -n "$ARCHIVE_FLAC" ] && ARCHIVE_ARGS+=(--flac)
 
-    for f in "${FILES[@]}"; do
-        if [ -f "$f" ]; then
-            echo "  Archiving $(basename "$f")..."
-            scp -P ${NAS_PORT} "$f" "${NAS_HOST}:${NAS_ARCHIVE_PATH}/raw/"
-            if [ $? -eq 0 ]; then
-                echo "  ✓ Archived to NAS"
+    if NAS_HOST="${NAS_HOST}" NAS_PORT="${NAS_PORT}" NAS_PATH="${NAS_ARCHIVE_PATH}" \
+            python3 archive.py "${ARCHIVE_ARGS[@]}" "${FILES[@]}"; then
+        echo "  ✓ Archived to NAS"
 
-                # Move to local archive (don't delete, just move)
-                mkdir -p voice/archived
-                mv "$f" voice/archived/
-                echo "  ✓ Moved to local archive"
-            else
-                echo "  ✗ Failed to archive to NAS (file kept locally)"
-            fi
-        fi
-    done
+        # Move to local archive (don't delete, just move)
+        mkdir -p voice/archived
+        mv "${FILES[@]}" voice/archived/
+        echo "  ✓ Moved to local archive"
+    else
+        echo "  ✗ Failed to archive some files to NAS (files kept locally, rerun to resume)"
+    fi
 fi
 
 echo ""
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Transcript Sidecar - Word Timestamps and Quality Metrics
+Stores Whisper segments in a compact columnar .npz next to a transcript,
+so training-data selection can filter utterances without re-running ASR.
+
+Columns (one row per segment):
+    start, end                                  # seconds
+    avg_logprob, no_speech_prob, compression_ratio
+    speaker                                     # index into `speakers` (-1 = unknown)
+    text                                        # offsets into one UTF-8 blob
+    words                                       # offsets into the word columns
+
+Word columns (one row per word):
+    word_start, word_end, word_probability, word_text
+
+Usage:
+    from transcript_sidecar import write_sidecar, read_sidecar
+    write_sidecar("transcript.words.npz", result["segments"])
+
+    sidecar = read_sidecar("transcript.words.npz")
+    for seg in sidecar.select(speaker="amma", min_duration=2.0):
+        print(seg["start"], seg["text"], seg["words"])
+
+Command line:
+    python transcript_sidecar.py recordings/*/transcript.words.npz --speaker amma
+"""
+
+import os
+from pathlib import Path
+
+import numpy as np
+
+SIDECAR_SUFFIX = ".words.npz"
+
+# Defaults match Whisper's own fallback thresholds
+MIN_AVG_LOGPROB = -1.0
+MAX_NO_SPEECH_PROB = 0.6
+MAX_COMPRESSION_RATIO = 2.4
+
+
+def _pack_strings(strings: list):
+    """Strings → (UTF-8 blob, int64 offsets with len(strings) + 1 entries)"""
+    encoded = [s.encode("utf-8") for s in strings]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(e) for e in encoded])
+    return np.frombuffer(b"".join(encoded), dtype=np.uint8), offsets
+
+
+def _unpack(blob: np.ndarray, offsets: np.ndarray, i: int) -> str:
+    return blob[offsets[i]:offsets[i + 1]].tobytes().decode("utf-8")
+
+
+def sidecar_path(path: Path) -> Path:
+    """Sidecar next to a transcript / segments / audio file"""
+    path = Path(path)
+    return path.with_name(path.stem + SIDECAR_SUFFIX)
+
+
+def write_sidecar(path: Path, segments: list):
+    """
+    Write Whisper-style segments (with optional "words" and "speaker") atomically
+    """
+    speakers = sorted({s["speaker"] for s in segments if s.get("speaker")})
+    words = [w for s in segments for w in s.get("words") or []]
+
+    def column(key, default=np.nan):
+        return np.array([s.get(key, default) for s in segments], dtype=np.float32)
+
+    text, text_offsets = _pack_strings([s["text"].strip() for s in segments])
+    word_text, word_text_offsets = _pack_strings([w["word"].strip() for w in words])
+
+    word_offsets = np.zeros(len(segments) + 1, dtype=np.int64)
+    word_offsets[1:] = np.cumsum([len(s.get("words") or []) for s in segments])
+
+    columns = {
+        "start": column("start"),
+        "end": column("end"),
+        "avg_logprob": column("avg_logprob"),
+        "no_speech_prob": column("no_speech_prob"),
+        "compression_ratio": column("compression_ratio"),
+        "speaker": np.array([speakers.index(s["speaker"]) if s.get("speaker") else -1 for s in segments],
+                            dtype=np.int8),
+        "speakers": np.array(speakers, dtype=str),
+        "text": text,
+        "text_offsets": text_offsets,
+        "word_offsets": word_offsets,
+        "word_start": np.array([w["start"] for w in words], dtype=np.float32),
+        "word_end": np.array([w["end"] for w in words], dtype=np.float32),
+        "word_probability": np.array([w.get("probability", np.nan) for w in words], dtype=np.float32),
+        "word_text": word_text,
+        "word_text_offsets": word_text_offsets,
+    }
+
+    path = Path(path)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "wb") as f:
+        np.savez_compressed(f, **columns)
+    os.replace(tmp_path, path)
+
+
+class Sidecar:
+    """Columnar view of one transcript's segments"""
+
+    def __init__(self, columns: dict):
+        self.columns = columns
+        self.speakers = [str(s) for s in columns["speakers"]]
+
+    def __len__(self):
+        return len(self.columns["start"])
+
+    @property
+    def duration(self) -> np.ndarray:
+        return self.columns["end"] - self.columns["start"]
+
+    def mask(self, min_avg_logprob: float = MIN_AVG_LOGPROB, max_no_speech_prob: float = MAX_NO_SPEECH_PROB,
+             max_compression_ratio: float = MAX_COMPRESSION_RATIO, min_duration: float = None,
+             max_duration: float = None, speaker: str = None) -> np.ndarray:
+        """
+        Boolean mask of segments passing the quality filters
+        Missing metrics (NaN) never reject a segment.
+        """
+        c = self.columns
+        keep = ~(c["avg_logprob"] < min_avg_logprob)
+        keep &= ~(c["no_speech_prob"] > max_no_speech_prob)
+        keep &= ~(c["compression_ratio"] > max_compression_ratio)
+
+        if min_duration is not None:
+            keep &= self.duration >= min_duration
+        if max_duration is not None:
+            keep &= self.duration <= max_duration
+        if speaker is not None:
+            code = self.speakers.index(speaker) if speaker in self.speakers else -2
+            keep &= c["speaker"] == code
+        return keep
+
+    def segment(self, i: int, words: bool = True) -> dict:
+        """One segment as a dict (with its words)"""
+        c = self.columns
+        seg = {
+            "start": float(c["start"][i]),
+            "end": float(c["end"][i]),
+            "text": _unpack(c["text"], c["text_offsets"], i),
+            "avg_logprob": float(c["avg_logprob"][i]),
+            "no_speech_prob": float(c["no_speech_prob"][i]),
+            "compression_ratio": float(c["compression_ratio"][i]),
+        }
+        if c["speaker"][i] >= 0:
+            seg["speaker"] = self.speakers[c["speaker"][i]]
+        if words:
+            seg["words"] = [
+                {
+                    "word": _unpack(c["word_text"], c["word_text_offsets"], w),
+                    "start": float(c["word_start"][w]),
+                    "end": float(c["word_end"][w]),
+                    "probability": float(c["word_probability"][w]),
+                }
+                for w in range(c["word_offsets"][i], c["word_offsets"][i + 1])
+            ]
+        return seg
+
+    def select(self, words: bool = True, **filters) -> list:
+        """Segments passing mask(**filters), as dicts"""
+        return [self.segment(i, words) for i in np.flatnonzero(self.mask(**filters))]
+
+
+def read_sidecar(path: Path) -> Sidecar:
+    """Load a sidecar (all columns are small; read eagerly)"""
+    with np.load(path) as data:
+        return Sidecar({name: data[name] for name in data.files})
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Filter transcript segments by quality")
+    parser.add_argument("sidecars", nargs="+", help="*.words.npz files")
+    parser.add_argument("--speaker", help="Only this speaker (e.g. amma)")
+    parser.add_argument("--min-duration", type=float, default=1.0)
+    parser.add_argument("--max-duration", type=float, default=15.0)
+    parser.add_argument("--min-logprob", type=float, default=MIN_AVG_LOGPROB)
+    parser.add_argument("--max-no-speech", type=float, default=MAX_NO_SPEECH_PROB)
+    args = parser.parse_args()
+
+    total = kept = 0
+    kept_seconds = 0.0
+    for path in args.sidecars:
+        sidecar = read_sidecar(path)
+        keep = sidecar.mask(min_avg_logprob=args.min_logprob, max_no_speech_prob=args.max_no_speech,
+                            min_duration=args.min_duration, max_duration=args.max_duration,
+                            speaker=args.speaker)
+        total += len(sidecar)
+        kept += int(keep.sum())
+        kept_seconds += float(sidecar.duration[keep].sum())
+
+        for i in np.flatnonzero(keep):
+            seg = sidecar.segment(i, words=False)
+            print(f"{path}\t{seg['start']:.2f}\t{seg['end']:.2f}\t{seg.get('speaker', '')}\t{seg['text']}")
+
+    print(f"\nKept {kept}/{total} segments ({kept_seconds / 60:.1f} min)")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,41 +7,82 @@ Run on Mac Studio:
     python watch_and_process.py
 
 What it does:
-    1. Watches voice/raw/ for new .wav files
-    2. Automatically processes new recordings:
+    1. Watches voice/raw/ for new .wav/.flac files (filesystem events via watchdog
+       - FSEvents on macOS, inotify on Linux - or 1 s polling without it;
+       pip install watchdog)
+    2. Processes each recording as soon as it is completely written:
        - Convert to 22050Hz mono
-       - Run speaker separation
-       - Transcribe with Whisper
-    3. Optionally archives to NAS
+       - Run speaker separation (on warm separate_speakers.py --serve
+         workers that keep the voice encoder loaded between files)
+       - Transcribe with Whisper (--transcribe)
+    3. Optionally archives to NAS (archive.py: batched rsync, verified
+       by sha256, optionally as FLAC)
+    4. Stores outputs as lossless FLAC (audio_io.STORAGE_FORMAT); once a
+       recording is finished and archived, its raw WAV is replaced by a
+       verified FLAC (storage.py, RAW_WAV_POLICY)
+    5. Records every stage in the ledger (ledger.py, keyed by content hash):
+       on startup, anything unfinished - including files that arrived while
+       the watcher was down - is resumed, and renamed copies are skipped
+
+Each stage has its own worker pool (--convert-workers, --separate-workers,
+--transcribe-workers, --archive-workers): conversions run one per core,
+separation is limited by RAM, and NAS uploads run in their own I/O pool.
+A file moves to separation/transcription as soon as its conversion is done.
 
 Can also pull from Mac Air:
     python watch_and_process.py --pull-from-air
+
+A file counts as complete when it is renamed into voice/raw/ (how
+auto_record_calls.py and rsync finish a file) or when its size has been
+stable for STABLE_SECONDS. Names starting with "_" or "." are in-progress
+temp files and are ignored.
 """
 
 import os
-import sys
+import json
 import time
+import queue
+import threading
 import subprocess
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
 import argparse
 
+from archive import Archiver
+from audio_io import AUDIO_SUFFIXES, STORAGE_FORMAT, STORAGE_SUFFIX, is_canonical, load_audio, write_audio
+from ledger import Ledger, STAGES
+from storage import RAW_WAV_POLICY, compact_raw
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:
+    Observer = None
+
 # Paths
 SCRIPT_DIR = Path(__file__).parent
 RAW_DIR = SCRIPT_DIR / "voice" / "raw"
 PROCESSED_DIR = SCRIPT_DIR / "voice" / "processed"
 TOOLS_DIR = SCRIPT_DIR.parent / "tools"
 SEPARATOR_SCRIPT = TOOLS_DIR / "separate_speakers.py"
+SEPARATED_DIR = TOOLS_DIR / "voices" / "separated"
+
+# Memory one speaker separation job needs (sizes the separation pool)
+SEPARATION_RAM_GB = 4
+
+# A separation job taking longer than this restarts its worker
+SEPARATION_TIMEOUT = 30 * 60
 
 # Remote settings
 AIR_HOST = "air"  # Uses ~/.ssh/config
 AIR_PATH = "~/git/sumanaddanki/amma-poc/voice/raw"
-NAS_HOST = "aauser@192.168.1.183"
-NAS_PORT = "17183"
-NAS_PATH = "/volume1/homes/aauser/amma-archive"
 
-# Processing state - track what we've already processed
-processed_files = set()
+# Write-completion detection
+STABLE_SECONDS = 1.0    # Unchanged this long = writer is done
+POLL_SECONDS = 1.0      # Polling fallback interval
+WAV_HEADER_BYTES = 44   # Anything smaller can't hold audio yet
 
 
 def log(msg):
@@ -56,13 +97,22 @@ def pull_from_air():
 
     RAW_DIR.mkdir(parents=True, exist_ok=True)
 
+    # Finished recordings only - "_" / "." names are still being written (see auto_record_calls.py)
+    patterns = [f"[!_.]*{suffix}" for suffix in AUDIO_SUFFIXES]
+    # WAVs already stored here as FLAC (compact_raw) would otherwise be pulled again
+    compacted = [f"/{f.stem}.wav" for f in RAW_DIR.glob("*.flac") if not f.name.startswith(("_", "."))]
+
     try:
         # Use rsync for efficient syncing
-        result = subprocess.run([
-            "rsync", "-avz", "--progress",
-            f"{AIR_HOST}:{AIR_PATH}/*.wav",
-            str(RAW_DIR) + "/"
-        ], capture_output=True, text=True)
+        with tempfile.NamedTemporaryFile("w", suffix=".exclude") as exclude_list:
+            exclude_list.write("".join(f"{name}\n" for name in compacted))
+            exclude_list.flush()
+            result = subprocess.run([
+                "rsync", "-avz", "--progress", f"--exclude-from={exclude_list.name}",
+                *[f"--include={pattern}" for pattern in patterns], "--exclude=*",
+                f"{AIR_HOST}:{AIR_PATH}/",
+                str(RAW_DIR) + "/"
+            ], capture_output=True, text=True)
 
         if result.returncode == 0:
             if "total size is 0" not in result.stdout:
@@ -75,198 +125,631 @@ def pull_from_air():
             return True
 
     except FileNotFoundError:
-        # rsync not available, try scp
+        # rsync not available, try scp (one call per pattern - an unmatched glob fails the whole call)
         try:
-            result = subprocess.run([
-                "scp", f"{AIR_HOST}:{AIR_PATH}/*.wav", str(RAW_DIR) + "/"
-            ], capture_output=True, text=True)
-            return result.returncode == 0
+            copied = False
+            for pattern in patterns:
+                result = subprocess.run([
+                    "scp", f"{AIR_HOST}:{AIR_PATH}/{pattern}", str(RAW_DIR) + "/"
+                ], capture_output=True, text=True)
+                copied |= result.returncode == 0
+            return copied
         except:
             log("✗ Could not connect to Mac Air")
             return False
 
 
-def process_recording(wav_file):
-    """Process a single recording"""
-    wav_path = Path(wav_file)
-    log(f"Processing: {wav_path.name}")
-
-    # Step 1: Convert to 22050Hz mono
-    processed_file = PROCESSED_DIR / f"{wav_path.stem}_processed.wav"
+def convert_recording(wav_path):
+    """Convert to 22050Hz mono (one in-process decode; ffmpeg only for non-WAV/FLAC). Returns the output path or None."""
+    processed_file = PROCESSED_DIR / f"{wav_path.stem}_processed{STORAGE_SUFFIX}"
     PROCESSED_DIR.mkdir(parents=True, exist_ok=True)
 
-    log("  → Converting audio...")
+    if is_canonical(wav_path, storage=True):
+        log(f"  ✓ {wav_path.name}: already 22050Hz mono {STORAGE_FORMAT.upper()}")
+        return wav_path
+
+    log(f"  → {wav_path.name}: converting audio...")
     ffmpeg_path = TOOLS_DIR / "bin" / "ffmpeg"
-    if not ffmpeg_path.exists():
-        ffmpeg_path = "ffmpeg"
-
-    result = subprocess.run([
-        str(ffmpeg_path),
-        "-i", str(wav_path),
-        "-ar", "22050",
-        "-ac", "1",
-        "-y",
-        str(processed_file)
-    ], capture_output=True)
-
-    if result.returncode != 0:
-        log(f"  ✗ Conversion failed")
-        return False
+    try:
+        audio = load_audio(wav_path, str(ffmpeg_path) if ffmpeg_path.exists() else "ffmpeg")
+        write_audio(processed_file, audio.canonical)
+    except (OSError, RuntimeError) as e:
+        log(f"  ✗ {wav_path.name}: conversion failed ({e})")
+        return None
 
     log(f"  ✓ Converted: {processed_file.name}")
+    return processed_file
+
+
+class SeparationWorker:
+    """
+    Long-lived separate_speakers.py --serve process (in venv-xtts) with
+    the voice encoder loaded once - jobs run back to back without paying
+    Python startup, imports and model load per file.
+    """
+
+    def __init__(self):
+        venv_python = TOOLS_DIR / "venv-xtts" / "bin" / "python"
+        if not venv_python.exists():
+            venv_python = "python3"
+
+        # stdout carries the JSON replies; stderr (progress, tracebacks) goes to our console
+        started = time.time()
+        self.proc = subprocess.Popen(
+            [str(venv_python), str(SEPARATOR_SCRIPT), "--serve"],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=None,
+            text=True, bufsize=1, cwd=str(TOOLS_DIR)
+        )
+        self.jobs = 0
+
+        ready = self._read(SEPARATION_TIMEOUT)
+        if not ready or not ready.get("ready"):
+            self.close()
+            code = self.proc.poll()
+            raise RuntimeError((ready or {}).get("error", "separation worker failed to start"
+                               + (f" (exit code {code}, see its output above)" if code else "")))
+        log(f"  Separation worker ready (pid {self.proc.pid}, "
+            f"encoder loaded in {ready.get('load_seconds', time.time() - started):.1f}s)")
+
+    def _read(self, timeout):
+        """Next JSON line from the worker, or None if it died / timed out"""
+        result = []
+        reader = threading.Thread(target=lambda: result.append(self.proc.stdout.readline()), daemon=True)
+        reader.start()
+        reader.join(timeout)
+        if reader.is_alive():
+            # Timed out - kill the worker so the blocked readline returns and the thread exits
+            log(f"  ✗ Separation worker (pid {self.proc.pid}) gave no reply in {timeout:g}s, killing it")
+            self.proc.kill()
+            self.proc.wait()
+            reader.join()
+            return None
+        if not result or not result[0]:
+            return None
+        return json.loads(result[0])
+
+    def alive(self):
+        return self.proc.poll() is None
+
+    def run(self, audio_file, output_dir):
+        """Separate one file. Returns the worker's reply (ok, speakers, error, timings)."""
+        self.jobs += 1
+        self.proc.stdin.write(json.dumps({
+            "id": self.jobs, "audio_file": str(audio_file), "output_dir": str(output_dir),
+            "format": STORAGE_FORMAT
+        }) + "\n")
+        self.proc.stdin.flush()
+
+        reply = self._read(SEPARATION_TIMEOUT)
+        if reply is None:
+            self.close()
+            return {"ok": False, "error": "separation worker died or timed out"}
+        return reply
+
+    def close(self):
+        if self.alive():
+            self.proc.stdin.close()
+            try:
+                self.proc.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self.proc.kill()
+
+
+# Idle workers - one is created per concurrently running separation job
+_separation_workers = queue.Queue()
+_all_separation_workers = []
+
+
+def separate_recording(processed_file):
+    """Run speaker separation on a warm worker. Returns an error message, or None on success."""
+    log(f"  → {processed_file.name}: separating speakers...")
+
+    # An idle worker may have died since its last job - drop those, start one if none is left
+    worker = None
+    while worker is None:
+        try:
+            worker = _separation_workers.get_nowait()
+        except queue.Empty:
+            break
+        if not worker.alive():
+            log(f"  ⚠ Idle separation worker (pid {worker.proc.pid}) exited, replacing it")
+            _all_separation_workers.remove(worker)
+            worker = None
+    if worker is None:
+        try:
+            worker = SeparationWorker()
+        except (OSError, RuntimeError) as e:
+            log(f"  ✗ Could not start separation worker: {e}")
+            return str(e)
+        _all_separation_workers.append(worker)
+
+    try:
+        reply = worker.run(processed_file, SEPARATED_DIR)
+    except (OSError, ValueError) as e:
+        worker.close()
+        reply = {"ok": False, "error": f"separation worker: {e}"}
+    finally:
+        if worker.alive():
+            _separation_workers.put(worker)
+        else:
+            _all_separation_workers.remove(worker)
+
+    timings = ", ".join(f"{k} {v:.1f}s" for k, v in reply.get("timings", {}).items())
+    if reply.get("ok"):
+        log(f"  ✓ {processed_file.name}: speakers separated ({timings})")
+        for speaker_id, info in reply.get("speakers", {}).items():
+            log(f"    {speaker_id}: {info['segments']} segments, {info['duration']:.1f}s total")
+        return None
+
+    log(f"  ⚠ {processed_file.name}: separation had issues (check manually)")
+    return reply.get("error") or "separation failed"
 
-    # Step 2: Speaker separation
-    log("  → Separating speakers...")
-
-    # Activate venv and run separator
-    venv_python = TOOLS_DIR / "venv-xtts" / "bin" / "python"
-    if not venv_python.exists():
-        venv_python = "python3"
-
-    sep_output = TOOLS_DIR / "voices" / "separated" / wav_path.stem
-
-    result = subprocess.run([
-        str(venv_python),
-        str(SEPARATOR_SCRIPT),
-        str(processed_file),
-        "-o", str(TOOLS_DIR / "voices" / "separated")
-    ], capture_output=True, text=True)
-
-    if result.returncode == 0:
-        log(f"  ✓ Speakers separated")
-        # Print summary from output
-        for line in result.stdout.split('\n'):
-            if 'speaker' in line.lower() and ':' in line:
-                log(f"    {line.strip()}")
-    else:
-        log(f"  ⚠ Separation had issues (check manually)")
 
-    # Step 3: Transcribe (optional - can be slow)
-    # Uncomment if you want automatic transcription
-    # log("  → Transcribing...")
-    # transcribe_recording(processed_file)
+def stop_separation_workers():
+    for worker in _all_separation_workers:
+        worker.close()
+    _all_separation_workers.clear()
 
-    return True
 
+def transcribe_recording(processed_file):
+    """Transcribe with Whisper. Returns the transcript path or None."""
+    from process_recording import transcribe_audio
 
-def archive_to_nas(wav_file):
-    """Archive raw recording to NAS"""
-    wav_path = Path(wav_file)
-    log(f"Archiving to NAS: {wav_path.name}")
+    log(f"  → {Path(processed_file).name}: transcribing...")
+    return transcribe_audio(processed_file)
 
+
+def pipeline_stages(archive=False, transcribe=False):
+    """Ledger stages this run is responsible for"""
+    return [s for s in STAGES
+            if (s != "transcribed" or transcribe) and (s != "archived" or archive)]
+
+
+def default_workers():
+    """
+    Per-stage concurrency for this machine
+    - convert: one per core (ffmpeg / in-process resampling)
+    - separate: limited by RAM (each job loads the speaker encoder)
+    - transcribe: one (each job loads a Whisper model)
+    - archive: a few rsync sessions in flight (network bound)
+    """
+    cores = os.cpu_count() or 1
     try:
-        # Create directory on NAS
-        subprocess.run([
-            "ssh", "-p", NAS_PORT, NAS_HOST,
-            f"mkdir -p {NAS_PATH}/raw"
-        ], capture_output=True)
-
-        # Copy file
-        result = subprocess.run([
-            "scp", "-P", NAS_PORT,
-            str(wav_path),
-            f"{NAS_HOST}:{NAS_PATH}/raw/"
-        ], capture_output=True)
+        ram_gb = os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES") / 2**30
+    except (ValueError, OSError, AttributeError):
+        ram_gb = SEPARATION_RAM_GB
+    return {
+        "converted": cores,
+        "separated": max(1, min(cores // 2, int(ram_gb // SEPARATION_RAM_GB))),
+        "transcribed": 1,
+        "archived": 2,
+    }
+
+
+class StagePipeline:
+    """
+    Runs recordings' pending stages on per-stage worker pools.
+    Each stage's output feeds the next as soon as it is ready: separation
+    and transcription start when a file's conversion finishes, while the
+    raw file is queued for archiving right away (batched rsync, archive.py).
+    """
+
+    def __init__(self, ledger, stages, workers: dict = None, archive_flac: bool = False):
+        self.ledger = ledger
+        self.stages = stages
+        self.workers = {**default_workers(), **(workers or {})}
+        self.pools = {
+            stage: ThreadPoolExecutor(max_workers=self.workers[stage], thread_name_prefix=stage)
+            for stage in ("converted", "separated", "transcribed")
+        }
+        self.archiver = Archiver(self.workers["archived"], compress=archive_flac) if "archived" in stages else None
+
+        self.lock = threading.Lock()
+        self.idle = threading.Condition(self.lock)
+        self.outstanding = 0
+        self.in_flight = {}     # hash -> stages still to run for it
+        self.finished = 0
+
+    def _submit(self, stage, func, *args):
+        with self.lock:
+            self.outstanding += 1
+        future = self.pools[stage].submit(self._run, func, args)
+        future.add_done_callback(lambda f: f.cancelled() and self._cancelled(func, args))
+
+    def _cancelled(self, func, args):
+        """A queued stage was dropped by shutdown - it stays pending in the ledger for the next start"""
+        with self.lock:
+            if func != self._start:
+                self.in_flight.pop(args[0], None)     # Stage args start with the digest
+            self.outstanding -= 1
+            if self.outstanding == 0:
+                self.idle.notify_all()
+
+    def _after(self, future, func, *args):
+        """Run func(*args, future) once an outside future (the archiver's) resolves"""
+        with self.lock:
+            self.outstanding += 1
+        future.add_done_callback(lambda f: self._run(func, (*args, f)))
+
+    def _run(self, func, args):
+        try:
+            func(*args)
+        except Exception as e:
+            log(f"  ✗ {func.__name__}: {e}")
+        finally:
+            with self.lock:
+                self.outstanding -= 1
+                if self.outstanding == 0:
+                    self.idle.notify_all()
+
+    def add(self, wav_file):
+        """Queue a recording (hashing runs on the convert pool too)"""
+        self._submit("converted", self._start, Path(wav_file))
+
+    def wait(self):
+        """Block until every queued stage has finished"""
+        with self.lock:
+            while self.outstanding:
+                self.idle.wait()
+
+    def shutdown(self):
+        """Finish the stages that are running; queued ones are dropped (still pending in the ledger)"""
+        for pool in self.pools.values():
+            pool.shutdown(wait=True, cancel_futures=True)
+        if self.archiver:
+            self.archiver.shutdown()
+        stop_separation_workers()
+
+    def _fail(self, digest, wav_path, stage, error, *dropped):
+        """A stage raised - record it as failed and stop waiting on it (and on `dropped`)"""
+        log(f"  ✗ {wav_path.name}: {stage} raised {type(error).__name__}: {error}")
+        try:
+            self.ledger.mark(digest, stage, error=f"{type(error).__name__}: {error}")
+        finally:
+            self._done(digest, wav_path, stage, *dropped)
+
+    def _start(self, wav_path):
+        if not wav_path.exists():
+            return
+        entry = self.ledger.register(wav_path)
+        digest = entry["hash"]
+        todo = self.ledger.pending(digest, self.stages)
+
+        done = not todo
+        with self.lock:
+            if done or digest in self.in_flight:
+                todo = []   # Done already, or a copy is being processed right now
+            else:
+                self.in_flight[digest] = set(todo)
+
+        if not todo:
+            if entry["duplicate"] and not entry["known"]:
+                log(f"Skipping {wav_path.name}: same content as {Path(entry['path']).name}")
+            elif done:
+                # e.g. a raw WAV pulled again after it was stored as FLAC
+                self._compact(wav_path, digest)
+            return
+
+        resuming = f" (resuming: {', '.join(todo)})" if len(todo) < len(self.stages) else ""
+        log(f"Processing: {wav_path.name}{resuming}")
+
+        # The raw file can be archived while the rest runs
+        if "archived" in todo:
+            self._after(self.archiver.submit(wav_path), self._archived, digest, wav_path)
+
+        # Convert - redone if a later stage needs the output and it's gone
+        try:
+            processed_file = self.ledger.output(digest, "converted")
+            processed_file = Path(processed_file) if processed_file else None
+            needs_audio = any(s in todo for s in ("separated", "transcribed"))
+            if "converted" in todo or (needs_audio and not (processed_file and processed_file.exists())):
+                processed_file = convert_recording(wav_path)
+                if not processed_file:
+                    self.ledger.mark(digest, "converted", error="conversion failed")
+                    self._done(digest, wav_path, "converted", "separated", "transcribed")
+                    return
+                self.ledger.mark(digest, "converted", output=processed_file)
+        except Exception as e:
+            self._fail(digest, wav_path, "converted", e, "separated", "transcribed")
+            return
+        self._done(digest, wav_path, "converted")
+
+        if "separated" in todo:
+            self._submit("separated", self._separate, digest, wav_path, processed_file)
+        if "transcribed" in todo:
+            self._submit("transcribed", self._transcribe, digest, wav_path, processed_file)
+
+    def _separate(self, digest, wav_path, processed_file):
+        try:
+            error = separate_recording(processed_file)
+            self.ledger.mark(digest, "separated", output=None if error else SEPARATED_DIR, error=error)
+        except Exception as e:
+            self._fail(digest, wav_path, "separated", e)
+            return
+        self._done(digest, wav_path, "separated")
+
+    def _transcribe(self, digest, wav_path, processed_file):
+        try:
+            transcript = transcribe_recording(processed_file)
+            self.ledger.mark(digest, "transcribed", output=transcript,
+                             error=None if transcript else "transcription failed")
+        except Exception as e:
+            self._fail(digest, wav_path, "transcribed", e)
+            return
+        self._done(digest, wav_path, "transcribed")
+
+    def _archived(self, digest, wav_path, future):
+        try:
+            result = future.result()
+            self.ledger.mark(digest, "archived", output=result.get("remote"), error=result["error"])
+        except Exception as e:
+            self._fail(digest, wav_path, "archived", e)
+            return
+        self._done(digest, wav_path, "archived")
+
+    def _done(self, digest, wav_path, *stages):
+        """A recording's stage(s) finished or were dropped - report once all are"""
+        with self.lock:
+            remaining = self.in_flight.get(digest)
+            if remaining is None:
+                return
+            remaining.difference_update(stages)
+            if remaining:
+                return
+            del self.in_flight[digest]
+            self.finished += 1
+
+        failed = self.ledger.pending(digest, self.stages)
+        if failed:
+            log(f"⚠ {wav_path.name}: unfinished stages {', '.join(failed)} (retried on restart)")
+            return
+        log(f"✓ Finished: {wav_path.name}")
+        self._compact(wav_path, digest)
+
+    def _compact(self, wav_path, digest):
+        """Nothing reads the raw WAV any more - keep it losslessly as FLAC once archived"""
+        try:
+            flac_path = compact_raw(wav_path, self.ledger, digest)
+        except Exception as e:
+            log(f"  ⚠ {wav_path.name}: could not store as FLAC: {e}")
+            return
+        if flac_path:
+            log(f"  ✓ Raw recording stored as {flac_path.name} (WAV removed, archived copy verified)")
 
-        if result.returncode == 0:
-            log(f"  ✓ Archived to NAS")
-            return True
+
+def is_recording_file(path) -> bool:
+    """WAV/FLAC only; "_" / "." prefixed names are temp files still being written"""
+    path = Path(path)
+    return path.suffix.lower() in AUDIO_SUFFIXES and not path.name.startswith(("_", "."))
+
+
+class RecordingWatcher:
+    """Reports recordings in a directory once they are completely written"""
+
+    def __init__(self, directory: Path, use_events: bool = True):
+        self.directory = Path(directory)
+        self.lock = threading.Lock()
+        self.changed = threading.Event()
+        self.pending = {}   # path -> {"time", "size", "closed"}
+        self.seen = {}      # Polling: path -> (size, mtime_ns)
+        self.observer = None
+
+        if use_events and Observer is not None:
+            watcher = self
+
+            class Handler(FileSystemEventHandler):
+                def on_created(self, event):
+                    watcher.touch(event.src_path)
+
+                def on_modified(self, event):
+                    watcher.touch(event.src_path)
+
+                def on_moved(self, event):
+                    # Renamed into place = writer finished
+                    watcher.touch(event.dest_path, closed=True)
+
+            self.observer = Observer()
+            self.observer.schedule(Handler(), str(self.directory), recursive=False)
+
+    @property
+    def mode(self) -> str:
+        return "filesystem events" if self.observer else f"polling every {POLL_SECONDS:g}s"
+
+    def start(self):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        if self.observer:
+            self.observer.start()
         else:
-            log(f"  ✗ Archive failed")
-            return False
-    except Exception as e:
-        log(f"  ✗ Archive error: {e}")
-        return False
+            # Files already here aren't "new" - only later changes are reported
+            self._scan(report=False)
+
+    def stop(self):
+        if self.observer:
+            self.observer.stop()
+            self.observer.join()
+
+    def touch(self, path, closed: bool = False):
+        """Note activity on a file (called from the observer thread)"""
+        if not is_recording_file(path):
+            return
+        with self.lock:
+            entry = self.pending.setdefault(Path(path), {"size": -1})
+            entry["time"] = time.monotonic()
+            entry["closed"] = entry.get("closed", False) or closed
+        self.changed.set()
+
+    def _scan(self, report: bool = True):
+        current = {}
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and is_recording_file(entry.name):
+                stat = entry.stat()
+                current[Path(entry.path)] = (stat.st_size, stat.st_mtime_ns)
+
+        for path, key in current.items():
+            if report and self.seen.get(path) != key:
+                self.touch(path)
+        self.seen = current
+
+    def _collect(self) -> list:
+        """Pending files that are now complete"""
+        now = time.monotonic()
+        ready = []
+
+        with self.lock:
+            for path, info in list(self.pending.items()):
+                try:
+                    size = path.stat().st_size
+                except FileNotFoundError:
+                    del self.pending[path]   # Renamed away or deleted
+                    continue
+
+                if size != info["size"]:
+                    info["size"] = size
+                    if not info["closed"]:
+                        info["time"] = now   # Still growing
+                        continue
+
+                if size > WAV_HEADER_BYTES and (info["closed"] or now - info["time"] >= STABLE_SECONDS):
+                    ready.append(path)
+                    del self.pending[path]
+
+        return sorted(ready, key=lambda f: f.stat().st_mtime)
+
+    def wait_ready(self, timeout: float) -> list:
+        """Block until at least one file is complete, or `timeout` seconds pass"""
+        deadline = time.monotonic() + timeout
+        while True:
+            if not self.observer:
+                self._scan()
 
+            ready = self._collect()
+            remaining = deadline - time.monotonic()
+            if ready or remaining <= 0:
+                return ready
+
+            # Wake on the next event, or in time to re-check stability
+            with self.lock:
+                step = STABLE_SECONDS / 4 if self.pending else POLL_SECONDS
+            self.changed.clear()
+            self.changed.wait(min(step, remaining))
 
-def get_new_files():
-    """Get list of unprocessed WAV files"""
-    RAW_DIR.mkdir(parents=True, exist_ok=True)
 
-    all_files = set(RAW_DIR.glob("*.wav"))
-    new_files = all_files - processed_files
+def get_recordings():
+    """Complete recordings currently in voice/raw/, oldest first"""
+    RAW_DIR.mkdir(parents=True, exist_ok=True)
 
-    return sorted(new_files, key=lambda f: f.stat().st_mtime)
+    all_files = {f for f in RAW_DIR.iterdir() if is_recording_file(f)}
+    return sorted(all_files, key=lambda f: f.stat().st_mtime)
 
 
-def watch_loop(interval=60, pull_air=False, archive=False):
-    """Main watch loop"""
+def watch_loop(interval=60, pull_air=False, archive=False, poll=False, transcribe=False, workers=None,
+               archive_flac=False):
+    """Main watch loop - wakes on filesystem changes, pulls from the Air every `interval` seconds"""
+    watcher = RecordingWatcher(RAW_DIR, use_events=not poll)
+    ledger = Ledger()
+    stages = pipeline_stages(archive, transcribe)
+    pipeline = StagePipeline(ledger, stages, workers, archive_flac)
 
     print("\n" + "="*60)
     print("  WATCH & PROCESS - Amma Recording Pipeline")
     print("="*60)
-    print(f"\nWatching: {RAW_DIR}")
-    print(f"Check interval: {interval} seconds")
+    print(f"\nWatching: {RAW_DIR} ({watcher.mode})")
+    if pull_air:
+        print(f"Pull interval: {interval} seconds")
     print(f"Pull from Mac Air: {'Yes' if pull_air else 'No'}")
-    print(f"Archive to NAS: {'Yes' if archive else 'No'}")
+    print(f"Archive to NAS: {('Yes (FLAC)' if archive_flac else 'Yes') if archive else 'No'}")
+    print(f"Stages: {' → '.join(stages)}")
+    print(f"Storage: {STORAGE_FORMAT.upper()} (raw WAVs: {RAW_WAV_POLICY})")
+    print(f"Workers: {', '.join(f'{s} {pipeline.workers[s]}' for s in stages)}")
+    print(f"Ledger: {ledger.path}")
     print("\nPress Ctrl+C to stop\n")
     print("-"*60)
 
-    # Initial scan - mark existing files as already processed
-    existing = set(RAW_DIR.glob("*.wav"))
+    # Start watching first so nothing arriving during the catch-up is missed
+    watcher.start()
+
+    # Catch up: anything unfinished, including files that arrived while stopped
+    existing = get_recordings()
     if existing:
-        log(f"Found {len(existing)} existing files (skipping)")
-        processed_files.update(existing)
+        log(f"Checking {len(existing)} existing files against the ledger...")
+        for wav_file in existing:
+            pipeline.add(wav_file)
+    next_pull = time.monotonic()
 
     try:
         while True:
-            # Pull from Mac Air if enabled
-            if pull_air:
+            # Pull from Mac Air if enabled (new files show up as watcher events)
+            if pull_air and time.monotonic() >= next_pull:
                 pull_from_air()
+                next_pull = time.monotonic() + interval
 
-            # Check for new files
-            new_files = get_new_files()
+            # Wait for completely written new files
+            timeout = max(next_pull - time.monotonic(), 0) if pull_air else interval
+            new_files = watcher.wait_ready(timeout)
 
             if new_files:
                 log(f"Found {len(new_files)} new recording(s)")
-
                 for wav_file in new_files:
-                    success = process_recording(wav_file)
-
-                    if success:
-                        processed_files.add(wav_file)
-
-                        if archive:
-                            archive_to_nas(wav_file)
-
-                    print("-"*60)
-
-            # Wait before next check
-            time.sleep(interval)
+                    pipeline.add(wav_file)
 
     except KeyboardInterrupt:
-        print("\n\nStopping watcher...")
-        print(f"Processed {len(processed_files)} files this session")
+        print("\n\nStopping watcher... (finishing running stages, queued ones resume on the next start)")
+        watcher.stop()
+        pipeline.shutdown()
+        print(f"Processed {pipeline.finished} files this session")
 
 
 def main():
     parser = argparse.ArgumentParser(description="Watch and process Amma recordings")
     parser.add_argument("--interval", "-i", type=int, default=60,
-                       help="Check interval in seconds (default: 60)")
+                       help="Mac Air pull interval in seconds (default: 60)")
     parser.add_argument("--pull-from-air", "-p", action="store_true",
                        help="Pull new recordings from Mac Air")
     parser.add_argument("--archive", "-a", action="store_true",
-                       help="Archive processed files to NAS")
+                       help="Archive raw recordings to NAS (batched rsync, sha256-verified)")
+    parser.add_argument("--archive-flac", action="store_true",
+                       help="Compress recordings to FLAC before archiving")
+    parser.add_argument("--transcribe", "-t", action="store_true",
+                       help="Also transcribe each recording with Whisper")
+    parser.add_argument("--convert-workers", type=int, help="Parallel conversions (default: CPU cores)")
+    parser.add_argument("--separate-workers", type=int,
+                       help=f"Parallel speaker separations (default: RAM / {SEPARATION_RAM_GB} GB)")
+    parser.add_argument("--transcribe-workers", type=int, help="Parallel transcriptions (default: 1)")
+    parser.add_argument("--archive-workers", type=int, help="Parallel rsync sessions to the NAS (default: 2)")
+    parser.add_argument("--poll", action="store_true",
+                       help="Poll the directory instead of using filesystem events")
     parser.add_argument("--once", action="store_true",
                        help="Run once and exit (don't loop)")
     args = parser.parse_args()
 
+    workers = {stage: count for stage, count in [
+        ("converted", args.convert_workers), ("separated", args.separate_workers),
+        ("transcribed", args.transcribe_workers), ("archived", args.archive_workers)
+    ] if count}
+
     if args.once:
         # One-time processing
         if args.pull_from_air:
             pull_from_air()
 
-        new_files = list(RAW_DIR.glob("*.wav"))
-        for wav_file in new_files:
-            process_recording(wav_file)
-            if args.archive:
-                archive_to_nas(wav_file)
+        # Only stages the ledger doesn't have yet
+        pipeline = StagePipeline(Ledger(), pipeline_stages(args.archive, args.transcribe), workers,
+                                 args.archive_flac)
+        for wav_file in get_recordings():
+            pipeline.add(wav_file)
+        pipeline.wait()
+        pipeline.shutdown()
+        log(f"Processed {pipeline.finished} files")
     else:
         # Continuous watching
         watch_loop(
             interval=args.interval,
             pull_air=args.pull_from_air,
-            archive=args.archive
+            archive=args.archive,
+            poll=args.poll,
+            transcribe=args.transcribe,
+            workers=workers,
+            archive_flac=args.archive_flac
         )
 
 
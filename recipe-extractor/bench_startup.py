@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Startup-Time Benchmark
+Measures what each entry point imports before doing any work, using
+`python -X importtime`, and fails if a heavy dependency sneaks back in.
+
+Checks:
+    - extract_recipe_v2.py --help     → no Gemini/rich/Whisper/torch/PIL
+    - import extract_recipe_v2        → same (used by test scripts)
+    - import image_preprocess         → no PIL until an image is processed
+    - import recipe_segments          → stdlib only
+
+Usage:
+    python bench_startup.py
+    python bench_startup.py --runs 5 --budget-ms 150 --top 10
+
+Exit code 1 on regression (entry point crashed, forbidden import or
+budget exceeded).
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Modules that must never be imported just to start up
+HEAVY_MODULES = [
+    'google.generativeai',
+    'rich',
+    'whisper',
+    'torch',
+    'cv2',
+    'PIL',
+    'numpy',
+    'requests',
+]
+
+# (name, python args)
+ENTRY_POINTS = [
+    ("cli --help", ["extract_recipe_v2.py", "--help"]),
+    ("import extract_recipe_v2", ["-c", "import extract_recipe_v2"]),
+    ("import image_preprocess", ["-c", "import image_preprocess"]),
+    ("import recipe_segments", ["-c", "import recipe_segments"]),
+]
+
+
+def parse_importtime(stderr: str) -> list:
+    """
+    Parse `-X importtime` output
+    Returns: list of (module, self_us, cumulative_us, depth)
+    """
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        # "import time:       123 |        456 |   package.module"
+        try:
+            self_part, cumulative_part, name = line.split(":", 1)[1].split("|", 2)
+            self_us = int(self_part)
+            cumulative_us = int(cumulative_part)
+        except ValueError:
+            continue
+        name = name[1:]  # single separator space; the rest is nesting indent
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((name.strip(), self_us, cumulative_us, depth))
+    return rows
+
+
+def measure(args: list) -> tuple:
+    """
+    Run one entry point with -X importtime
+    Returns: (total_import_ms, rows, error) - error is None unless the entry point exited non-zero
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        cwd=SCRIPT_DIR, capture_output=True, text=True
+    )
+    rows = parse_importtime(result.stderr)
+
+    # Top-level imports (depth 0) already include their children
+    total_us = sum(cumulative for _, _, cumulative, depth in rows if depth == 0)
+
+    error = None
+    if result.returncode != 0:
+        # A crash mid-import looks fast and light - never let it pass
+        output = [line for line in result.stderr.splitlines() if not line.startswith("import time:")]
+        error = f"exit {result.returncode}: {output[-1] if output else 'no output'}"
+    return total_us / 1000, rows, error
+
+
+def forbidden_imports(rows: list) -> list:
+    """Heavy modules present in an import trace"""
+    found = set()
+    for name, _, _, _ in rows:
+        for heavy in HEAVY_MODULES:
+            if name == heavy or name.startswith(heavy + "."):
+                found.add(heavy)
+    return sorted(found)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark recipe extractor startup imports")
+    parser.add_argument("--runs", "-n", type=int, default=3,
+                       help="Runs per entry point, best is reported (default: 3)")
+    parser.add_argument("--budget-ms", "-b", type=float, default=None,
+                       help="Fail if any entry point imports for longer than this")
+    parser.add_argument("--top", "-t", type=int, default=5,
+                       help="Show the N slowest top-level imports (default: 5)")
+    args = parser.parse_args()
+
+    print("\n" + "=" * 60)
+    print("  STARTUP IMPORT BENCHMARK")
+    print("=" * 60)
+
+    failures = []
+
+    for name, entry_args in ENTRY_POINTS:
+        runs = [measure(entry_args) for _ in range(args.runs)]
+        total_ms, rows, _ = min(runs, key=lambda r: r[0])
+
+        print(f"\n{name}: {total_ms:.1f} ms ({len(rows)} modules)")
+
+        errors = [r[2] for r in runs if r[2]]
+        if errors:
+            print(f"  ✗ Entry point failed ({errors[0]})")
+            failures.append(name)
+            continue
+
+        top_level = sorted((r for r in rows if r[3] == 0), key=lambda r: r[2], reverse=True)
+        for module, _, cumulative, _ in top_level[:args.top]:
+            print(f"    {cumulative / 1000:7.1f} ms  {module}")
+
+        heavy = forbidden_imports(rows)
+        if heavy:
+            print(f"  ✗ Heavy imports at startup: {', '.join(heavy)}")
+            failures.append(name)
+        if args.budget_ms is not None and total_ms > args.budget_ms:
+            print(f"  ✗ Over budget ({total_ms:.1f} ms > {args.budget_ms:.0f} ms)")
+            failures.append(name)
+
+    print("\n" + "=" * 60)
+    if failures:
+        print(f"REGRESSION in: {', '.join(sorted(set(failures)))}")
+        print("=" * 60)
+        sys.exit(1)
+
+    print("OK - all entry points start light")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -17,20 +17,45 @@ import tempfile
 import subprocess
 import base64
 import platform
+import threading
 from pathlib import Path
 from datetime import datetime
 from urllib.parse import urlparse
 
-from dotenv import load_dotenv
-from rich.console import Console
-from rich.markdown import Markdown
-from rich.panel import Panel
-import google.generativeai as genai
+from image_preprocess import preprocess_image, format_stats
+from recipe_segments import extract_recipes, format_timestamp
 
-# Load environment variables
-load_dotenv()
+# Heavy dependencies (google.generativeai, rich, whisper, torch, PIL) are
+# imported on first use, so `--help`, image-only runs and scripts that
+# import this module only pay for the path they take.
+# Check with: python bench_startup.py
 
-console = Console()
+_env_loaded = False
+
+
+def load_env():
+    """Load environment variables from .env (once)"""
+    global _env_loaded
+
+    if not _env_loaded:
+        from dotenv import load_dotenv
+        load_dotenv()
+        _env_loaded = True
+
+
+class _LazyConsole:
+    """rich Console, created on first print"""
+
+    _console = None
+
+    def __getattr__(self, name):
+        if _LazyConsole._console is None:
+            from rich.console import Console
+            _LazyConsole._console = Console()
+        return getattr(_LazyConsole._console, name)
+
+
+console = _LazyConsole()
 
 # Gemini OCR Prompt (aligned with NutriNine)
 GEMINI_OCR_PROMPT = """Extract ALL text from this image exactly as it appears.
@@ -73,6 +98,14 @@ If text is in regional language (Telugu, Hindi, Tamil), translate to English but
 Return ONLY valid JSON, no markdown code blocks."""
 
 
+def gemini_model(api_key: str):
+    """Configure Gemini and return the model used for OCR and formatting"""
+    import google.generativeai as genai
+
+    genai.configure(api_key=api_key)
+    return genai.GenerativeModel('gemini-2.0-flash-exp')
+
+
 def gemini_ocr_image(image_path: str) -> tuple:
     """
     Extract text from image using Gemini Vision
@@ -80,30 +113,19 @@ def gemini_ocr_image(image_path: str) -> tuple:
     """
     console.print("[yellow]Extracting text with Gemini Vision...[/yellow]")
 
+    load_env()
     api_key = os.getenv("GEMINI_API_KEY")
     if not api_key:
         raise ValueError("GEMINI_API_KEY not found in environment")
 
-    genai.configure(api_key=api_key)
-    model = genai.GenerativeModel('gemini-2.0-flash-exp')
+    model = gemini_model(api_key)
 
-    # Read and encode image
-    with open(image_path, 'rb') as f:
-        image_data = f.read()
+    # Shrink the image to what OCR needs (decode, rotate, crop, downscale)
+    image_data, mime_type, stats = preprocess_image(image_path)
+    console.print(f"[dim]Image: {format_stats(stats)}[/dim]")
 
     image_b64 = base64.b64encode(image_data).decode('utf-8')
 
-    # Determine mime type
-    ext = Path(image_path).suffix.lower()
-    mime_map = {
-        '.jpg': 'image/jpeg',
-        '.jpeg': 'image/jpeg',
-        '.png': 'image/png',
-        '.gif': 'image/gif',
-        '.webp': 'image/webp'
-    }
-    mime_type = mime_map.get(ext, 'image/jpeg')
-
     # Call Gemini Vision
     response = model.generate_content([
         {'text': GEMINI_OCR_PROMPT},
@@ -148,9 +170,8 @@ def format_with_gemini(raw_text: str) -> dict:
     """
     console.print("[yellow]Formatting recipe with Gemini AI...[/yellow]")
 
-    api_key = os.getenv("GEMINI_API_KEY")
-    genai.configure(api_key=api_key)
-    model = genai.GenerativeModel('gemini-2.0-flash-exp')
+    load_env()
+    model = gemini_model(os.getenv("GEMINI_API_KEY"))
 
     prompt = f"{GEMINI_RECIPE_PROMPT}\n\n---\n\nRaw text:\n\n{raw_text}"
 
@@ -265,6 +286,7 @@ def transcribe_audio_sarvam(audio_path: str) -> str:
 
     import requests
 
+    load_env()
     api_key = os.getenv("SARVAM_API_KEY")
     if not api_key:
         console.print("[yellow]Sarvam API key not found, falling back to Whisper[/yellow]")
@@ -290,36 +312,64 @@ def transcribe_audio_sarvam(audio_path: str) -> str:
             return transcribe_audio_whisper(audio_path)
 
 
-def transcribe_audio_whisper(audio_path: str, model_size: str = "large") -> str:
-    """Transcribe audio using Whisper (fallback)
-
-    Args:
-        audio_path: Path to audio file
-        model_size: Whisper model size (tiny/base/small/medium/large)
-                   Default: large (best for Telugu/multilingual)
-    """
-    console.print(f"[yellow]Transcribing audio with Whisper ({model_size})...[/yellow]")
-
-    import whisper
+def get_whisper_device() -> str:
+    """Pick the torch device Whisper should run on"""
     import torch
 
     # Force CPU mode on Windows due to RTX 5080 sm_120 incompatibility with current PyTorch
     # Once PyTorch adds Blackwell support, this can be removed
     if platform.system() == 'Windows':
-        device = "cpu"
         console.print(f"[yellow]Using CPU mode on Windows (RTX 5080 sm_120 not yet supported by PyTorch)[/yellow]")
-    else:
-        # Check if CUDA is available on non-Windows platforms
-        device = "cuda" if torch.cuda.is_available() else "cpu"
-        console.print(f"[dim]Using device: {device}[/dim]")
+        return "cpu"
+
+    # Check if CUDA is available on non-Windows platforms
+    device = "cuda" if torch.cuda.is_available() else "cpu"
+    console.print(f"[dim]Using device: {device}[/dim]")
+
+    if device == "cuda":
+        console.print(f"[dim]GPU: {torch.cuda.get_device_name(0)}[/dim]")
+
+    return device
+
+
+# Loaded Whisper models, keyed by (model_size, device). Loading `large` takes
+# most of a minute, so long-running callers (web server) reuse them.
+_whisper_models = {}
+_whisper_lock = threading.Lock()
+
+
+def load_whisper_model(model_size: str = "large", device: str = None):
+    """Load a Whisper model once and return the cached instance
+    Returns: (model, device)
+    """
+    import whisper
 
-        if device == "cuda":
-            console.print(f"[dim]GPU: {torch.cuda.get_device_name(0)}[/dim]")
+    device = device or get_whisper_device()
 
-    # Load model
-    console.print(f"[yellow]Loading Whisper {model_size} model on {device}...[/yellow]")
-    model = whisper.load_model(model_size, device=device)
-    console.print(f"[green]Model loaded successfully![/green]")
+    with _whisper_lock:
+        model = _whisper_models.get((model_size, device))
+        if model is None:
+            console.print(f"[yellow]Loading Whisper {model_size} model on {device}...[/yellow]")
+            model = whisper.load_model(model_size, device=device)
+            _whisper_models[(model_size, device)] = model
+            console.print(f"[green]Model loaded successfully![/green]")
+
+    return model, device
+
+
+def transcribe_audio_whisper_result(audio_path: str, model_size: str = "large") -> dict:
+    """Transcribe audio using Whisper, keeping segment timestamps
+
+    Args:
+        audio_path: Path to audio file
+        model_size: Whisper model size (tiny/base/small/medium/large)
+                   Default: large (best for Telugu/multilingual)
+
+    Returns: Whisper result dict ('text', 'segments', 'language')
+    """
+    console.print(f"[yellow]Transcribing audio with Whisper ({model_size})...[/yellow]")
+
+    model, device = load_whisper_model(model_size)
 
     # Transcribe with FP16 for GPU acceleration (disabled for CPU)
     console.print(f"[yellow]Starting transcription...[/yellow]")
@@ -327,7 +377,18 @@ def transcribe_audio_whisper(audio_path: str, model_size: str = "large") -> str:
     result = model.transcribe(audio_path, fp16=fp16, language="te")  # Telugu hint
     console.print(f"[green]Transcription complete![/green]")
 
-    return result["text"]
+    return result
+
+
+def transcribe_audio_whisper(audio_path: str, model_size: str = "large") -> str:
+    """Transcribe audio using Whisper (fallback)
+
+    Args:
+        audio_path: Path to audio file
+        model_size: Whisper model size (tiny/base/small/medium/large)
+                   Default: large (best for Telugu/multilingual)
+    """
+    return transcribe_audio_whisper_result(audio_path, model_size)["text"]
 
 
 def transcribe_audio(audio_path: str) -> str:
@@ -345,12 +406,18 @@ def save_as_markdown(recipe_data: dict, output_dir: str, source: str) -> str:
     filename = re.sub(r'\s+', '_', filename).strip()[:50]
     filepath = os.path.join(output_dir, f"{filename}.md")
 
+    # Position within the source video (multi-recipe videos)
+    timestamps = ""
+    ts = recipe_data.get('source_timestamps')
+    if ts:
+        timestamps = f"timestamps: {format_timestamp(ts['start'])}-{format_timestamp(ts['end'])}\n"
+
     # Build markdown content
     md = f"""---
 source: {source}
 extracted: {datetime.now().isoformat()}
 confidence: {recipe_data.get('confidence', 0.0):.2f}
----
+{timestamps}---
 
 # {recipe_data.get('name', 'Untitled Recipe')}
 
@@ -432,13 +499,41 @@ def process_image(image_path: str, output_dir: str, output_format: str):
     console.print(f"[dim]Confidence: {recipe_data['confidence']:.2f}[/dim]")
 
 
-def process_video(url: str, output_dir: str, output_format: str, whisper_model: str = "large"):
-    """Process video (YouTube/Instagram/Facebook/TikTok)"""
+def save_video_recipes(recipes: list, output_dir: str, output_format: str, url: str, metadata: dict = None):
+    """Save every recipe found in a (possibly multi-recipe) video"""
+    console.print(f"[green]Found {len(recipes)} recipe(s) in video[/green]")
+
+    for recipe_data in recipes:
+        recipe_data['extraction_source'] = "transcription"
+        if metadata:
+            recipe_data['metadata'] = {
+                'title': metadata.get('title', ''),
+                'description': metadata.get('description', '')
+            }
+
+        if output_format == 'json':
+            filepath = save_as_json(recipe_data, output_dir, url)
+        else:
+            filepath = save_as_markdown(recipe_data, output_dir, url)
+
+        ts = recipe_data.get('source_timestamps', {})
+        span = f"{format_timestamp(ts.get('start', 0))}-{format_timestamp(ts.get('end', 0))}"
+        console.print(f"[green]✓ {recipe_data.get('name', 'Recipe')} ({span}) saved to: {filepath}[/green]")
+
+
+def process_video(url: str, output_dir: str, output_format: str, whisper_model: str = "large",
+                  multi: bool = True):
+    """Process video (YouTube/Instagram/Facebook/TikTok)
+
+    With multi=True, transcripts are split into topic segments and every
+    recipe in the video is saved (compilation videos).
+    """
 
     # Step 1: Try to extract recipe from URL metadata first
     metadata = extract_url_metadata(url)
 
     raw_text = None
+    whisper_result = None
     source = "metadata"
 
     if metadata and len(metadata['text']) > 100:
@@ -457,10 +552,11 @@ def process_video(url: str, output_dir: str, output_format: str, whisper_model:
             # Transcribe (skip Sarvam, use Whisper directly if large model requested)
             if whisper_model != "base":
                 console.print(f"[cyan]Using Whisper {whisper_model} (skipping Sarvam AI)[/cyan]")
-                raw_text = transcribe_audio_whisper(audio_path, model_size=whisper_model)
+                whisper_result = transcribe_audio_whisper_result(audio_path, model_size=whisper_model)
             else:
-                raw_text = transcribe_audio(audio_path)
+                whisper_result = {'text': transcribe_audio(audio_path), 'segments': []}
 
+            raw_text = whisper_result['text']
             source = "transcription"
 
     if not raw_text:
@@ -470,6 +566,14 @@ def process_video(url: str, output_dir: str, output_format: str, whisper_model:
     console.print(f"\n[dim]Extracted text from {source}:[/dim]")
     console.print(f"[dim]{raw_text[:500]}...[/dim]\n")
 
+    if source == "transcription" and multi:
+        recipes = extract_recipes(whisper_result, format_with_gemini)
+        if not recipes:
+            console.print("[yellow]No recipes found in transcription[/yellow]")
+            return
+        save_video_recipes(recipes, output_dir, output_format, url, metadata)
+        return
+
     # Format with Gemini
     recipe_data = format_with_gemini(raw_text)
 
@@ -481,12 +585,21 @@ def process_video(url: str, output_dir: str, output_format: str, whisper_model:
             console.print("[yellow]Metadata didn't contain recipe, falling back to video transcription...[/yellow]")
             with tempfile.TemporaryDirectory() as temp_dir:
                 audio_path = download_video_audio(url, temp_dir)
-                raw_text = transcribe_audio_whisper(audio_path, model_size=whisper_model)
-                recipe_data = format_with_gemini(raw_text)
+                whisper_result = transcribe_audio_whisper_result(audio_path, model_size=whisper_model)
 
-                if recipe_data.get('is_recipe') == False:
-                    console.print(f"[red]Still not a recipe after transcription: {recipe_data.get('reason')}[/red]")
+            if multi:
+                recipes = extract_recipes(whisper_result, format_with_gemini)
+                if not recipes:
+                    console.print("[red]Still not a recipe after transcription[/red]")
                     return
+                save_video_recipes(recipes, output_dir, output_format, url, metadata)
+                return
+
+            recipe_data = format_with_gemini(whisper_result['text'])
+
+            if recipe_data.get('is_recipe') == False:
+                console.print(f"[red]Still not a recipe after transcription: {recipe_data.get('reason')}[/red]")
+                return
         else:
             return
 
@@ -518,9 +631,14 @@ def main():
     parser.add_argument("--format", "-f", choices=['md', 'json'], default='md', help="Output format (default: md)")
     parser.add_argument("--whisper-model", "-w", choices=['tiny', 'base', 'small', 'medium', 'large'],
                        default='large', help="Whisper model size (default: large, best for Telugu)")
+    parser.add_argument("--single", action="store_true",
+                       help="Treat a video as one recipe (skip transcript segmentation)")
 
     args = parser.parse_args()
 
+    from rich.panel import Panel
+    load_env()
+
     console.print(Panel.fit(
         "[bold magenta]Recipe Extractor v2[/bold magenta]\n"
         "[dim]Powered by Gemini Vision & AI[/dim]",
@@ -530,7 +648,7 @@ def main():
     # Detect source type
     if args.source.startswith('http'):
         # Video URL
-        process_video(args.source, args.output, args.format, args.whisper_model)
+        process_video(args.source, args.output, args.format, args.whisper_model, multi=not args.single)
     elif os.path.isfile(args.source):
         # Image file
         process_image(args.source, args.output, args.format)
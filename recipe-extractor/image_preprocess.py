@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Image Pre-processing for OCR
+Shrinks recipe photos before they are sent to Gemini Vision.
+
+A 12 MP phone photo is ~6 MB once base64-encoded, but OCR only needs
+enough pixels to read the text. Pipeline:
+    1. Decode (JPEG/PNG/WebP/GIF, HEIC with pillow-heif)
+    2. Auto-rotate from EXIF orientation
+    3. Crop to the document region (drop table/background)
+    4. Downscale so the longest edge is at most OCR_MAX_EDGE
+    5. Re-encode as JPEG at OCR_JPEG_QUALITY
+
+Usage:
+    python image_preprocess.py <image> [<image> ...]
+
+HEIC/HEIF support needs:
+    pip install pillow-heif
+"""
+
+import io
+import os
+import sys
+import time
+from pathlib import Path
+
+# Longest edge sent to OCR. Handwriting stays legible around 2000px;
+# anything above that only adds bytes.
+OCR_MAX_EDGE = int(os.getenv("OCR_MAX_EDGE", "2048"))
+OCR_JPEG_QUALITY = int(os.getenv("OCR_JPEG_QUALITY", "85"))
+
+# Document cropping: pixels differing from the border colour by more than
+# CROP_THRESHOLD (0-255) count as content. Crops keeping less than
+# CROP_MIN_AREA of the image are assumed wrong and skipped.
+CROP_THRESHOLD = 40
+CROP_MIN_AREA = 0.2
+CROP_MARGIN = 0.02
+
+MIME_TYPES = {
+    '.jpg': 'image/jpeg',
+    '.jpeg': 'image/jpeg',
+    '.png': 'image/png',
+    '.gif': 'image/gif',
+    '.webp': 'image/webp',
+    '.heic': 'image/heic',
+    '.heif': 'image/heif',
+}
+
+# Running totals across all images processed by this process
+METRICS = {
+    'images': 0,
+    'bytes_in': 0,
+    'bytes_out': 0,
+    'total_ms': 0.0,
+}
+
+_heif_available = None
+
+
+def _register_heif() -> bool:
+    """Register the HEIC/HEIF decoder with Pillow (once)"""
+    global _heif_available
+
+    if _heif_available is None:
+        try:
+            from pillow_heif import register_heif_opener
+            register_heif_opener()
+            _heif_available = True
+        except ImportError:
+            _heif_available = False
+
+    return _heif_available
+
+
+def mime_type_for(image_path: str) -> str:
+    """Mime type for an image file based on its extension"""
+    return MIME_TYPES.get(Path(image_path).suffix.lower(), 'image/jpeg')
+
+
+def find_document_box(img):
+    """
+    Find the bounding box of the document in a photo.
+    Returns: (left, top, right, bottom) in image pixels, or None to keep the full frame
+    """
+    from PIL import ImageFilter, ImageOps
+
+    # Work on a small greyscale copy - cropping doesn't need full resolution
+    small = ImageOps.grayscale(img)
+    small.thumbnail((512, 512))
+    small = small.filter(ImageFilter.MedianFilter(5))
+
+    # Background colour = median of the outermost pixel ring
+    w, h = small.size
+    pixels = small.load()
+    border = [pixels[x, 0] for x in range(w)] + [pixels[x, h - 1] for x in range(w)]
+    border += [pixels[0, y] for y in range(h)] + [pixels[w - 1, y] for y in range(h)]
+    background = sorted(border)[len(border) // 2]
+
+    mask = small.point(lambda p: 255 if abs(p - background) > CROP_THRESHOLD else 0)
+    box = mask.getbbox()
+    if not box:
+        return None
+
+    left, top, right, bottom = box
+    if (right - left) * (bottom - top) < CROP_MIN_AREA * w * h:
+        return None
+
+    # Scale back to full resolution and pad by a small margin
+    sx = img.width / w
+    sy = img.height / h
+    mx = int(img.width * CROP_MARGIN)
+    my = int(img.height * CROP_MARGIN)
+    full_box = (
+        max(int(left * sx) - mx, 0),
+        max(int(top * sy) - my, 0),
+        min(int(right * sx) + mx, img.width),
+        min(int(bottom * sy) + my, img.height),
+    )
+
+    if full_box == (0, 0, img.width, img.height):
+        return None
+    return full_box
+
+
+def preprocess_image(image_path: str, max_edge: int = None, quality: int = None) -> tuple:
+    """
+    Prepare an image for OCR
+    Returns: (image_bytes, mime_type, stats)
+
+    Falls back to the original bytes (with the correct mime type) when the
+    image can't be decoded, e.g. HEIC without pillow-heif installed.
+    """
+    max_edge = max_edge or OCR_MAX_EDGE
+    quality = quality or OCR_JPEG_QUALITY
+
+    start = time.perf_counter()
+
+    with open(image_path, 'rb') as f:
+        original = f.read()
+
+    stats = {
+        'original_bytes': len(original),
+        'original_size': None,
+        'output_size': None,
+        'rotated': False,
+        'cropped': False,
+        'resized': False,
+    }
+
+    data, mime_type = original, mime_type_for(image_path)
+
+    try:
+        from PIL import Image, ImageOps
+
+        if Path(image_path).suffix.lower() in ('.heic', '.heif'):
+            _register_heif()
+
+        img = Image.open(io.BytesIO(original))
+        stats['original_size'] = img.size
+
+        # EXIF orientation - phones store portrait photos rotated
+        orientation = img.getexif().get(0x0112, 1)
+        if orientation != 1:
+            img = ImageOps.exif_transpose(img)
+            stats['rotated'] = True
+
+        if img.mode not in ('RGB', 'L'):
+            img = img.convert('RGB')
+
+        box = find_document_box(img)
+        if box:
+            img = img.crop(box)
+            stats['cropped'] = True
+
+        if max(img.size) > max_edge:
+            img.thumbnail((max_edge, max_edge), Image.LANCZOS)
+            stats['resized'] = True
+
+        out = io.BytesIO()
+        img.save(out, format='JPEG', quality=quality, optimize=True)
+        encoded = out.getvalue()
+        stats['output_size'] = img.size
+
+        # Small screenshots can grow when re-encoded - keep the original then
+        transformed = stats['rotated'] or stats['cropped'] or stats['resized']
+        if transformed or len(encoded) < len(original):
+            data, mime_type = encoded, 'image/jpeg'
+
+    except ImportError:
+        stats['error'] = "Pillow not installed"
+    except Exception as e:
+        stats['error'] = str(e)
+
+    stats['output_bytes'] = len(data)
+    stats['bytes_saved'] = len(original) - len(data)
+    stats['latency_ms'] = (time.perf_counter() - start) * 1000
+
+    METRICS['images'] += 1
+    METRICS['bytes_in'] += stats['original_bytes']
+    METRICS['bytes_out'] += stats['output_bytes']
+    METRICS['total_ms'] += stats['latency_ms']
+
+    return data, mime_type, stats
+
+
+def format_stats(stats: dict) -> str:
+    """One-line summary of a preprocess_image() result"""
+    before = stats['original_bytes'] / 1024
+    after = stats['output_bytes'] / 1024
+    line = f"{before:.0f} KB → {after:.0f} KB ({stats['latency_ms']:.0f} ms)"
+
+    if stats.get('original_size') and stats.get('output_size'):
+        ow, oh = stats['original_size']
+        nw, nh = stats['output_size']
+        line += f", {ow}x{oh} → {nw}x{nh}"
+
+    steps = [s for s in ('rotated', 'cropped', 'resized') if stats.get(s)]
+    if steps:
+        line += f" [{', '.join(steps)}]"
+    if stats.get('error'):
+        line += f" [sent original: {stats['error']}]"
+
+    return line
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python image_preprocess.py <image> [<image> ...]")
+        sys.exit(1)
+
+    for image_path in sys.argv[1:]:
+        _, mime_type, stats = preprocess_image(image_path)
+        print(f"{Path(image_path).name}: {format_stats(stats)} {mime_type}")
+
+    if METRICS['images'] > 1:
+        saved = (METRICS['bytes_in'] - METRICS['bytes_out']) / (1024 * 1024)
+        avg_ms = METRICS['total_ms'] / METRICS['images']
+        print(f"\nTotal: {METRICS['images']} images, {saved:.1f} MB saved, {avg_ms:.0f} ms/image")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+Resumable Extraction Jobs
+Persists each web extraction job and its stage artefacts, so a restarted
+server resumes from the last completed stage instead of starting over.
+
+Layout:
+    jobs/<job_id>/
+    ├── job.json          # kind, source, completed stages, status
+    ├── audio.mp3         # downloaded / extracted audio
+    ├── segments.jsonl    # transcript, one line per completed chunk
+    └── recipes.json      # formatted recipes
+
+When a job finishes (or fails) everything but job.json, segments.jsonl and
+recipes.json is deleted - enough to replay the job to a re-attaching
+client - along with an uploaded source file the job owns.
+
+Transcription runs in fixed-length chunks, each appended to segments.jsonl
+as soon as it finishes, so a crash an hour into a long video only loses
+the chunk that was in progress.
+"""
+
+import json
+import math
+import os
+import shutil
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+JOBS_DIR = Path(os.getenv("RECIPE_JOBS_DIR", "jobs"))
+
+# Audio per resumable transcription chunk
+TRANSCRIBE_CHUNK_SECONDS = 120
+
+# Kept after a job finishes (replayed to re-attaching clients)
+KEEP_FILES = {'job.json', 'segments.jsonl', 'recipes.json'}
+
+
+def job_dir(job: dict) -> Path:
+    """Directory holding a job's state and artefacts"""
+    return JOBS_DIR / job['id']
+
+
+def job_path(job: dict, name: str) -> Path:
+    """Path of an artefact inside the job directory"""
+    return job_dir(job) / name
+
+
+def save_job(job: dict):
+    """Write job state atomically (never leaves a half-written job.json)"""
+    job['updated_at'] = datetime.now().isoformat()
+    path = job_path(job, 'job.json')
+    tmp_path = path.with_suffix('.json.tmp')
+
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(job, f, indent=2, ensure_ascii=False)
+        f.flush()
+        os.fsync(f.fileno())
+
+    os.replace(tmp_path, path)
+
+
+def new_job(kind: str, source: str, owns_source: bool = False) -> dict:
+    """
+    Create and persist a new job ('url', 'video_file' or 'image')
+    With `owns_source` (uploads) the source file is deleted when the job finishes.
+    """
+    job = {
+        'id': uuid.uuid4().hex[:12],
+        'kind': kind,
+        'source': source,
+        'owns_source': owns_source,
+        'status': 'running',
+        'stages': {},
+        'created_at': datetime.now().isoformat(),
+        'error': None
+    }
+    job_dir(job).mkdir(parents=True, exist_ok=True)
+    save_job(job)
+    return job
+
+
+def load_job(job_id: str) -> dict:
+    """Load a job by ID, or None if unknown"""
+    # Job IDs come from clients - never let them escape JOBS_DIR
+    if not job_id or not job_id.isalnum():
+        return None
+
+    path = JOBS_DIR / job_id / 'job.json'
+    if not path.exists():
+        return None
+
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def incomplete_jobs() -> list:
+    """Jobs that were still running when the server stopped"""
+    if not JOBS_DIR.exists():
+        return []
+
+    jobs = []
+    for path in JOBS_DIR.iterdir():
+        job = load_job(path.name)
+        if job and job['status'] == 'running':
+            jobs.append(job)
+
+    return sorted(jobs, key=lambda j: j['created_at'])
+
+
+def stage_done(job: dict, stage: str) -> bool:
+    """Whether a stage has already completed"""
+    return stage in job['stages']
+
+
+def complete_stage(job: dict, stage: str, **data):
+    """Record a completed stage (with any small results) and persist"""
+    job['stages'][stage] = {'completed_at': datetime.now().isoformat(), **data}
+    save_job(job)
+
+
+def finish_job(job: dict, error: str = None):
+    """Mark a job done (or failed) so it isn't resumed, and delete its heavy artefacts"""
+    job['status'] = 'failed' if error else 'done'
+    job['error'] = error
+    save_job(job)
+    cleanup_job(job)
+
+
+def cleanup_job(job: dict):
+    """Delete artefacts a finished job no longer needs (audio, temp files, owned upload)"""
+    for path in job_dir(job).iterdir():
+        if path.name in KEEP_FILES:
+            continue
+        if path.is_dir():
+            shutil.rmtree(path, ignore_errors=True)
+        else:
+            path.unlink(missing_ok=True)
+
+    if job.get('owns_source') and job.get('source'):
+        Path(job['source']).unlink(missing_ok=True)
+
+
+def cleanup_finished_jobs() -> int:
+    """Clean up finished jobs left with artefacts (e.g. by a crash during cleanup). Returns: jobs cleaned"""
+    if not JOBS_DIR.exists():
+        return 0
+
+    cleaned = 0
+    for path in JOBS_DIR.iterdir():
+        job = load_job(path.name)
+        if job and job['status'] != 'running':
+            if any(p.name not in KEEP_FILES for p in path.iterdir()) \
+                    or (job.get('owns_source') and os.path.exists(job['source'])):
+                cleanup_job(job)
+                cleaned += 1
+
+    return cleaned
+
+
+def save_recipes(job: dict, recipes: list):
+    """Persist formatted recipes"""
+    with open(job_path(job, 'recipes.json'), 'w', encoding='utf-8') as f:
+        json.dump(recipes, f, indent=2, ensure_ascii=False)
+
+
+def load_recipes(job: dict) -> list:
+    """Formatted recipes of a job (empty if not formatted yet)"""
+    path = job_path(job, 'recipes.json')
+    if not path.exists():
+        return []
+
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _read_chunks(path: Path, repair: bool = False) -> dict:
+    """
+    Completed transcript chunks from segments.jsonl
+    Lines that don't parse (a crash mid-write, or a line still being
+    written) are skipped. With `repair` they are also removed from the
+    file - only the writer may do that, before it appends again.
+    """
+    if not path.exists():
+        return {}
+
+    chunks = {}
+    valid_lines = []
+    torn = False
+
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                torn = True
+                continue
+            chunks[record['chunk']] = record
+            valid_lines.append(line if line.endswith('\n') else line + '\n')
+
+    if torn and repair:
+        with open(path, 'w', encoding='utf-8') as f:
+            f.writelines(valid_lines)
+
+    return chunks
+
+
+def read_transcript(job: dict) -> dict:
+    """Transcript of the chunks completed so far, as a Whisper-style result"""
+    chunks = _read_chunks(job_path(job, 'segments.jsonl'))
+    ordered = [chunks[i] for i in sorted(chunks)]
+
+    return {
+        'text': ' '.join(c['text'] for c in ordered if c['text']),
+        'segments': [s for c in ordered for s in c['segments']]
+    }
+
+
+def transcribe_resumable(job: dict, audio_path: str, model_size: str = "large", on_chunk=None) -> dict:
+    """
+    Transcribe audio in chunks, skipping chunks a previous run completed
+    Returns: Whisper-style result dict ('text', 'segments')
+
+    on_chunk(done, total, record) is called after each newly transcribed chunk.
+    """
+    import whisper
+    from extract_recipe_v2 import load_whisper_model
+
+    model, device = load_whisper_model(model_size)
+
+    audio = whisper.load_audio(str(audio_path))
+    chunk_samples = TRANSCRIBE_CHUNK_SECONDS * whisper.audio.SAMPLE_RATE
+    total = max(1, math.ceil(len(audio) / chunk_samples))
+
+    segments_path = job_path(job, 'segments.jsonl')
+    chunks = _read_chunks(segments_path, repair=True)
+    if chunks:
+        print(f"[{job['id']}] Resuming transcription at chunk {len(chunks) + 1}/{total}")
+
+    with open(segments_path, 'a', encoding='utf-8') as f:
+        for index in range(total):
+            if index in chunks:
+                continue
+
+            offset = index * TRANSCRIBE_CHUNK_SECONDS
+            chunk_audio = audio[index * chunk_samples:(index + 1) * chunk_samples]
+            result = model.transcribe(chunk_audio, fp16=device == "cuda", language="te")  # Telugu hint
+
+            record = {
+                'chunk': index,
+                'text': result['text'].strip(),
+                'segments': [
+                    {'start': s['start'] + offset, 'end': s['end'] + offset, 'text': s['text']}
+                    for s in result['segments']
+                ]
+            }
+            f.write(json.dumps(record, ensure_ascii=False) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+
+            chunks[index] = record
+            if on_chunk:
+                on_chunk(len(chunks), total, record)
+
+    return read_transcript(job)
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Transcript Segmentation for Multi-Recipe Videos
+Splits long transcripts into per-topic chunks and formats them concurrently.
+
+Compilation videos ("5 breakfast recipes") used to go to Gemini as one
+prompt and come back as one recipe. Instead:
+    1. Whisper segments are grouped into chunks at spoken topic changes
+       ("next recipe", "recipe number 2"). Only a chunk that is still
+       over the maximum size is cut further, at long pauses (or at the
+       size limit), so a single-recipe video stays one chunk
+    2. Each chunk is formatted with Gemini in parallel
+    3. Non-recipes are dropped, duplicates (one recipe split across two
+       chunks) are merged into one recipe, and every recipe gets its
+       source timestamps
+
+Wall time stays close to a single Gemini call because the chunks run
+concurrently, while each prompt stays small.
+"""
+
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+# Chunk sizing (characters of transcript per Gemini call)
+SEGMENT_MAX_CHARS = 8000
+SEGMENT_MIN_CHARS = 600
+
+# Inside an oversized chunk, a pause this long is a likely recipe boundary
+# (cooks routinely go quiet for a few seconds while stirring)
+SEGMENT_PAUSE_SECONDS = 20.0
+
+# Parallel Gemini calls
+FORMAT_MAX_WORKERS = 4
+
+# Spoken cues that a new recipe is starting (English + romanised Telugu/Hindi)
+TOPIC_MARKERS = re.compile(
+    r"\b("
+    r"next recipe|another recipe|second recipe|third recipe|fourth recipe|fifth recipe|"
+    r"recipe (number|no\.?) ?\d+|"
+    r"now let'?s (make|prepare|see)|"
+    r"next (dish|item) is|"
+    r"tarvata recipe|next recipe lo|agla recipe"
+    r")\b",
+    re.IGNORECASE
+)
+
+
+def _chunk(segments: list) -> dict:
+    return {
+        'start': segments[0]['start'],
+        'end': segments[-1]['end'],
+        'text': ' '.join(seg['text'] for seg in segments)
+    }
+
+
+def _split_oversized(segments: list, max_chars: int, min_chars: int, pause_seconds: float) -> list:
+    """Cut a topic that is over max_chars at its longest pause, else at the size limit"""
+    sizes = [len(seg['text']) + 1 for seg in segments]
+    total = sum(sizes)
+    if total <= max_chars or len(segments) < 2:
+        return [segments]
+
+    # Cut points (before segment i) that leave both sides a real chunk
+    prefix, cuts = 0, []
+    for i in range(1, len(segments)):
+        prefix += sizes[i - 1]
+        if prefix >= min_chars and total - prefix >= min_chars:
+            cuts.append((segments[i]['start'] - segments[i - 1]['end'], i))
+
+    gap, cut = max(cuts, default=(0, None))
+    if cut is None or gap < pause_seconds:
+        # No clear pause - fill up to the size limit
+        cut, prefix = 1, sizes[0]
+        while cut < len(segments) - 1 and prefix + sizes[cut] <= max_chars:
+            prefix += sizes[cut]
+            cut += 1
+
+    return (_split_oversized(segments[:cut], max_chars, min_chars, pause_seconds)
+            + _split_oversized(segments[cut:], max_chars, min_chars, pause_seconds))
+
+
+def split_transcript(segments: list, max_chars: int = SEGMENT_MAX_CHARS,
+                     min_chars: int = SEGMENT_MIN_CHARS,
+                     pause_seconds: float = SEGMENT_PAUSE_SECONDS) -> list:
+    """
+    Group Whisper segments into topic chunks - cut at topic markers first,
+    pauses only inside chunks over max_chars
+    Returns: list of {'start', 'end', 'text'} dicts
+    """
+    topics = []
+    size = 0
+
+    for seg in segments:
+        text = seg.get('text', '').strip()
+        if not text:
+            continue
+        seg = {'start': seg['start'], 'end': seg['end'], 'text': text}
+
+        if topics and size >= min_chars and TOPIC_MARKERS.search(text):
+            topics.append([])
+            size = 0
+        if not topics:
+            topics.append([])
+        topics[-1].append(seg)
+        size += len(text) + 1
+
+    chunks = []
+    for topic in topics:
+        for piece in _split_oversized(topic, max_chars, min_chars, pause_seconds):
+            chunks.append(_chunk(piece))
+
+    # Fold a tiny trailing chunk ("thanks for watching") into the previous one
+    if len(chunks) > 1 and len(chunks[-1]['text']) < min_chars:
+        last = chunks.pop()
+        chunks[-1]['end'] = last['end']
+        chunks[-1]['text'] += ' ' + last['text']
+
+    return chunks
+
+
+def _recipe_key(recipe: dict) -> str:
+    """Normalised recipe name for duplicate detection"""
+    return re.sub(r'[^a-z0-9]', '', recipe.get('name', '').lower())
+
+
+def merge_duplicate_recipes(recipes: list) -> list:
+    """Merge adjacent chunks that produced the same recipe"""
+    merged = []
+
+    for recipe in recipes:
+        prev = merged[-1] if merged else None
+
+        if prev and _recipe_key(prev) and _recipe_key(prev) == _recipe_key(recipe):
+            # One recipe split across chunks - keep both halves, widen the time range
+            ingredients = list(prev.get('ingredients') or [])
+            ingredients += [ing for ing in recipe.get('ingredients') or [] if ing not in ingredients]
+            instructions = '\n\n'.join(
+                part for part in (prev.get('instructions'), recipe.get('instructions')) if part)
+
+            merged[-1] = {**recipe, **{k: v for k, v in prev.items() if v not in (None, '', [])}}
+            merged[-1]['ingredients'] = ingredients
+            merged[-1]['instructions'] = instructions
+            merged[-1]['source_timestamps'] = {
+                'start': prev['source_timestamps']['start'],
+                'end': recipe['source_timestamps']['end']
+            }
+        else:
+            merged.append(recipe)
+
+    return merged
+
+
+def format_segments(chunks: list, format_func, max_workers: int = FORMAT_MAX_WORKERS) -> list:
+    """
+    Format each chunk concurrently
+    Returns: list of recipe dicts (non-recipes dropped), in video order
+    Raises: the formatting error if every chunk failed (quota, auth, network...)
+    """
+    def format_chunk(chunk):
+        try:
+            return format_func(chunk['text'])
+        except Exception as e:
+            return e
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        results = list(pool.map(format_chunk, chunks))
+
+    errors = [r for r in results if isinstance(r, Exception)]
+    if errors and len(errors) == len(results):
+        raise RuntimeError(f"Formatting failed for all {len(results)} segment(s): {errors[0]}") from errors[0]
+    if errors:
+        print(f"⚠ Formatting failed for {len(errors)}/{len(results)} segment(s), skipped: {errors[0]}")
+
+    recipes = []
+    for index, (chunk, recipe_data) in enumerate(zip(chunks, results)):
+        if isinstance(recipe_data, Exception) or recipe_data.get('is_recipe') == False:
+            continue
+
+        recipe_data['segment_index'] = index
+        recipe_data['source_timestamps'] = {
+            'start': round(chunk['start'], 1),
+            'end': round(chunk['end'], 1)
+        }
+        recipes.append(recipe_data)
+
+    return merge_duplicate_recipes(recipes)
+
+
+def extract_recipes(whisper_result: dict, format_func, max_workers: int = FORMAT_MAX_WORKERS) -> list:
+    """
+    Full segmentation pipeline for a Whisper transcription result
+    Returns: list of recipe dicts with 'source_timestamps'
+    """
+    chunks = split_transcript(whisper_result.get('segments', []))
+
+    if not chunks:
+        # No timestamps (e.g. Sarvam) - treat the whole text as one chunk
+        text = whisper_result.get('text', '').strip()
+        if not text:
+            return []
+        chunks = [{'start': 0.0, 'end': 0.0, 'text': text}]
+
+    return format_segments(chunks, format_func, max_workers=max_workers)
+
+
+def format_timestamp(seconds: float) -> str:
+    """Seconds → M:SS"""
+    seconds = int(seconds)
+    return f"{seconds // 60}:{seconds % 60:02d}"
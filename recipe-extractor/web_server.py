@@ -13,7 +13,7 @@ import base64
 from pathlib import Path
 from datetime import datetime
 from flask import Flask, render_template, request, jsonify, send_from_directory
-from flask_socketio import SocketIO, emit
+from flask_socketio import SocketIO, emit, join_room
 from werkzeug.utils import secure_filename
 import threading
 import time
@@ -29,16 +29,35 @@ if platform.system() == 'Windows':
 # Add current directory to path for imports
 sys.path.insert(0, os.path.dirname(__file__))
 
+from recipe_segments import extract_recipes
+from jobs import (
+    new_job,
+    load_job,
+    incomplete_jobs,
+    stage_done,
+    complete_stage,
+    finish_job,
+    cleanup_finished_jobs,
+    job_dir,
+    job_path,
+    save_recipes,
+    load_recipes,
+    read_transcript,
+    transcribe_resumable
+)
 from extract_recipe_v2 import (
     gemini_ocr_image,
     format_with_gemini,
     extract_url_metadata,
     download_video_audio,
-    transcribe_audio_whisper,
+    load_whisper_model,
     save_as_json,
-    save_as_markdown
+    save_as_markdown,
+    load_env
 )
 
+load_env()
+
 app = Flask(__name__)
 app.config['SECRET_KEY'] = 'recipe-extractor-secret'
 app.config['UPLOAD_FOLDER'] = 'uploads'
@@ -49,13 +68,64 @@ socketio = SocketIO(app, cors_allowed_origins="*")
 # Ensure upload directory exists
 os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
 
-ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'webp', 'pdf', 'mp4', 'avi', 'mov', 'mkv'}
+# Warm-up: Whisper models to preload at boot (comma-separated, empty = none).
+# The first request otherwise pays import + model load, over a minute for `large`.
+WARMUP_WHISPER_MODELS = [m.strip() for m in os.getenv("WARMUP_WHISPER_MODELS", "large").split(",") if m.strip()]
+
+warmup_state = {
+    'ready': False,
+    'started_at': None,
+    'finished_at': None,
+    'steps': [],
+    'error': None
+}
+
+ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'webp', 'heic', 'heif', 'pdf', 'mp4', 'avi', 'mov', 'mkv'}
 
 
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
 
+def warm_up():
+    """Preload heavy imports and Whisper models, then mark the server ready"""
+    warmup_state['started_at'] = datetime.now().isoformat()
+    print(f"Warm-up started (models: {', '.join(WARMUP_WHISPER_MODELS) or 'none'})")
+
+    def step(name, func):
+        start = time.time()
+        func()
+        elapsed = time.time() - start
+        warmup_state['steps'].append({'step': name, 'seconds': round(elapsed, 2)})
+        print(f"Warm-up: {name} ({elapsed:.1f}s)")
+
+    def run_dummy_inference(model_size):
+        import numpy as np
+        model, device = load_whisper_model(model_size)
+        # One second of silence is enough to trigger kernel compilation / cuDNN autotune
+        model.transcribe(np.zeros(16000, dtype=np.float32), fp16=device == "cuda", language="te")
+
+    try:
+        step('import cv2', lambda: __import__('cv2'))
+        step('import torch', lambda: __import__('torch'))
+        step('import whisper', lambda: __import__('whisper'))
+
+        for model_size in WARMUP_WHISPER_MODELS:
+            step(f'load whisper {model_size}', lambda: load_whisper_model(model_size))
+            step(f'dummy inference {model_size}', lambda: run_dummy_inference(model_size))
+
+        warmup_state['ready'] = True
+        print("Warm-up complete - ready to serve")
+
+    except Exception as e:
+        import traceback
+        warmup_state['error'] = str(e)
+        print(f"Warm-up FAILED: {traceback.format_exc()}")
+
+    finally:
+        warmup_state['finished_at'] = datetime.now().isoformat()
+
+
 def extract_video_frames(video_path, output_dir, fps=2):
     """Extract frames from video at specified FPS"""
     import cv2
@@ -99,196 +169,293 @@ def extract_video_frames(video_path, output_dir, fps=2):
     return frames
 
 
-def process_url(url, sid):
+def emit_recipes(job, recipes, extra=None):
+    """Save each recipe of a job, send it to the client and finish the job"""
+    room = job['id']
+    source_path = job['source']
+
+    socketio.emit('status', {'step': 'format_complete', 'message': f'Found {len(recipes)} recipe(s)'}, room=room)
+
+    outputs = []
+    for recipe_data in recipes:
+        recipe_data['source'] = source_path
+        recipe_data['extracted_at'] = datetime.now().isoformat()
+        recipe_data.update(extra or {})
+
+        json_path = save_as_json(recipe_data, 'recipes', source_path)
+        md_path = save_as_markdown(recipe_data, 'recipes', source_path)
+        outputs.append({'json_path': json_path, 'md_path': md_path})
+
+        socketio.emit('result', {
+            'recipe': recipe_data,
+            'json_path': json_path,
+            'md_path': md_path,
+            'source': recipe_data.get('extraction_source')
+        }, room=room)
+
+    save_recipes(job, recipes)
+    complete_stage(job, 'save', outputs=outputs)
+    finish_job(job)
+    socketio.emit('job_complete', {'job_id': room, 'status': 'done'}, room=room)
+
+
+def fail_job(job, message, details=None):
+    """Report an error to the client and stop the job from being resumed"""
+    socketio.emit('error', {'message': message if not details else f"{message}\n\nDetails: {details}"}, room=job['id'])
+    finish_job(job, error=message)
+    socketio.emit('job_complete', {'job_id': job['id'], 'status': 'failed'}, room=job['id'])
+
+
+def transcribe_stage(job, audio_path):
+    """Resumable Whisper transcription, emitting per-chunk progress"""
+    room = job['id']
+
+    if stage_done(job, 'transcribe'):
+        whisper_result = read_transcript(job)
+    else:
+        socketio.emit('status', {'step': 'transcribe', 'message': 'Transcribing audio...'}, room=room)
+
+        def on_chunk(done, total, record):
+            socketio.emit('status', {'step': 'transcribe_progress', 'message': f'Transcribed {done}/{total} chunks'}, room=room)
+
+        whisper_result = transcribe_resumable(job, audio_path, model_size="large", on_chunk=on_chunk)
+        complete_stage(job, 'transcribe')
+
+    socketio.emit('transcript', {'text': whisper_result['text']}, room=room)
+    socketio.emit('status', {'step': 'transcribe_complete', 'message': 'Transcription complete'}, room=room)
+    return whisper_result
+
+
+def format_stage(job, whisper_result):
+    """Segment the transcript and format recipes concurrently (once per job)"""
+    if stage_done(job, 'format'):
+        return load_recipes(job)
+
+    # Long videos may hold several recipes - format each segment concurrently
+    socketio.emit('status', {'step': 'format', 'message': 'Segmenting transcript and formatting recipes...'}, room=job['id'])
+    recipes = extract_recipes(whisper_result, format_with_gemini)
+
+    save_recipes(job, recipes)
+    complete_stage(job, 'format', recipe_count=len(recipes))
+    return recipes
+
+
+def process_url(job):
     """Process video URL with real-time updates"""
+    room = job['id']
+    url = job['source']
+
     try:
-        print(f"[{sid}] Processing URL: {url}")
+        print(f"[{room}] Processing URL: {url}")
 
         # Step 1: Try to extract metadata first
-        socketio.emit('status', {'step': 'metadata', 'message': 'Extracting metadata from URL...'}, room=sid)
-        metadata = extract_url_metadata(url)
-
-        transcript = None
-        source = "metadata"
+        if not stage_done(job, 'metadata'):
+            socketio.emit('status', {'step': 'metadata', 'message': 'Extracting metadata from URL...'}, room=room)
+            complete_stage(job, 'metadata', metadata=extract_url_metadata(url))
+        metadata = job['stages']['metadata']['metadata']
 
         if metadata and len(metadata.get('text', '')) > 100:
             # We have good metadata, try recipe extraction from metadata only
-            print(f"[{sid}] Found metadata: {metadata.get('title', '')[:100]}")
-            socketio.emit('status', {'step': 'metadata_found', 'message': 'Metadata found! Attempting recipe extraction...'}, room=sid)
-            socketio.emit('transcript', {'text': metadata['text']}, room=sid)
-            transcript = metadata['text']
+            print(f"[{room}] Found metadata: {metadata.get('title', '')[:100]}")
+            socketio.emit('status', {'step': 'metadata_found', 'message': 'Metadata found! Attempting recipe extraction...'}, room=room)
+            socketio.emit('transcript', {'text': metadata['text']}, room=room)
+
+            # Format recipe
+            socketio.emit('status', {'step': 'format', 'message': 'Formatting recipe with AI...'}, room=room)
+            recipe_data = format_with_gemini(metadata['text'])
+
+            if recipe_data.get('is_recipe') == False:
+                fail_job(job, f"Not a recipe: {recipe_data.get('reason')}")
+                return
+
+            recipes = [recipe_data]
             source = "metadata"
         else:
             # Metadata insufficient, download video and transcribe
-            print(f"[{sid}] Metadata insufficient, downloading video...")
-            socketio.emit('status', {'step': 'download', 'message': 'Metadata insufficient. Downloading video...'}, room=sid)
+            audio_path = job['stages'].get('download', {}).get('audio_path')
 
-            with tempfile.TemporaryDirectory() as temp_dir:
-                print(f"[{sid}] Temp directory: {temp_dir}")
+            if audio_path and os.path.exists(audio_path):
+                socketio.emit('status', {'step': 'download_complete', 'message': 'Resuming with downloaded audio'}, room=room)
+            else:
+                print(f"[{room}] Metadata insufficient, downloading video...")
+                socketio.emit('status', {'step': 'download', 'message': 'Metadata insufficient. Downloading video...'}, room=room)
 
-                # Download audio
-                print(f"[{sid}] Starting download...")
-                audio_path = download_video_audio(url, temp_dir)
-                print(f"[{sid}] Audio downloaded to: {audio_path}")
-                socketio.emit('status', {'step': 'download_complete', 'message': f'Download complete: {os.path.basename(audio_path)}'}, room=sid)
+                audio_path = download_video_audio(url, str(job_dir(job)))
+                complete_stage(job, 'download', audio_path=audio_path)
+                print(f"[{room}] Audio downloaded to: {audio_path}")
+                socketio.emit('status', {'step': 'download_complete', 'message': f'Download complete: {os.path.basename(audio_path)}'}, room=room)
 
-                # Transcribe with progress
-                socketio.emit('status', {'step': 'transcribe', 'message': 'Transcribing audio...'}, room=sid)
+            whisper_result = transcribe_stage(job, audio_path)
 
-                transcript = transcribe_audio_whisper(audio_path, model_size="large")
-
-                socketio.emit('transcript', {'text': transcript}, room=sid)
-                socketio.emit('status', {'step': 'transcribe_complete', 'message': 'Transcription complete'}, room=sid)
-                source = "transcription"
-
-        if not transcript:
-            socketio.emit('error', {'message': 'Failed to extract any text from URL'}, room=sid)
-            return
-
-        # Format recipe
-        socketio.emit('status', {'step': 'format', 'message': 'Formatting recipe with AI...'}, room=sid)
+            if not whisper_result['text']:
+                fail_job(job, 'Failed to extract any text from URL')
+                return
 
-        recipe_data = format_with_gemini(transcript)
+            recipes = format_stage(job, whisper_result)
+            source = "transcription"
 
-        if recipe_data.get('is_recipe') == False:
-            socketio.emit('error', {'message': f"Not a recipe: {recipe_data.get('reason')}"}, room=sid)
+        if not recipes:
+            fail_job(job, 'No recipes found in transcription')
             return
 
         # Save outputs with source tracking
-        recipe_data['source'] = url
-        recipe_data['extraction_source'] = source
-        recipe_data['extracted_at'] = datetime.now().isoformat()
+        extra = {'extraction_source': source}
         if metadata:
-            recipe_data['metadata'] = {
+            extra['metadata'] = {
                 'title': metadata.get('title', ''),
                 'description': metadata.get('description', '')
             }
-
-        json_path = save_as_json(recipe_data, 'recipes', url)
-        md_path = save_as_markdown(recipe_data, 'recipes', url)
-
-        socketio.emit('result', {
-            'recipe': recipe_data,
-            'json_path': json_path,
-            'md_path': md_path,
-            'source': source
-        }, room=sid)
+        emit_recipes(job, recipes, extra)
 
     except Exception as e:
         import traceback
         error_details = traceback.format_exc()
-        print(f"[{sid}] ERROR: {error_details}")
-        socketio.emit('error', {'message': f"{str(e)}\n\nDetails: {error_details}"}, room=sid)
+        print(f"[{room}] ERROR: {error_details}")
+        fail_job(job, str(e), error_details)
 
 
-def process_image(image_path, sid):
+def process_image(job):
     """Process image with OCR"""
+    room = job['id']
+    image_path = job['source']
+
     try:
-        socketio.emit('status', {'step': 'ocr', 'message': 'Extracting text from image...'}, room=sid)
+        socketio.emit('status', {'step': 'ocr', 'message': 'Extracting text from image...'}, room=room)
 
         # Read and encode image for preview
         with open(image_path, 'rb') as f:
             img_data = f.read()
         img_b64 = base64.b64encode(img_data).decode('utf-8')
 
-        socketio.emit('image_preview', {'base64': img_b64}, room=sid)
+        socketio.emit('image_preview', {'base64': img_b64}, room=room)
 
         # OCR
-        raw_text, confidence = gemini_ocr_image(image_path)
+        if not stage_done(job, 'ocr'):
+            raw_text, confidence = gemini_ocr_image(image_path)
+            complete_stage(job, 'ocr', text=raw_text, confidence=confidence)
+        raw_text = job['stages']['ocr']['text']
+        confidence = job['stages']['ocr']['confidence']
 
-        socketio.emit('ocr_result', {'text': raw_text, 'confidence': confidence}, room=sid)
-        socketio.emit('status', {'step': 'ocr_complete', 'message': f'OCR complete (confidence: {confidence:.2f})'}, room=sid)
+        socketio.emit('ocr_result', {'text': raw_text, 'confidence': confidence}, room=room)
+        socketio.emit('status', {'step': 'ocr_complete', 'message': f'OCR complete (confidence: {confidence:.2f})'}, room=room)
 
         # Format recipe
-        socketio.emit('status', {'step': 'format', 'message': 'Formatting recipe...'}, room=sid)
+        socketio.emit('status', {'step': 'format', 'message': 'Formatting recipe...'}, room=room)
 
         recipe_data = format_with_gemini(raw_text)
 
         if recipe_data.get('is_recipe') == False:
-            socketio.emit('error', {'message': f"Not a recipe: {recipe_data.get('reason')}"}, room=sid)
+            fail_job(job, f"Not a recipe: {recipe_data.get('reason')}")
             return
 
         # Update confidence
         recipe_data['confidence'] = (confidence + recipe_data.get('confidence', 0.5)) / 2
-        recipe_data['source'] = image_path
-        recipe_data['extracted_at'] = datetime.now().isoformat()
 
-        # Save outputs
-        json_path = save_as_json(recipe_data, 'recipes', image_path)
-        md_path = save_as_markdown(recipe_data, 'recipes', image_path)
-
-        socketio.emit('result', {
-            'recipe': recipe_data,
-            'json_path': json_path,
-            'md_path': md_path
-        }, room=sid)
+        emit_recipes(job, [recipe_data])
 
     except Exception as e:
         import traceback
         error_details = traceback.format_exc()
-        print(f"[{sid}] ERROR: {error_details}")
-        socketio.emit('error', {'message': f"{str(e)}\n\nDetails: {error_details}"}, room=sid)
+        print(f"[{room}] ERROR: {error_details}")
+        fail_job(job, str(e), error_details)
 
 
-def process_video_file(video_path, sid):
+def process_video_file(job):
     """Process uploaded video file with frame extraction"""
+    room = job['id']
+    video_path = job['source']
+
     try:
-        socketio.emit('status', {'step': 'extract_audio', 'message': 'Extracting audio from video...'}, room=sid)
+        audio_path = str(job_path(job, 'audio.mp3'))
 
-        with tempfile.TemporaryDirectory() as temp_dir:
-            # Extract audio
-            import subprocess
-            audio_path = os.path.join(temp_dir, 'audio.mp3')
+        if not stage_done(job, 'extract_audio'):
+            socketio.emit('status', {'step': 'extract_audio', 'message': 'Extracting audio from video...'}, room=room)
 
+            import subprocess
             cmd = ['ffmpeg', '-i', video_path, '-vn', '-acodec', 'mp3', '-y', audio_path]
             subprocess.run(cmd, check=True, capture_output=True)
+            complete_stage(job, 'extract_audio', audio_path=audio_path)
 
-            socketio.emit('status', {'step': 'extract_audio_complete', 'message': 'Audio extracted'}, room=sid)
+        socketio.emit('status', {'step': 'extract_audio_complete', 'message': 'Audio extracted'}, room=room)
 
-            # Extract frames (2 fps)
-            socketio.emit('status', {'step': 'extract_frames', 'message': 'Extracting video frames...'}, room=sid)
+        # Extract frames (2 fps) - cheap, so redone on resume rather than persisted
+        socketio.emit('status', {'step': 'extract_frames', 'message': 'Extracting video frames...'}, room=room)
 
+        with tempfile.TemporaryDirectory() as temp_dir:
             frames = extract_video_frames(video_path, temp_dir, fps=2)
 
-            socketio.emit('frames', {'frames': frames}, room=sid)
-            socketio.emit('status', {'step': 'extract_frames_complete', 'message': f'Extracted {len(frames)} frames'}, room=sid)
+        socketio.emit('frames', {'frames': frames}, room=room)
+        socketio.emit('status', {'step': 'extract_frames_complete', 'message': f'Extracted {len(frames)} frames'}, room=room)
 
-            # Transcribe
-            socketio.emit('status', {'step': 'transcribe', 'message': 'Transcribing audio...'}, room=sid)
+        # Transcribe
+        whisper_result = transcribe_stage(job, audio_path)
 
-            transcript = transcribe_audio_whisper(audio_path, model_size="large")
+        # Format recipes (one per transcript segment, concurrently)
+        recipes = format_stage(job, whisper_result)
 
-            socketio.emit('transcript', {'text': transcript}, room=sid)
-            socketio.emit('status', {'step': 'transcribe_complete', 'message': 'Transcription complete'}, room=sid)
+        if not recipes:
+            fail_job(job, 'No recipes found in video')
+            return
 
-            # Format recipe
-            socketio.emit('status', {'step': 'format', 'message': 'Formatting recipe with AI...'}, room=sid)
+        emit_recipes(job, recipes, {'frames_analyzed': len(frames)})
+
+    except Exception as e:
+        import traceback
+        error_details = traceback.format_exc()
+        print(f"[{room}] ERROR: {error_details}")
+        fail_job(job, str(e), error_details)
 
-            recipe_data = format_with_gemini(transcript)
 
-            if recipe_data.get('is_recipe') == False:
-                socketio.emit('error', {'message': f"Not a recipe: {recipe_data.get('reason')}"}, room=sid)
-                return
+JOB_PROCESSORS = {
+    'url': process_url,
+    'image': process_image,
+    'video_file': process_video_file
+}
 
-            # Save outputs
-            recipe_data['source'] = video_path
-            recipe_data['extracted_at'] = datetime.now().isoformat()
-            recipe_data['frames_analyzed'] = len(frames)
 
-            json_path = save_as_json(recipe_data, 'recipes', video_path)
-            md_path = save_as_markdown(recipe_data, 'recipes', video_path)
+def start_job(kind, source, owns_source=False):
+    """Create a job, attach the requesting client to it and process it in the background"""
+    job = new_job(kind, source, owns_source=owns_source)
 
-            socketio.emit('result', {
-                'recipe': recipe_data,
-                'json_path': json_path,
-                'md_path': md_path
-            }, room=sid)
+    join_room(job['id'])
+    emit('job', {'job_id': job['id'], 'status': job['status']})
+
+    # Daemon like resumed jobs: a job cut off by shutdown is resumed on the next start
+    thread = threading.Thread(target=JOB_PROCESSORS[kind], args=(job,), daemon=True)
+    thread.start()
+
+
+def resume_jobs():
+    """Restart jobs interrupted by a server restart, from their last completed stage"""
+    cleaned = cleanup_finished_jobs()
+    if cleaned:
+        print(f"Cleaned up artefacts of {cleaned} finished job(s)")
+
+    for job in incomplete_jobs():
+        print(f"[{job['id']}] Resuming {job['kind']} job: {job['source']}")
+        thread = threading.Thread(target=JOB_PROCESSORS[job['kind']], args=(job,), daemon=True)
+        thread.start()
 
-    except Exception as e:
-        import traceback
-        error_details = traceback.format_exc()
-        print(f"[{sid}] ERROR: {error_details}")
-        socketio.emit('error', {'message': f"{str(e)}\n\nDetails: {error_details}"}, room=sid)
+
+def replay_job(job):
+    """Bring a re-attached client up to date with a job's progress"""
+    emit('job', {'job_id': job['id'], 'status': job['status']})
+
+    transcript = read_transcript(job)['text']
+    if transcript:
+        emit('transcript', {'text': transcript})
+
+    if job['status'] == 'done':
+        outputs = job['stages'].get('save', {}).get('outputs', [])
+        for recipe_data, paths in zip(load_recipes(job), outputs):
+            emit('result', {'recipe': recipe_data, **paths, 'source': recipe_data.get('extraction_source')})
+        emit('job_complete', {'job_id': job['id'], 'status': 'done'})
+    elif job['status'] == 'failed':
+        emit('error', {'message': job['error']})
+        emit('job_complete', {'job_id': job['id'], 'status': 'failed'})
+    else:
+        done = ', '.join(job['stages']) or 'none'
+        emit('status', {'step': 'resumed', 'message': f'Re-attached to job (completed stages: {done})'})
 
 
 @app.route('/')
@@ -296,6 +463,12 @@ def index():
     return render_template('recipe_extractor.html')
 
 
+@app.route('/ready')
+def ready():
+    """Readiness probe - 200 only once warm-up has completed"""
+    return jsonify(warmup_state), 200 if warmup_state['ready'] else 503
+
+
 @app.route('/recipes/<path:filename>')
 def download_recipe(filename):
     return send_from_directory('recipes', filename)
@@ -311,6 +484,18 @@ def handle_disconnect():
     print(f'Client disconnected: {request.sid}')
 
 
+@socketio.on('attach_job')
+def handle_attach_job(data):
+    """Re-attach a (reconnected) client to a running or finished job"""
+    job = load_job(data.get('job_id'))
+    if not job:
+        emit('job_complete', {'job_id': data.get('job_id'), 'status': 'unknown'})
+        return
+
+    join_room(job['id'])
+    replay_job(job)
+
+
 @socketio.on('extract_url')
 def handle_extract_url(data):
     url = data.get('url')
@@ -319,8 +504,7 @@ def handle_extract_url(data):
         return
 
     # Process in background thread
-    thread = threading.Thread(target=process_url, args=(url, request.sid))
-    thread.start()
+    start_job('url', url)
 
 
 @socketio.on('extract_file')
@@ -346,14 +530,12 @@ def handle_extract_file(data):
         # Determine file type
         ext = safe_filename.rsplit('.', 1)[1].lower()
 
-        if ext in {'png', 'jpg', 'jpeg', 'gif', 'webp'}:
+        if ext in {'png', 'jpg', 'jpeg', 'gif', 'webp', 'heic', 'heif'}:
             # Image
-            thread = threading.Thread(target=process_image, args=(file_path, request.sid))
-            thread.start()
+            start_job('image', file_path, owns_source=True)
         elif ext in {'mp4', 'avi', 'mov', 'mkv'}:
             # Video
-            thread = threading.Thread(target=process_video_file, args=(file_path, request.sid))
-            thread.start()
+            start_job('video_file', file_path, owns_source=True)
         elif ext == 'pdf':
             emit('error', {'message': 'PDF support coming soon!'})
         else:
@@ -366,4 +548,12 @@ def handle_extract_file(data):
 if __name__ == '__main__':
     print("Starting Recipe Extractor Web UI...")
     print("Open browser to: http://localhost:5555")
-    socketio.run(app, host='0.0.0.0', port=5555, debug=True, allow_unsafe_werkzeug=True)
+
+    # With debug=True the reloader re-runs this file in a child process;
+    # only warm up in the process that actually serves requests
+    debug = True
+    if not debug or os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        threading.Thread(target=warm_up, daemon=True).start()
+        resume_jobs()
+
+    socketio.run(app, host='0.0.0.0', port=5555, debug=debug, allow_unsafe_werkzeug=True)
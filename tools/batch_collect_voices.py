@@ -97,9 +97,10 @@ def download_audio(video: dict, voice: str) -> Path:
     """Download audio from a YouTube video."""
     output_path = RAW_DIR / voice / f"{video['id']}.wav"
 
-    if output_path.exists():
-        print(f"  Skip (exists): {video['title'][:50]}")
-        return output_path
+    for existing in (output_path, output_path.with_suffix(".flac")):
+        if existing.exists():
+            print(f"  Skip (exists): {video['title'][:50]}")
+            return existing
 
     cmd = [
         "yt-dlp",
@@ -116,14 +117,16 @@ def download_audio(video: dict, voice: str) -> Path:
     return output_path if output_path.exists() else None
 
 def process_audio(audio_path: Path, voice: str) -> Path:
-    """Convert audio to training format (22kHz mono)."""
+    """Convert audio to training format (22kHz mono, lossless FLAC)."""
     if not audio_path or not audio_path.exists():
         return None
 
-    output_path = PROCESSED_DIR / voice / audio_path.name
+    output_path = PROCESSED_DIR / voice / f"{audio_path.stem}.flac"
 
     if output_path.exists():
         return output_path
+    if output_path.with_suffix(".wav").exists():
+        return output_path.with_suffix(".wav")   # Converted before the FLAC switch
 
     cmd = [
         "ffmpeg", "-y",
@@ -161,8 +164,8 @@ def show_status():
 
     total_hours = 0
     for voice in VOICES:
-        raw_files = list((RAW_DIR / voice).glob("*.wav"))
-        processed_files = list((PROCESSED_DIR / voice).glob("*.wav"))
+        raw_files = [f for f in (RAW_DIR / voice).iterdir() if f.suffix in (".wav", ".flac")]
+        processed_files = [f for f in (PROCESSED_DIR / voice).iterdir() if f.suffix in (".wav", ".flac")]
 
         duration = sum(get_audio_duration(f) for f in processed_files)
         hours = duration / 3600
@@ -55,8 +55,8 @@ def download_audio(url: str, voice: str) -> Path:
     return audio_file if audio_file.exists() else None
 
 def convert_to_training_format(audio_path: Path, voice: str) -> Path:
-    """Convert audio to training format (22kHz mono)."""
-    output_path = PROCESSED_DIR / voice / audio_path.name
+    """Convert audio to training format (22kHz mono, lossless FLAC)."""
+    output_path = PROCESSED_DIR / voice / f"{audio_path.stem}.flac"
 
     cmd = [
         "ffmpeg", "-y",
@@ -108,8 +108,8 @@ def show_collection_status():
     print("="*50)
 
     for voice in ["ravi", "lakshmi", "kiran", "priya", "arjun", "ananya"]:
-        raw_files = list((RAW_DIR / voice).glob("*.wav"))
-        processed_files = list((PROCESSED_DIR / voice).glob("*.wav"))
+        raw_files = [f for f in (RAW_DIR / voice).iterdir() if f.suffix in (".wav", ".flac")]
+        processed_files = [f for f in (PROCESSED_DIR / voice).iterdir() if f.suffix in (".wav", ".flac")]
 
         total_duration = sum(get_audio_duration(f) for f in processed_files)
         hours = total_duration / 3600
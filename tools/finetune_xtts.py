@@ -75,9 +75,9 @@ def prepare_dataset(voice_name):
 
     output_dir.mkdir(parents=True, exist_ok=True)
 
-    wav_files = list(voice_dir.glob("*.wav"))
+    wav_files = [f for f in voice_dir.iterdir() if f.suffix.lower() in (".wav", ".flac")]
     if not wav_files:
-        print(f"Error: No WAV files found in {voice_dir}")
+        print(f"Error: No WAV/FLAC files found in {voice_dir}")
         return False
 
     print(f"\n{'='*60}")
@@ -5,17 +5,30 @@ Separates audio into different speaker folders based on voice embeddings.
 
 Usage:
     python separate_speakers.py <audio_file> [--output-dir <dir>]
+    python separate_speakers.py --serve     # long-lived worker (JSON lines on stdin/stdout)
 
 Example:
     python separate_speakers.py voices/processed/arjun/sample_powerbi.wav
 
-Output:
+Output (segments are lossless FLAC by default; --format wav or AUDIO_FORMAT=wav for WAV):
     voices/separated/
     ├── speaker_00/
-    │   ├── segment_001.wav
-    │   └── segment_002.wav
+    │   ├── segment_001.flac
+    │   └── segment_002.flac
     └── speaker_01/
-        └── segment_003.wav
+        └── segment_003.flac
+
+Worker mode (--serve) loads the VoiceEncoder once and then handles jobs
+back to back, so callers like watch_and_process.py don't pay the import
+and model load on every file:
+    stdout: {"ready": true, "load_seconds": 4.2}
+    stdin:  {"id": 1, "audio_file": "...", "output_dir": "voices/separated", "format": "flac"}
+    stdout: {"id": 1, "ok": true, "speakers": {...}, "timings": {...}}
+All progress output goes to stderr in this mode.
+
+Each input is decoded once (load_audio); the embedding input and the
+exported segments are both cut from that array, and segments are written
+with soundfile instead of an ffmpeg run per segment.
 """
 
 import os
@@ -47,17 +60,48 @@ except ImportError:
 
 import wave
 import json
+import time
 from datetime import datetime
 
+try:
+    import soundfile
+except ImportError:
+    soundfile = None
+
+# Segment output format - lossless FLAC is about half the size of WAV for speech
+AUDIO_FORMAT = os.getenv("AUDIO_FORMAT", "flac").lower()
+
+# Sample rate of exported segments (training format)
+SEGMENT_RATE = 22050
+
 
 def get_audio_duration(file_path):
     """Get duration in seconds"""
+    if soundfile is not None and Path(file_path).suffix.lower() in (".wav", ".flac"):
+        return soundfile.info(str(file_path)).duration
+    if Path(file_path).suffix.lower() != ".wav":
+        return AudioSegment.from_file(str(file_path)).duration_seconds
     with wave.open(str(file_path), 'rb') as f:
         frames = f.getnframes()
         rate = f.getframerate()
         return frames / rate
 
 
+def load_audio(audio_file):
+    """
+    Decode a recording once to mono float32
+    Returns: (samples, sample_rate)
+    """
+    if soundfile is not None and Path(audio_file).suffix.lower() in (".wav", ".flac"):
+        samples, rate = soundfile.read(str(audio_file), dtype="float32", always_2d=True)
+        return samples.mean(axis=1), rate
+
+    # Other formats: one ffmpeg decode through pydub
+    audio = AudioSegment.from_file(str(audio_file)).set_channels(1)
+    samples = np.array(audio.get_array_of_samples(), dtype=np.float32) / float(1 << (8 * audio.sample_width - 1))
+    return samples, audio.frame_rate
+
+
 def separate_with_pyannote(audio_file, output_dir, hf_token=None):
     """Use pyannote.audio for speaker diarization (best quality)"""
     print("Using pyannote.audio for speaker diarization...")
@@ -79,32 +123,26 @@ def separate_with_pyannote(audio_file, output_dir, hf_token=None):
     # Run diarization
     diarization = pipeline(str(audio_file))
 
-    # Load audio
-    audio = AudioSegment.from_wav(str(audio_file))
-
-    # Extract segments per speaker
+    # Extract segments per speaker (audio is cut when saving)
     speakers = {}
     for turn, _, speaker in diarization.itertracks(yield_label=True):
         if speaker not in speakers:
             speakers[speaker] = []
 
-        start_ms = int(turn.start * 1000)
-        end_ms = int(turn.end * 1000)
-        segment = audio[start_ms:end_ms]
-
         speakers[speaker].append({
             'start': turn.start,
             'end': turn.end,
-            'audio': segment
         })
 
     return speakers
 
 
 def separate_with_resemblyzer(audio_file, output_dir, segment_length=3.0, min_speakers=1, max_speakers=5,
-                               similarity_threshold=0.75):
+                               similarity_threshold=0.75, encoder=None, audio=None):
     """
     Use resemblyzer for voice embedding + clustering
+    Pass a preloaded `encoder` to reuse it across files, and the decoded
+    `audio` (samples, rate) to avoid decoding the file again.
 
     Improvements for pitch/volume robustness:
     1. Use longer segments (more context)
@@ -116,12 +154,16 @@ def separate_with_resemblyzer(audio_file, output_dir, segment_length=3.0, min_sp
     print(f"Segment length: {segment_length}s")
     print(f"Similarity threshold: {similarity_threshold}")
 
-    # Load encoder
-    encoder = VoiceEncoder()
+    # Load encoder (unless the caller keeps one loaded)
+    if encoder is None:
+        encoder = VoiceEncoder()
 
     # Load and preprocess audio
     print(f"Loading {audio_file}...")
-    wav = preprocess_wav(str(audio_file))
+    if audio is not None:
+        wav = preprocess_wav(audio[0], source_sr=audio[1])
+    else:
+        wav = preprocess_wav(str(audio_file))
 
     duration = len(wav) / sampling_rate
     print(f"Audio duration: {duration:.1f} seconds")
@@ -261,11 +303,14 @@ def separate_with_resemblyzer(audio_file, output_dir, segment_length=3.0, min_sp
     return speakers
 
 
-def save_separated_audio(speakers, audio_file, output_dir):
-    """Save separated audio segments to folders"""
+def save_separated_audio(speakers, audio_file, output_dir, audio_format=AUDIO_FORMAT, audio=None):
+    """Save separated audio segments to folders (WAV or FLAC), cut from the decoded `audio`"""
 
-    # Load original audio
-    audio = AudioSegment.from_wav(str(audio_file))
+    # Whole recording at the segment rate, resampled once
+    samples, rate = audio if audio is not None else load_audio(audio_file)
+    if rate != SEGMENT_RATE:
+        import librosa
+        samples = librosa.resample(samples, orig_sr=rate, target_sr=SEGMENT_RATE)
 
     output_dir = Path(output_dir)
     output_dir.mkdir(parents=True, exist_ok=True)
@@ -292,14 +337,10 @@ def save_separated_audio(speakers, audio_file, output_dir):
             start_ms = int(seg['start'] * 1000)
             end_ms = int(seg['end'] * 1000)
 
-            segment_audio = audio[start_ms:end_ms]
+            segment_audio = samples[start_ms * SEGMENT_RATE // 1000:end_ms * SEGMENT_RATE // 1000]
 
-            segment_file = speaker_dir / f"segment_{i+1:03d}.wav"
-            segment_audio.export(
-                str(segment_file),
-                format="wav",
-                parameters=["-ar", "22050", "-ac", "1"]
-            )
+            segment_file = speaker_dir / f"segment_{i+1:03d}.{audio_format}"
+            write_segment(segment_file, segment_audio, audio_format)
 
             duration = (end_ms - start_ms) / 1000
             total_duration += duration
@@ -323,9 +364,120 @@ def save_separated_audio(speakers, audio_file, output_dir):
     return manifest
 
 
+def write_segment(path, samples, audio_format=AUDIO_FORMAT):
+    """Write one mono float32 segment at SEGMENT_RATE as 16-bit WAV or FLAC"""
+    pcm = np.clip(np.round(samples * 32768.0), -32768, 32767).astype(np.int16)
+    if soundfile is not None:
+        soundfile.write(str(path), pcm, SEGMENT_RATE, subtype="PCM_16", format=audio_format.upper())
+        return
+    AudioSegment(pcm.tobytes(), frame_rate=SEGMENT_RATE, sample_width=2, channels=1).export(
+        str(path), format=audio_format)
+
+
+def separate_file(audio_file, output_dir, encoder=None, segment_length=3.0, max_speakers=5,
+                  similarity_threshold=0.75, use_pyannote=False, hf_token=None, audio_format=AUDIO_FORMAT):
+    """
+    Separate one file into output_dir/<stem>/speaker_NN/
+    Returns: (manifest or None, timings in seconds)
+    """
+    audio_file = Path(audio_file)
+    output_dir = Path(output_dir) / audio_file.stem
+    timings = {}
+
+    # Decode once - embeddings and exported segments both come from this
+    started = time.perf_counter()
+    audio = load_audio(audio_file)
+    timings['decode'] = round(time.perf_counter() - started, 3)
+
+    started = time.perf_counter()
+    speakers = None
+    if use_pyannote and PYANNOTE_AVAILABLE:
+        speakers = separate_with_pyannote(audio_file, output_dir, hf_token)
+
+    if speakers is None and RESEMBLYZER_AVAILABLE:
+        speakers = separate_with_resemblyzer(
+            audio_file, output_dir,
+            segment_length=segment_length,
+            max_speakers=max_speakers,
+            similarity_threshold=similarity_threshold,
+            encoder=encoder,
+            audio=audio
+        )
+    timings['separate'] = round(time.perf_counter() - started, 3)
+
+    if speakers is None:
+        return None, timings
+
+    print(f"\nFound {len(speakers)} speakers:")
+
+    started = time.perf_counter()
+    manifest = save_separated_audio(speakers, audio_file, output_dir, audio_format, audio)
+    timings['save'] = round(time.perf_counter() - started, 3)
+    return manifest, timings
+
+
+def serve():
+    """Worker loop: one JSON job per stdin line, one JSON result per stdout line"""
+    protocol = sys.stdout
+    sys.stdout = sys.stderr     # Progress prints must not corrupt the protocol
+
+    def reply(message):
+        protocol.write(json.dumps(message) + "\n")
+        protocol.flush()
+
+    if not RESEMBLYZER_AVAILABLE:
+        reply({"ready": False, "error": "resemblyzer not installed"})
+        return
+
+    started = time.perf_counter()
+    encoder = VoiceEncoder()
+    reply({"ready": True, "load_seconds": round(time.perf_counter() - started, 3)})
+
+    jobs = 0
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        started = time.perf_counter()
+        job = {}
+        try:
+            job = json.loads(line)
+            manifest, timings = separate_file(
+                job["audio_file"], job.get("output_dir", "voices/separated"), encoder=encoder,
+                segment_length=job.get("segment_length", 3.0),
+                max_speakers=job.get("max_speakers", 5),
+                similarity_threshold=job.get("similarity_threshold", 0.75),
+                audio_format=job.get("format", AUDIO_FORMAT)
+            )
+            timings['total'] = round(time.perf_counter() - started, 3)
+            jobs += 1
+
+            if manifest is None:
+                reply({"id": job.get("id"), "ok": False, "error": "could not separate speakers",
+                       "timings": timings})
+                continue
+
+            reply({
+                "id": job.get("id"),
+                "ok": True,
+                "speakers": {
+                    speaker_id: {"segments": info['segment_count'], "duration": round(info['total_duration'], 1)}
+                    for speaker_id, info in manifest['speakers'].items()
+                },
+                "timings": timings,
+                "jobs": jobs,
+            })
+        except Exception as e:
+            reply({"id": job.get("id"), "ok": False, "error": f"{type(e).__name__}: {e}",
+                   "timings": {"total": round(time.perf_counter() - started, 3)}})
+
+
 def main():
+    if "--serve" in sys.argv[1:]:
+        serve()
+        return
+
     parser = argparse.ArgumentParser(description="Separate speakers in audio file")
-    parser.add_argument("audio_file", help="Input audio file (WAV)")
+    parser.add_argument("audio_file", help="Input audio file (WAV or FLAC)")
     parser.add_argument("--output-dir", "-o", help="Output directory",
                        default="voices/separated")
     parser.add_argument("--segment-length", "-s", type=float, default=3.0,
@@ -334,6 +486,8 @@ def main():
                        help="Maximum number of speakers to detect (default: 5)")
     parser.add_argument("--similarity-threshold", "-t", type=float, default=0.75,
                        help="Similarity threshold for same speaker (default: 0.75)")
+    parser.add_argument("--format", choices=["flac", "wav"], default=AUDIO_FORMAT,
+                       help=f"Segment format (default: {AUDIO_FORMAT})")
     parser.add_argument("--hf-token", help="HuggingFace token for pyannote")
     parser.add_argument("--use-pyannote", action="store_true",
                        help="Force use of pyannote (requires HF token)")
@@ -359,29 +513,21 @@ def main():
     print("="*60 + "\n")
 
     # Try pyannote first if requested, otherwise use resemblyzer
-    speakers = None
-
-    if args.use_pyannote and PYANNOTE_AVAILABLE:
-        speakers = separate_with_pyannote(audio_file, output_dir, args.hf_token)
-
-    if speakers is None and RESEMBLYZER_AVAILABLE:
-        speakers = separate_with_resemblyzer(
-            audio_file, output_dir,
-            segment_length=args.segment_length,
-            max_speakers=args.max_speakers,
-            similarity_threshold=args.similarity_threshold
-        )
-
-    if speakers is None:
+    manifest, _ = separate_file(
+        audio_file, args.output_dir,
+        segment_length=args.segment_length,
+        max_speakers=args.max_speakers,
+        similarity_threshold=args.similarity_threshold,
+        use_pyannote=args.use_pyannote,
+        hf_token=args.hf_token,
+        audio_format=args.format
+    )
+
+    if manifest is None:
         print("Error: Could not separate speakers")
         print("Install dependencies: pip install resemblyzer pydub scikit-learn")
         sys.exit(1)
 
-    print(f"\nFound {len(speakers)} speakers:")
-
-    # Save separated audio
-    manifest = save_separated_audio(speakers, audio_file, output_dir)
-
     print("\n" + "="*60)
     print("DONE! Next steps:")
     print("="*60)
@@ -86,8 +86,8 @@ def train_voice(voice_name, sample_duration=25):
     # Create output directory
     output_dir.mkdir(parents=True, exist_ok=True)
 
-    # Get all WAV files
-    wav_files = list(voice_dir.glob("*.wav"))
+    # Get all audio files (WAV or lossless FLAC)
+    wav_files = [f for f in voice_dir.iterdir() if f.suffix.lower() in (".wav", ".flac")]
     if not wav_files:
         print(f"Error: No WAV files found in {voice_dir}")
         return False
@@ -198,7 +198,7 @@ def test_voice(voice_name, text, language="en"):
     if not reference_wav.exists():
         # Fallback to processed audio
         voice_dir = base_dir / "voices" / "processed" / voice_name
-        wav_files = list(voice_dir.glob("*.wav"))
+        wav_files = [f for f in voice_dir.iterdir() if f.suffix.lower() in (".wav", ".flac")]
         if not wav_files:
             print(f"No audio files found for {voice_name}")
             return
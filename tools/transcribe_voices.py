@@ -2,53 +2,66 @@
 """
 Transcribe all voice audio files using Whisper
 Creates transcripts needed for XTTS fine-tuning
+
+The Whisper model is loaded once per run (also for "all" and for lists of
+files), and the next file is decoded on a background thread while the
+current one is transcribed.
 """
 
 import whisper
 import os
 import sys
+import glob
 import json
+import queue
+import threading
 from pathlib import Path
 import ssl
 ssl._create_default_https_context = ssl._create_unverified_context
 
-def transcribe_voice(voice_name, model_size="small"):
-    """Transcribe all WAV files for a voice"""
+VOICES = ["arjun", "ananya", "priya", "kiran", "ravi", "lakshmi"]
+MODELS = ["tiny", "base", "small", "medium", "large", "large-v2", "large-v3", "turbo"]
 
-    base_dir = Path(__file__).parent
-    voice_dir = base_dir / "voices" / "processed" / voice_name
-    output_dir = base_dir / "voices" / "transcripts" / voice_name
 
-    if not voice_dir.exists():
-        print(f"Error: Voice directory not found: {voice_dir}")
-        return False
+def load_model(model_size="small"):
+    print(f"Loading Whisper {model_size} model...")
+    model = whisper.load_model(model_size)
+    print("Model loaded!\n")
+    return model
 
-    # Create output directory
-    output_dir.mkdir(parents=True, exist_ok=True)
 
-    # Get all WAV files
-    wav_files = sorted(voice_dir.glob("*.wav"))
+def prefetch_audio(files):
+    """
+    Decode files (16 kHz float32) one ahead of the consumer on a background thread
+    Returns: iterator of (file, audio or the exception that stopped it decoding)
+    """
+    ready = queue.Queue(maxsize=1)
 
-    print(f"\n{'='*60}")
-    print(f"Transcribing voice: {voice_name}")
-    print(f"WAV files: {len(wav_files)}")
-    print(f"Model: whisper-{model_size}")
-    print(f"Output: {output_dir}")
-    print(f"{'='*60}\n")
+    def produce():
+        for f in files:
+            try:
+                ready.put((f, whisper.load_audio(str(f))))
+            except Exception as e:
+                ready.put((f, e))
+        ready.put(None)
+
+    threading.Thread(target=produce, daemon=True).start()
+    return iter(ready.get, None)
 
-    # Load Whisper model
-    print(f"Loading Whisper {model_size} model...")
-    model = whisper.load_model(model_size)
-    print("Model loaded!\n")
 
+def transcribe_files(model, wav_files, output_dir):
+    """Transcribe files back to back with one model. Returns per-file summaries."""
     all_transcripts = []
 
-    for i, wav_file in enumerate(wav_files, 1):
+    for i, (wav_file, audio) in enumerate(prefetch_audio(wav_files), 1):
         file_size = wav_file.stat().st_size / (1024*1024)
         print(f"[{i}/{len(wav_files)}] {wav_file.name} ({file_size:.1f} MB)")
+        if isinstance(audio, Exception):
+            print(f"   Error decoding: {audio}\n")
+            continue
 
         # Transcribe with English forced (audio is English with Telugu accent)
-        result = model.transcribe(str(wav_file), language="en", verbose=False)
+        result = model.transcribe(audio, language="en", verbose=False)
 
         # Save individual transcript
         transcript_file = output_dir / f"{wav_file.stem}.txt"
@@ -71,6 +84,36 @@ def transcribe_voice(voice_name, model_size="small"):
         print(f"   Preview: {result['text'][:100]}...")
         print()
 
+    return all_transcripts
+
+
+def transcribe_voice(voice_name, model_size="small", model=None):
+    """Transcribe all WAV/FLAC files for a voice (pass `model` to reuse a loaded one)"""
+
+    base_dir = Path(__file__).parent
+    voice_dir = base_dir / "voices" / "processed" / voice_name
+    output_dir = base_dir / "voices" / "transcripts" / voice_name
+
+    if not voice_dir.exists():
+        print(f"Error: Voice directory not found: {voice_dir}")
+        return False
+
+    # Create output directory
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    # Get all audio files (WAV or lossless FLAC)
+    wav_files = sorted(f for f in voice_dir.iterdir() if f.suffix.lower() in (".wav", ".flac"))
+
+    print(f"\n{'='*60}")
+    print(f"Transcribing voice: {voice_name}")
+    print(f"WAV files: {len(wav_files)}")
+    print(f"Model: whisper-{model_size}")
+    print(f"Output: {output_dir}")
+    print(f"{'='*60}\n")
+
+    model = model or load_model(model_size)
+    all_transcripts = transcribe_files(model, wav_files, output_dir)
+
     # Save summary
     summary_file = output_dir / "summary.json"
     with open(summary_file, 'w') as f:
@@ -91,29 +134,65 @@ def transcribe_voice(voice_name, model_size="small"):
     return True
 
 def transcribe_all_voices(model_size="small"):
-    """Transcribe all 6 voices"""
-    voices = ["arjun", "ananya", "priya", "kiran", "ravi", "lakshmi"]
+    """Transcribe all 6 voices (one model load)"""
+    model = load_model(model_size)
 
-    for voice in voices:
+    for voice in VOICES:
         print(f"\n{'#'*60}")
         print(f"# Processing: {voice}")
         print(f"{'#'*60}")
-        transcribe_voice(voice, model_size)
+        transcribe_voice(voice, model_size, model)
+
+
+def transcribe_paths(patterns, model_size="small"):
+    """
+    Transcribe audio files / glob patterns with one model load
+    Transcripts go to voices/transcripts/<name of each file's folder>/
+    """
+    files = []
+    for pattern in patterns:
+        for match in sorted(glob.glob(pattern)) if glob.has_magic(pattern) else [pattern]:
+            path = Path(match)
+            if not path.exists():
+                print(f"Warning: not found: {match}")
+            elif path not in files:
+                files.append(path)
+    if not files:
+        print("No audio files to transcribe")
+        return False
+
+    model = load_model(model_size)
+    transcripts_dir = Path(__file__).parent / "voices" / "transcripts"
+    by_dir = {}
+    for f in files:
+        by_dir.setdefault(f.parent, []).append(f)
+
+    for folder, folder_files in by_dir.items():
+        output_dir = transcripts_dir / folder.name
+        output_dir.mkdir(parents=True, exist_ok=True)
+        print(f"{folder} → {output_dir}")
+        transcribe_files(model, folder_files, output_dir)
+    return True
+
 
 if __name__ == "__main__":
     if len(sys.argv) > 1:
-        voice_name = sys.argv[1]
-        model_size = sys.argv[2] if len(sys.argv) > 2 else "small"
+        args = sys.argv[1:]
+        model_size = args.pop() if len(args) > 1 and args[-1] in MODELS else "small"
 
-        if voice_name == "all":
+        if args == ["all"]:
             transcribe_all_voices(model_size)
+        elif len(args) == 1 and (args[0] in VOICES
+                                 or (Path(__file__).parent / "voices" / "processed" / args[0]).is_dir()):
+            transcribe_voice(args[0], model_size)
         else:
-            transcribe_voice(voice_name, model_size)
+            transcribe_paths(args, model_size)
     else:
         print("Usage:")
         print("  python transcribe_voices.py <voice_name> [model_size]")
         print("  python transcribe_voices.py all [model_size]")
-        print("\nVoices: arjun, ananya, priya, kiran, ravi, lakshmi")
+        print("  python transcribe_voices.py <files or globs>... [model_size]")
+        print("\nVoices: any folder in voices/processed/ (\"all\" = arjun, ananya, priya, kiran, ravi, lakshmi)")
         print("Models: tiny, base, small, medium, large")
         print("\nExample:")
         print("  python transcribe_voices.py arjun small")